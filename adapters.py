@@ -0,0 +1,128 @@
+# Python adapters for the tools, an alternative to the shell scripts in tools/.
+# An adapter builds the command line of the tool and classifies its output
+# line by line while the tool is running, instead of waiting for the whole
+# output. Only the last lines of the output are kept (see run_tool() in
+# runner.py), and once the verdict can't change anymore, the tool is stopped
+# right away instead of waiting for it to exit.
+#
+# Adapters are registered under the "adapter" key of a tool in
+# available_tools in bench.py, in place of the "call" script
+
+import abc
+import os
+import re
+import shutil
+
+# number of lines of the output of the tool kept for the results
+kept_lines = 1000
+
+
+class Adapter(abc.ABC):
+    def __init__(self, sol_file: str, contract: str, fun: str, sig: str, ds: bool,
+                 tout: float, memoutMB: int, dump_smt: bool, extra_opts: list[str]):
+        self.sol_file = sol_file
+        self.contract = contract
+        self.fun = fun
+        self.sig = sig
+        self.ds = ds
+        self.tout = tout
+        self.memoutMB = memoutMB
+        self.dump_smt = dump_smt
+        self.extra_opts = extra_opts
+        # phases and metrics, in the format of parse_metrics() in runner.py
+        self.metrics: list[dict] = []
+
+    @abc.abstractmethod
+    def get_cmd(self) -> list[str]:
+        pass
+
+    # called with each line of the output, stdout and stderr combined.
+    # Returns True if the verdict is final, and the tool can be stopped
+    @abc.abstractmethod
+    def feed(self, line: str) -> bool:
+        pass
+
+    # called once the tool stopped, with its exit status (None if it was
+    # killed) and its wall clock time. Returns the verdict: "safe", "unsafe",
+    # "unknown", or None if the output made no sense
+    @abc.abstractmethod
+    def finish(self, exit_status: int|None, t: float) -> str|None:
+        pass
+
+
+# Same verdicts as tools/halmos_batch.sh for a single function
+class HalmosAdapter(Adapter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.status: str|None = None
+        self.incomplete = False
+        self.crashed = False
+        self.t_test: float|None = None
+        self.smtdir: str|None = None
+        self.result_regex = re.compile(r"^\[(PASS|FAIL|TIMEOUT|ERROR)\] %s\(" % re.escape(self.fun))
+        # --function is a prefix, other functions may be tested after this one
+        self.any_result_regex = re.compile(r"^\[(PASS|FAIL|TIMEOUT|ERROR)\] ")
+
+    def get_cmd(self) -> list[str]:
+        cmd = ["halmos", "--function", self.fun, "--contract", self.contract]
+        if not self.ds:
+            cmd += ["--symbolic-storage", "--symbolic-msg-sender"]
+        if self.dump_smt:
+            cmd.append("--dump-smt-queries")
+        return cmd + self.extra_opts
+
+    def feed(self, line: str) -> bool:
+        if "Traceback" in line:
+            self.crashed = True
+        elif ("Counterexample: unknown" in line
+              or "Counterexample (potentially invalid)" in line
+              or "Encountered symbolic CALLDATALOAD offset" in line
+              or "Encountered symbolic memory offset" in line
+              or "paths have not been fully explored due to the loop unrolling bound" in line):
+            self.incomplete = True
+        elif line.startswith("Generating SMT queries in "):
+            self.smtdir = line[len("Generating SMT queries in "):].strip()
+
+        m = self.result_regex.match(line)
+        if m and self.status is None:
+            self.status = m.group(1)
+            m = re.search(r"time: ([0-9.]+)s", line)
+            if m:
+                self.t_test = float(m.group(1))
+                self.metrics.append({"v": 1, "phase": "test", "t": self.t_test})
+            m = re.search(r"paths: ([0-9]+)", line)
+            if m:
+                self.metrics.append({"v": 1, "metric": "paths", "value": int(m.group(1))})
+            # the counterexamples and the warnings that make a PASS or FAIL
+            # incomplete follow the result line. A timeout, an error, or a
+            # result known to be incomplete is unknown whatever follows
+            return self.status in ["TIMEOUT", "ERROR"] or self.incomplete
+        if self.status is None:
+            return False
+        # the output about the function ends with the result of the next
+        # function, the next contract, or the summary
+        return (self.any_result_regex.match(line) is not None
+                or line.startswith("Running ")
+                or line.startswith("Symbolic test result:"))
+
+    def finish(self, exit_status: int|None, t: float) -> str|None:
+        self.metrics.append({"v": 1, "phase": "setup", "t": max(0.0, t - (self.t_test or 0.0))})
+        if self.dump_smt and self.smtdir is not None and os.path.isdir(self.smtdir):
+            outdir = "halmos-smt2/%s.%s" % (self.sol_file, self.contract)
+            os.makedirs(outdir, exist_ok=True)
+            fnames = [f for f in os.listdir(self.smtdir) if f.endswith(".smt2")]
+            for f in fnames:
+                shutil.move(os.path.join(self.smtdir, f), os.path.join(outdir, f))
+            self.metrics.append({"v": 1, "metric": "queries", "value": len(fnames)})
+
+        if self.crashed:
+            return None
+        if self.incomplete:
+            return "unknown"
+        if self.status == "FAIL":
+            return "unsafe"
+        if self.status == "PASS":
+            return "safe"
+        if self.status is not None:
+            return "unknown"
+        return None
@@ -2,54 +2,148 @@
 
 import subprocess
 from pathlib import Path
-import time
 import os
-import stat
 import json
 import re
 import random
 from typing import Literal
 import optparse
-from time import gmtime, strftime
+from time import gmtime, strftime, time
 import csv
-
-
-def recreate_out() -> None:
-    os.system("rm -rf out")
+import hashlib
+import statistics
+import threading
+import socket
+import platform
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from runner import run_tool, parse_metrics
+import resultsdb
+import blobstore
+import distributed
+from progress import Progress
+import adapters
+from gen_families import get_family
+
+
+def recreate_out(out_dir: str) -> None:
+    os.system("rm -rf %s" % out_dir)
     try:
-        os.mkdir("out")
+        os.mkdir(out_dir)
     except FileExistsError:
         pass
 
 
-def build_forge() -> None:
-    if not opts.norebuild:
-        print("Building with forge...")
-        recreate_out()
-        cmd_line = ["forge", "build", "--ast",
-                   "--extra-output", "storageLayout", "metadata"]
-        if opts.yul: cmd_line.extend(["--extra-output", "ir"])
-        cmd_line.extend(["--use", opts.solc_version])
-        ret = subprocess.run(cmd_line, capture_output=True)
-        if ret.returncode != 0:
-            print("Forge returned error(s)")
-            print(printable_output(ret.stderr.decode("utf-8")))
-        ret.check_returncode()
+# Every solc version given by --solcv is built into its own output directory,
+# so the versions can be built concurrently. With a single version, it's the
+# default one of foundry
+def get_out_dir(solc_version: str) -> str:
+    if len(opts.solc_versions) == 1:
+        return "out"
+    return "out-%s" % solc_version
+
+
+# Environment of forge and of the tools for the given solc version. Foundry
+# takes its settings from FOUNDRY_* variables, so tools that build the
+# contracts themselves use the same compiler and output directory as we do
+def get_build_env(solc_version: str) -> dict[str, str]:
+    env = {"FOUNDRY_OUT": get_out_dir(solc_version), "FOUNDRY_SOLC_VERSION": solc_version}
+    # concurrent builds must not share the compiler cache
+    if len(opts.solc_versions) > 1:
+        env["FOUNDRY_CACHE_PATH"] = "cache-%s" % solc_version
+    return env
+
+
+# Fingerprint of everything that goes into the build: the build settings, and
+# the path, modification time and size of all solidity files
+def get_build_fingerprint(solc_version: str) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps({"solc_version": solc_version, "yul": opts.yul}).encode("utf-8"))
+    with open("foundry.toml", "rb") as f:
+        h.update(f.read())
+    for d in ["src", "lib"]:
+        for sol in sorted(Path(d).rglob("*.sol")):
+            st = sol.stat()
+            h.update(("%s %d %d\n" % (sol, st.st_mtime_ns, st.st_size)).encode("utf-8"))
+    return h.hexdigest()
+
+
+# In incremental mode, a build is only needed if the fingerprint differs from
+# the one stored in the stamp file by the last successful build
+def build_up_to_date(fname_stamp: str, solc_version: str) -> bool:
+    if not opts.incremental:
+        return False
+    try:
+        with open(fname_stamp, "r") as f:
+            return f.read() == get_build_fingerprint(solc_version)
+    except FileNotFoundError:
+        return False
+
+
+def write_build_stamp(fname_stamp: str, solc_version: str) -> None:
+    if opts.incremental:
+        with open(fname_stamp, "w") as f:
+            f.write(get_build_fingerprint(solc_version))
+
+
+# in the output directory of the build
+forge_stamp = "%s/.bench-forge-stamp"
+kontrol_stamp = "%s/.bench-kontrol-stamp"
+
+
+def build_forge(solc_version: str) -> None:
+    if opts.norebuild:
+        return None
+    out_dir = get_out_dir(solc_version)
+    if build_up_to_date(forge_stamp % out_dir, solc_version):
+        print("Forge build with solc %s is up to date" % solc_version)
+        return None
+
+    print("Building with forge, solc %s..." % solc_version)
+    if not opts.incremental:
+        recreate_out(out_dir)
+    cmd_line = ["forge", "build", "--ast",
+               "--extra-output", "storageLayout", "metadata"]
+    if opts.yul: cmd_line.extend(["--extra-output", "ir"])
+    cmd_line.extend(["--use", solc_version])
+    ret = subprocess.run(cmd_line, capture_output=True,
+                         env=dict(os.environ, **get_build_env(solc_version)))
+    if ret.returncode != 0:
+        print("Forge returned error(s) with solc %s" % solc_version)
+        print(printable_output(ret.stderr.decode("utf-8")))
+    ret.check_returncode()
+    write_build_stamp(forge_stamp % out_dir, solc_version)
 
 # TODO: this setup time should be reflected in the kontrol results somehow
-def build_kontrol() -> None:
+def build_kontrol(solc_version: str) -> None:
     if "kontrol" not in get_tools_used():
         return None
     if opts.norebuild:
         return None
+    out_dir = get_out_dir(solc_version)
+    if build_up_to_date(kontrol_stamp % out_dir, solc_version):
+        print("Kontrol build with solc %s is up to date" % solc_version)
+        return None
 
-    print("Building with kontrol...")
+    print("Building with kontrol, solc %s..." % solc_version)
     cmd_line = ["kontrol", "build"]
-    ret = subprocess.run(cmd_line, capture_output=True)
+    ret = subprocess.run(cmd_line, capture_output=True,
+                         env=dict(os.environ, **get_build_env(solc_version)))
     if ret.returncode != 0:
         print("Kontrol returned error(s)")
         print(printable_output(ret.stderr.decode("utf-8")))
     ret.check_returncode()
+    write_build_stamp(kontrol_stamp % out_dir, solc_version)
+
+
+# Builds with all solc versions. The forge builds run concurrently, kontrol
+# takes too much memory for that
+def build_all() -> None:
+    with ThreadPoolExecutor(max_workers=len(opts.solc_versions)) as pool:
+        for f in [pool.submit(build_forge, v) for v in opts.solc_versions]:
+            f.result()
+    for v in opts.solc_versions:
+        build_kontrol(v)
 
 available_tools = {
     "hevm-cvc5": {
@@ -68,7 +162,8 @@ available_tools = {
         "extra_opts": ["--solver","bitwuzla"],
     },
     "halmos": {
-        "call": "tools/halmos.sh",
+        "adapter": adapters.HalmosAdapter,
+        "batch": "tools/halmos_batch.sh",
         "version": "tools/halmos_version.sh",
         "extra_opts": [],
     },
@@ -136,14 +231,19 @@ def determine_expected(sol_file: str) -> Literal["safe"] | Literal["unsafe"]:
 # A case to solve by the solvers
 class Case:
     def __init__(self, contract: str, json_fname: str, sol_file: str,
-                 ds: bool, fun: str, sig: str):
+                 ds: bool, fun: str, sig: str, src_hash: str, solc_version: str):
         self.contract = contract
         self.json_fname = json_fname
         self.sol_file = sol_file
         self.ds = ds
         self.fun = fun
         self.sig = sig
+        self.src_hash = src_hash
+        # the same case is run once per solc version given by --solcv
+        self.solc_version = solc_version
         self.expected = determine_expected(sol_file)
+        # family and size of the cases generated by gen_families.py
+        self.family, self.param = get_family(sol_file, fun)
 
     def get_name(self) -> str:
         return "%s:%s:%s" % (self.sol_file, self.contract, self.fun)
@@ -153,75 +253,120 @@ class Case:
         out += "Contr: %-25s " % self.contract
         out += "Fun: %-20s " % self.fun
         out += "sig: %-20s " % self.sig
+        out += "solc: %s " % self.solc_version
         out += "DS: %s " % self.ds
         out += "Safe: %s" % self.expected
         # out += "JSON filename: %s " % self.json_fname
         return out
 
 
+# hash of all the sources the contract was compiled from, including imports,
+# as recorded by the solc metadata. Falls back to hashing the solidity file
+# itself if the metadata is not available
+def get_src_hash(js, sol_file: str) -> str:
+    h = hashlib.sha256()
+    metadata = js.get("metadata")
+    if isinstance(metadata, str):
+        metadata = json.loads(metadata)
+    if metadata is not None and "sources" in metadata:
+        for src, descr in sorted(metadata["sources"].items()):
+            h.update(("%s:%s\n" % (src, descr.get("keccak256"))).encode("utf-8"))
+    else:
+        with open(sol_file, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+# The relevant parts of the foundry build output are kept in a compact index,
+# so that the large JSON files (which contain the full AST) only need to be
+# parsed again when they change. Entries are keyed by the path of the JSON
+# file, and are reused as long as its modification time and size match. Every
+# output directory has its own index
+case_index_fname = "%s/.bench-case-index.json"
+
+
+def load_case_index(out_dir: str) -> dict:
+    try:
+        with open(case_index_fname % out_dir, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_case_index(out_dir: str, index: dict) -> None:
+    fname_tmp = case_index_fname % out_dir + ".tmp"
+    with open(fname_tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(fname_tmp, case_index_fname % out_dir)
+
+
+# parses a JSON file from the foundry build output into an index entry. Files
+# we don't take cases from get a 'sol_file' of None
+def scan_artifact(json_path: str, contract: str, st: os.stat_result) -> dict:
+    entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size,
+             "contract": contract, "sol_file": None, "src_hash": None, "funcs": []}
+    with open(json_path) as oj:
+        if opts.verbose:
+            print("Parsing: ", json_path)
+        js = json.load(oj)
+    sol_file: str = js["ast"]["absolutePath"]
+    if sol_file.startswith("src/common/") or sol_file.startswith("lib/"):
+        return entry
+    entry["sol_file"] = sol_file
+    entry["src_hash"] = get_src_hash(js, sol_file)
+    entry["funcs"] = get_relevant_funcs(js)
+    return entry
+
+
+# builds the index of the foundry build output in 'out_dir', re-parsing only
+# the JSON files that changed since the index was last saved
+def get_case_index(out_dir: str) -> dict:
+    old_index = load_case_index(out_dir)
+    index = {}
+    for sol_dir in Path(out_dir).iterdir():
+        if not sol_dir.is_dir() or sol_dir.name == "kompiled" or sol_dir.name == "build-info":
+            continue
+        for j in sol_dir.glob("*.json"):
+            json_path = f"{sol_dir}/{j.name}"
+            st = j.stat()
+            entry = old_index.get(json_path)
+            if entry is None or entry["mtime_ns"] != st.st_mtime_ns or entry["size"] != st.st_size:
+                entry = scan_artifact(json_path, j.stem, st)
+            index[json_path] = entry
+    if index != old_index:
+        save_case_index(out_dir, index)
+    return index
+
+
 # builds a mapping from solidity files to lists of contracts. we do this by
 # parsing the foundry build output, since that's easier than parsing the actual
 # solidity code to handle the case where a single solidity file contains
-# multiple contracts
+# multiple contracts. Every case is gathered once per solc version
 def gather_cases() -> list[Case]:
-    build_forge()
-    build_kontrol()
-    # build a dictionary where the key is a directory in the foundry build
-    # output, and the value is a list of contract names defined within
-    output_jsons = {
-        str(f): [j.stem for j in f.glob("*.json")]
-        for f in Path("./out").iterdir()
-        if f.is_dir() and f.name != "kompiled"
-    }
+    build_all()
 
-    # replace the path to the output json with the path to the original solidity file
     cases: list[Case] = []
-    for out_dir, contracts in output_jsons.items():
-        for c in contracts:
-            json_path = f"{out_dir}/{c}.json"
-            if json_path.startswith("out/build-info"):
+    for solc_version in opts.solc_versions:
+        for json_path, entry in sorted(get_case_index(get_out_dir(solc_version)).items()):
+            sol_file = entry["sol_file"]
+            if sol_file is None:
+                continue
+            # an incremental build leaves the output of deleted files behind
+            if not os.path.exists(sol_file):
                 continue
-            with open(json_path) as oj:
+            ds_test = determine_dstest(sol_file)
+            c = entry["contract"]
+            for fun, sig in entry["funcs"]:
+                fname = os.path.basename(sol_file)
+                casename = f"{fname}:{c}:{fun}"
                 if opts.verbose:
-                    print("Parsing: ", json_path)
-                js = json.load(oj)
-                sol_file: str = js["ast"]["absolutePath"]
-                if sol_file.startswith("src/common/") or sol_file.startswith("lib/"):
-                    continue
-                ds_test = determine_dstest(sol_file)
-                for f_and_s in get_relevant_funcs(js):
-                    fname = os.path.basename(sol_file)
-                    casename = f"{fname}:{c}:{f_and_s[0]}"
-                    if opts.verbose:
-                        print("Matching test pattern against: ", casename)
-                    if re.match(opts.testpattern, casename):
-                        cases.append(Case(c, json_path, sol_file, ds_test,
-                                          f_and_s[0], f_and_s[1]))
+                    print("Matching test pattern against: ", casename)
+                if re.match(opts.testpattern, casename):
+                    cases.append(Case(c, json_path, sol_file, ds_test,
+                                      fun, sig, entry["src_hash"], solc_version))
     return cases
 
 
-# Generates a unique temporary file. Can be run multi-threaded
-def unique_file(fname_begin, fname_end=".out"):
-        counter = 1
-        while 1:
-            fname = "out/" + fname_begin + '_' + str(counter) + fname_end
-            try:
-                fd = os.open(
-                    fname, os.O_CREAT | os.O_EXCL, stat.S_IREAD | stat.S_IWRITE)
-                os.fdopen(fd).close()
-                return fname
-            except OSError:
-                pass
-
-            counter += 1
-            if counter > 300:
-                print("Cannot create unique_file, last try was: %s" % fname)
-                exit(-1)
-
-        print("ERROR: Cannot create unique temporary file")
-        exit(-1)
-
-
 def last_line_in_file(fname: str) -> str:
     with open(fname, 'r') as f:
         lines = f.read().splitlines()
@@ -232,38 +377,163 @@ def last_line_in_file(fname: str) -> str:
 # Result from a solver
 class Result:
     def __init__(self, result: str, mem_used_MB: float|None, exit_status: int|None,
-                 perc_CPU: int|None, t: float|None, tout: float|None, memoutMB: float|None,
-                 case: Case, out:str):
+                 perc_CPU: int|None, t: float|None, t_user: float|None, t_sys: float|None,
+                 kill_reason: str|None, tout: float|None, memoutMB: float|None,
+                 case: Case, out: str|None = None, samples: list[dict]|None = None,
+                 out_ref: str|None = None, out_excerpt: str = ""):
         self.result = result
         self.exit_status = exit_status
         self.mem_used_MB = mem_used_MB
         self.perc_CPU = perc_CPU
         self.t = t
+        self.t_user = t_user
+        self.t_sys = t_sys
+        self.kill_reason = kill_reason
         self.tout = tout
         self.memoutMB = memoutMB
         self.case = case
-        self.out = out
+        # the output of the tool is only kept in the blob store, see
+        # blobstore.py
+        if out is not None:
+            out_ref = blobstore.put(out)
+            out_excerpt = blobstore.get_excerpt(out)
+        assert out_ref is not None
+        self.out_ref = out_ref
+        self.out_excerpt = out_excerpt
+        # measurements of the repeated runs, see measure_case()
+        self.samples = samples if samples is not None else []
+        # only set when the case was run in a batch, see execute_batch()
+        self.t_fun: float|None = None
+        self.t_startup: float|None = None
+        # hardware the result was measured on, see get_host_info()
+        self.worker: dict|None = None
+        # time of each phase and other metrics reported by the tool, see
+        # add_metrics()
+        self.phases: dict[str, float] = {}
+        self.metrics: dict[str, float] = {}
+        # timeout of the --timeout-ladder rung the result was found at
+        self.rung: int|None = None
+        # resources of the tool over time with --sample, see run_tool()
+        self.timeline: dict[str, list]|None = None
+
+    # the full output of the tool, loaded from the blob store
+    @property
+    def out(self) -> str:
+        return blobstore.get(self.out_ref)
+
+    def as_sample(self) -> dict:
+        return {"result": self.result, "t": self.t, "t_user": self.t_user,
+                "t_sys": self.t_sys, "memMB": self.mem_used_MB}
+
+    # Converts to a dict that can be stored as JSON. The case is not part of
+    # it, it must be supplied when converting back via result_from_dict()
+    def as_dict(self) -> dict:
+        return {
+            "result": self.result,
+            "mem_used_MB": self.mem_used_MB,
+            "exit_status": self.exit_status,
+            "perc_CPU": self.perc_CPU,
+            "t": self.t,
+            "t_user": self.t_user,
+            "t_sys": self.t_sys,
+            "kill_reason": self.kill_reason,
+            "tout": self.tout,
+            "memoutMB": self.memoutMB,
+            "out_ref": self.out_ref,
+            "out_excerpt": self.out_excerpt,
+            "samples": self.samples,
+            "t_fun": self.t_fun,
+            "t_startup": self.t_startup,
+            "worker": self.worker,
+            "phases": self.phases,
+            "metrics": self.metrics,
+            "rung": self.rung,
+            "timeline": self.timeline}
+
+
+def result_from_dict(d: dict, case: Case) -> Result:
+    res = Result(result=d["result"], mem_used_MB=d["mem_used_MB"],
+                 exit_status=d["exit_status"], perc_CPU=d["perc_CPU"],
+                 t=d["t"], t_user=d.get("t_user"), t_sys=d.get("t_sys"),
+                 kill_reason=d.get("kill_reason"), tout=d["tout"],
+                 memoutMB=d["memoutMB"], case=case, out=d.get("out"),
+                 samples=d.get("samples"), out_ref=d.get("out_ref"),
+                 out_excerpt=d.get("out_excerpt", ""))
+    res.t_fun = d.get("t_fun")
+    res.t_startup = d.get("t_startup")
+    res.worker = d.get("worker")
+    res.phases = d.get("phases", {})
+    res.metrics = d.get("metrics", {})
+    res.rung = d.get("rung")
+    res.timeline = d.get("timeline")
+    return res
+
+
+# Adds the phases and metrics reported by the tool to the result. Values
+# reported several times are added up. 'share' is the share of the values
+# that belongs to this result, when a batch reports them for all its cases
+# together
+def add_metrics(r: Result, lines: list[dict], share: float = 1.0) -> None:
+    for d in lines:
+        if "phase" in d:
+            r.phases[d["phase"]] = r.phases.get(d["phase"], 0.0) + d["t"] * share
+        else:
+            r.metrics[d["metric"]] = r.metrics.get(d["metric"], 0.0) + d["value"] * share
+
+
+# executes the given tool against the given test case and returns the result
+def execute_case(descr, case: Case) -> Result:
+    if "adapter" in descr:
+        return execute_adapter(descr["adapter"], descr["extra_opts"], case)
+    return execute_script(descr["call"], descr["extra_opts"], case)
+
+
+# runs the tool via its adapter, which classifies the output while the tool
+# runs, and stops the tool as soon as the verdict is final
+def execute_adapter(adapter_class, extra_opts: list[str], case: Case) -> Result:
+    adapter = adapter_class(sol_file=case.sol_file, contract=case.contract,
+                            fun=case.fun, sig=case.sig, ds=case.ds,
+                            tout=opts.timeout, memoutMB=opts.memoutMB,
+                            dump_smt=opts.dump_smt, extra_opts=extra_opts)
+    toexec = adapter.get_cmd()
+    print("Running: %s" % (" ".join(toexec)))
+    res = run_tool(toexec, opts.timeout, opts.memoutMB, opts.cgroup,
+                   on_line=adapter.feed, max_lines=adapters.kept_lines,
+                   sample_interval=opts.sample_interval,
+                   env=get_build_env(case.solc_version))
+    result = adapter.finish(res.exit_status, res.t)
+
+    if opts.verbose:
+        print("Res output is:", res.stderr)
+        if res.stopped_early:
+            print("Stopped the tool, its verdict was final")
+    if res.kill_reason is not None or result is None:
+        result = "unknown"
+
+    assert result == "safe" or result == "unsafe" or result == "unknown"
+    if opts.verbose:
+        print("Result is: ", result)
+
+    ret = Result(result=result, mem_used_MB=res.mem_used_MB,
+                 perc_CPU=res.get_perc_CPU(), exit_status=res.exit_status,
+                 t=res.t, t_user=res.t_user, t_sys=res.t_sys,
+                 kill_reason=res.kill_reason, tout=opts.timeout,
+                 memoutMB=opts.memoutMB, case=case, out=res.stderr)
+    add_metrics(ret, adapter.metrics + parse_metrics(res.metrics))
+    ret.timeline = res.timeline
+    return ret
 
 
-# executes the given tool script against the given test case and returns the
-# result
-def execute_case(tool: str, extra_opts: list[str], case: Case) -> Result:
-    time_taken = None
+# executes the given tool script against the given test case
+def execute_script(tool: str, extra_opts: list[str], case: Case) -> Result:
     result = None
-    res = None
-    before = time.time_ns()
-    fname_time = unique_file("output")
-    toexec = ["time", "--verbose", "-o", "%s" % fname_time,
-              tool, case.sol_file, case.contract, case.fun, case.sig,
+    toexec = [tool, case.sol_file, case.contract, case.fun, case.sig,
               "%i" % case.ds, "%s" % opts.timeout, "%s" % (opts.memoutMB), "%d" % (opts.dump_smt)]
     toexec.extend(extra_opts)
     print("Running: %s" % (" ".join(toexec)))
-    res = subprocess.run(toexec, capture_output=True, encoding="utf-8")
-    after = time.time_ns()
-    out_of_time = False
-    mem_used_MB = None
-    exit_status = None
-    perc_CPU = None
+    res = run_tool(toexec, opts.timeout, opts.memoutMB, opts.cgroup,
+                   sample_interval=opts.sample_interval,
+                   env=get_build_env(case.solc_version))
 
     if opts.verbose:
         print("Res stdout is:", res.stdout)
@@ -273,34 +543,116 @@ def execute_case(tool: str, extra_opts: list[str], case: Case) -> Result:
         match = re.match("result: (.*)$", line)
         if match:
             result = match.group(1)
-    time_taken = (after - before) / 1_000_000_000
-    if out_of_time or result is None:
+    if res.kill_reason is not None or result is None:
         result = "unknown"
 
-    # parse `time --verbose` output
-    with open(fname_time, 'r') as f:
-        for line in f:
-            line = line.strip()
-            match = re.match(r"Maximum resident set size .kbytes.: (.*)", line)
-            if match:
-                mem_used_MB = int(match.group(1))/1000
+    assert result == "safe" or result == "unsafe" or result == "unknown"
+    if opts.verbose:
+        print("Result is: ", result)
 
-            match = re.match(r"Percent of CPU this job got: (.*)%", line)
-            if match:
-                perc_CPU = int(match.group(1))
+    ret = Result(result=result, mem_used_MB=res.mem_used_MB,
+                 perc_CPU=res.get_perc_CPU(), exit_status=res.exit_status,
+                 t=res.t, t_user=res.t_user, t_sys=res.t_sys,
+                 kill_reason=res.kill_reason, tout=opts.timeout,
+                 memoutMB=opts.memoutMB, case=case, out=res.stderr)
+    add_metrics(ret, parse_metrics(res.metrics))
+    ret.timeline = res.timeline
+    return ret
 
-            match = re.match(r"Exit status:[ ]*(.*)[ ]*$", line)
-            if match:
-                exit_status = int(match.group(1))
 
-    assert result == "safe" or result == "unsafe" or result == "unknown"
-    os.unlink(fname_time)
+# executes the given batch tool script against several cases of the same
+# contract in a single process, and splits its output into a result per case.
+# The script reports the time each function took, the rest of the wall clock
+# time is the fixed startup cost of the tool. The time of each case is its
+# own time plus an equal share of the startup cost, so that the times of the
+# batch add up to its wall clock time. The batch gets the timeout of all its
+# cases together, but a case that took longer than the timeout by itself is
+# unknown
+def execute_batch(tool: str, extra_opts: list[str], cases: list[Case]) -> list[Result]:
+    c0 = cases[0]
+    fun_regex = "^(%s)(\\(|$)" % "|".join([re.escape(c.fun) for c in cases])
+    tout = opts.timeout * len(cases)
+    toexec = [tool, c0.sol_file, c0.contract, fun_regex, "%i" % c0.ds,
+              "%s" % tout, "%s" % (opts.memoutMB), "%d" % (opts.dump_smt)]
+    toexec.extend(extra_opts)
+    print("Running: %s" % (" ".join(toexec)))
+    res = run_tool(toexec, tout, opts.memoutMB, opts.cgroup,
+                   sample_interval=opts.sample_interval,
+                   env=get_build_env(c0.solc_version))
+
     if opts.verbose:
-        print("Result is: ", result)
+        print("Res stdout is:", res.stdout)
+        print("Res stderr is:", res.stderr)
+    verdicts: dict[str, str] = {}
+    fun_times: dict[str, float] = {}
+    for line in res.stdout.split("\n"):
+        line = line.strip()
+        match = re.match(r"result: (\S+) (safe|unsafe|unknown)$", line)
+        if match:
+            verdicts[match.group(1)] = match.group(2)
+        match = re.match(r"time: (\S+) ([0-9.]+)$", line)
+        if match:
+            fun_times[match.group(1)] = float(match.group(2))
 
-    return Result(result=result, mem_used_MB=mem_used_MB,
-                  perc_CPU=perc_CPU, exit_status=exit_status,
-                  t=time_taken, tout=opts.timeout, memoutMB=opts.memoutMB, case=case, out=res.stderr)
+    t_startup = max(0.0, res.t - sum(fun_times.values()))
+    # metrics without a function are shared by all cases
+    metrics = parse_metrics(res.metrics)
+    shared_metrics = [d for d in metrics if "fun" not in d]
+    ret = []
+    for c in cases:
+        result = verdicts.get(c.fun, "unknown")
+        t_fun = fun_times.get(c.fun)
+        kill_reason = None
+        if c.fun not in verdicts:
+            kill_reason = res.kill_reason
+        elif t_fun is not None and t_fun > opts.timeout:
+            result = "unknown"
+            kill_reason = "timeout"
+        if t_fun is None:
+            t = res.t / len(cases)
+        else:
+            t = t_fun + t_startup / len(cases)
+        r = Result(result=result, mem_used_MB=res.mem_used_MB,
+                   perc_CPU=res.get_perc_CPU(), exit_status=res.exit_status,
+                   t=t, t_user=None, t_sys=None, kill_reason=kill_reason,
+                   tout=opts.timeout, memoutMB=opts.memoutMB, case=c, out=res.stderr)
+        r.t_fun = t_fun
+        r.t_startup = t_startup
+        r.samples = [r.as_sample()]
+        add_metrics(r, [d for d in metrics if d.get("fun") == c.fun])
+        add_metrics(r, shared_metrics, 1.0 / len(cases))
+        # the timeline is of the whole batch
+        r.timeline = res.timeline
+        ret.append(r)
+    return ret
+
+
+# runs the case opts.warmup times without recording anything, then
+# opts.repeat times. The returned result is the run with the median time, with
+# the time set to the median of all runs, the memory to the maximum of all
+# runs, and all runs attached as samples. A measured run that hits a limit is
+# not repeated, the next runs would just hit it again. A warm-up run that hits
+# a limit ends the warm-up, but is never the measurement: the case may only
+# hit it cold, so it is still measured at least once
+def measure_case(descr, case: Case) -> Result:
+    for _ in range(opts.warmup):
+        res = execute_case(descr, case)
+        if res.kill_reason is not None:
+            break
+
+    runs = []
+    for _ in range(opts.repeat):
+        res = execute_case(descr, case)
+        runs.append(res)
+        if res.kill_reason is not None:
+            break
+
+    by_time = sorted(runs, key=lambda r: r.t)
+    ret = by_time[(len(by_time)-1)//2]
+    ret.samples = [r.as_sample() for r in runs]
+    ret.t = statistics.median([r.t for r in runs])
+    ret.mem_used_MB = max(r.mem_used_MB for r in runs)
+    return ret
 
 
 def get_version(script: str) -> str:
@@ -311,20 +663,580 @@ def get_version(script: str) -> str:
     return res.stdout.rstrip()
 
 
+# Results of earlier runs are cached on disk, keyed by a hash of everything
+# that can influence the result: the tool script (the batch script in batch
+# mode) and the helpers it sources, the tool's version and options, the
+# sources of the contract, the case itself, the solc version, and the limits
+cache_dir = "result-cache"
+
+
+def hash_file(fname: str) -> str:
+    with open(fname, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# the script or adapter that runs the tool, and the file it's defined in
+def get_tool_call(descr) -> tuple[str, str]:
+    if "adapter" in descr:
+        return ("adapters.%s" % descr["adapter"].__name__, adapters.__file__)
+    return (descr["call"], descr["call"])
+
+
+# helpers sourced by the tool scripts, they change the behavior of the scripts
+# just as much as the scripts themselves
+tool_helpers = ["tools/utils.sh"]
+
+
+def get_cache_key(descr, version: str, case: Case) -> str:
+    call, call_fname = get_tool_call(descr)
+    key = {
+        "call": call,
+        "call_hash": hash_file(call_fname),
+        "helper_hashes": {fname: hash_file(fname) for fname in tool_helpers},
+        "version": version,
+        "extra_opts": descr["extra_opts"],
+        "src_hash": case.src_hash,
+        "sol_file": case.sol_file,
+        "contract": case.contract,
+        "fun": case.fun,
+        "sig": case.sig,
+        "ds": case.ds,
+        "solc_version": case.solc_version,
+        "yul": opts.yul,
+        "timeout": opts.timeout,
+        "memoutMB": opts.memoutMB,
+        "repeat": opts.repeat,
+        "warmup": opts.warmup,
+        "batch": use_batch(descr)}
+    # in batch mode, the batch script runs the tool instead of the call
+    if use_batch(descr):
+        key["batch_hash"] = hash_file(descr["batch"])
+    # results without a timeline can't be used when one is asked for
+    if opts.sample_interval is not None:
+        key["sample_interval"] = opts.sample_interval
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_cache_fname(key: str) -> str:
+    return "%s/%s/%s.json" % (cache_dir, key[:2], key)
+
+
+def load_cached_result(key: str, case: Case) -> Result|None:
+    try:
+        with open(get_cache_fname(key), "r") as f:
+            return result_from_dict(json.load(f), case)
+    except FileNotFoundError:
+        return None
+
+
+# Writes to a temporary file first, so an interrupted run can't leave a
+# truncated entry behind. Can be run multi-threaded
+def store_cached_result(key: str, res: Result) -> None:
+    fname = get_cache_fname(key)
+    os.makedirs(os.path.dirname(fname), exist_ok=True)
+    fname_tmp = "%s.%d.%d.tmp" % (fname, os.getpid(), threading.get_ident())
+    with open(fname_tmp, "w") as f:
+        json.dump(res.as_dict(), f)
+    os.replace(fname_tmp, fname)
+
+
+# Runs the case with the given tool, unless it's found in the cache. Dumping
+# SMT files is a side effect that the cache can't reproduce, so the cache is
+# bypassed in that case
+def run_case(descr, version: str, case: Case) -> Result:
+    if opts.no_cache or opts.dump_smt:
+        return measure_case(descr, case)
+
+    key = get_cache_key(descr, version, case)
+    if not opts.refresh_cache:
+        res = load_cached_result(key, case)
+        if res is not None:
+            print("Cached: %s %s" % (get_tool_call(descr)[0], case.get_name()))
+            return res
+    res = measure_case(descr, case)
+    store_cached_result(key, res)
+    return res
+
+
+# Runs the cases, all from the same contract, as a single batch with the
+# batch script of the tool. Cases found in the cache are left out of the batch
+def run_batch(descr, version: str, cases: list[Case]) -> list[Result]:
+    ret: dict[str, Result] = {}
+    keys = {}
+    todo = cases
+    if not opts.no_cache:
+        todo = []
+        for c in cases:
+            keys[c.fun] = get_cache_key(descr, version, c)
+            res = None
+            if not opts.refresh_cache:
+                res = load_cached_result(keys[c.fun], c)
+            if res is not None:
+                print("Cached: %s %s" % (descr["batch"], c.get_name()))
+                ret[c.fun] = res
+            else:
+                todo.append(c)
+
+    if len(todo) > 0:
+        for res in execute_batch(descr["batch"], descr["extra_opts"], todo):
+            ret[res.case.fun] = res
+            if not opts.no_cache:
+                store_cached_result(keys[res.case.fun], res)
+    return [ret[c.fun] for c in cases]
+
+
+# Total physical memory of the machine, in MB
+def get_phys_mem_MB() -> int:
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1000*1000)
+
+
+# Description of the machine the benchmarks run on. It's stored with every
+# result, so results measured by different workers can be told apart
+def get_host_info() -> dict:
+    cpu_model = platform.processor()
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except FileNotFoundError:
+        pass
+    return {"hostname": socket.gethostname(), "cpu_model": cpu_model,
+            "cpus": os.cpu_count(), "memMB": get_phys_mem_MB(),
+            "platform": platform.platform()}
+
+
+host_info: dict = {}
+
+
+# Admits jobs only while the sum of their memory limits fits into the total
+# budget, so concurrent runs cannot push the machine into swap. A job that is
+# larger than the whole budget is still admitted, but only when nothing else
+# is running.
+class MemoryBudget:
+    def __init__(self, totalMB: int):
+        self.totalMB = totalMB
+        self.usedMB = 0
+        self.cond = threading.Condition()
+
+    def acquire(self, MB: int) -> None:
+        with self.cond:
+            while self.usedMB > 0 and self.usedMB + MB > self.totalMB:
+                self.cond.wait()
+            self.usedMB += MB
+
+    def release(self, MB: int) -> None:
+        with self.cond:
+            self.usedMB -= MB
+            self.cond.notify_all()
+
+
+# Every result is appended to the journal of the run as soon as it's
+# available, so an interrupted run can be continued via --resume. The first
+# line holds the options the run was started with, every further line holds a
+# single result
+class Journal:
+    def __init__(self, run_id: str, resume: bool, versions: dict[str, str], cases: list[Case]):
+        self.fname = "results-tstamp-%s.jsonl" % run_id
+        self.finished: dict[tuple[str, str, str], dict] = {}
+        # the versions and the cases are needed to merge the journals of the
+        # shards of a run, see merge_shards.py
+        header = {"run": run_id, "solc_version": opts.solc_version,
+                  "timeout": opts.timeout, "memoutMB": opts.memoutMB,
+                  "tools": opts.tools, "testpattern": opts.testpattern,
+                  "seed": opts.seed, "limit": opts.limit,
+                  "repeat": opts.repeat, "warmup": opts.warmup,
+                  "batch": opts.batch, "ladder": opts.ladder,
+                  "shard": opts.shard, "versions": versions,
+                  "cases": [[c.get_name(), c.solc_version] for c in cases]}
+        if resume:
+            self.load(header)
+            self.f = open(self.fname, "a")
+        else:
+            self.f = open(self.fname, "w")
+            self.write(header)
+
+    def load(self, header: dict) -> None:
+        try:
+            with open(self.fname, "r") as f:
+                lines = f.read().split("\n")
+        except FileNotFoundError:
+            print("ERROR: cannot resume, journal '%s' does not exist" % self.fname)
+            exit(-1)
+        old_header = json.loads(lines[0])
+        for k, v in header.items():
+            if old_header.get(k) != v:
+                print("ERROR: cannot resume, option '%s' was '%s' in the original run, but it's '%s' now" % (k, old_header.get(k), v))
+                exit(-1)
+        for line in lines[1:]:
+            # the last line may have been cut short by a crash
+            try:
+                d = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self.finished[(d["solver"], d["name"], d["solc_version"])] = d
+        # make sure we don't append to a partially written line
+        if lines[-1] != "":
+            with open(self.fname, "a") as f:
+                f.write("\n")
+        print("Resuming run %s, %d results already finished" % (header["run"], len(self.finished)))
+
+    def write(self, d: dict) -> None:
+        self.f.write(json.dumps(d) + "\n")
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def append(self, solver: str, res: Result) -> None:
+        d = res.as_dict()
+        d["solver"] = solver
+        d["name"] = res.case.get_name()
+        d["sig"] = res.case.sig
+        d["solc_version"] = res.case.solc_version
+        self.write(d)
+
+    def get_finished(self, solver: str, case: Case) -> Result|None:
+        d = self.finished.get((solver, case.get_name(), case.solc_version))
+        if d is None:
+            return None
+        return result_from_dict(d, case)
+
+    def close(self) -> None:
+        self.f.close()
+
+
+# whether the case belongs to the shard given by --shard. Only the name of the
+# case decides, not the order of the cases or the seed
+def in_shard(case: Case) -> bool:
+    h = int(hashlib.sha256(case.get_name().encode("utf-8")).hexdigest()[:16], 16)
+    return h % opts.num_shards == opts.shard_idx - 1
+
+
+# name of the tool in the result files. It's unique to the tool, its version,
+# and the run
+def get_solver_name(tool: str, version: str) -> str:
+    return "%s-%s-tstamp-%s" % (tool, version, opts.timestamp)
+
+
+# whether the cases of the tool are run in batches, one per contract
+def use_batch(descr) -> bool:
+    return opts.batch and "batch" in descr and not opts.dump_smt
+
+
+# A unit of work: either a single case, or all cases of a contract that are
+# run as a batch. 'idxs' are the indices of the cases in the case list
+class Job:
+    def __init__(self, solver: str, tool: str, descr, version: str, idxs: list[int], cases: list[Case]):
+        self.solver = solver
+        self.tool = tool
+        self.descr = descr
+        self.version = version
+        self.idxs = idxs
+        self.cases = cases
+        # predicted wall clock time of the job, see predict_time()
+        self.predicted = 0.0
+        # actual wall clock time of the job, once it's finished
+        self.t_wall: float|None = None
+
+    def run(self) -> list[Result]:
+        start = time()
+        if use_batch(self.descr):
+            ret = run_batch(self.descr, self.version, self.cases)
+        else:
+            ret = [run_case(self.descr, self.version, c) for c in self.cases]
+        self.t_wall = time() - start
+        # cached results keep the machine they were measured on
+        for r in ret:
+            if r.worker is None:
+                r.worker = host_info
+        return ret
+
+
+# Predicts the time a tool takes on a case from the earlier results in
+# results.db: the median time of the same version of the tool, or of any
+# version if this one was never run on the case. Without any history, the
+# case is assumed to run until the timeout
+def predict_time(history: dict[tuple[str, str, str], list[float]],
+                 tool: str, version: str, case: Case) -> float:
+    name = case.get_name()
+    times = history.get((tool, version, name))
+    if times is None:
+        times = [t for (tool2, _, name2), ts in history.items()
+                 if tool2 == tool and name2 == name for t in ts]
+    if len(times) == 0:
+        return opts.timeout
+    return min(statistics.median(times), opts.timeout)
+
+
+def format_duration(secs: float) -> str:
+    secs = int(secs)
+    return "%dh%02dm%02ds" % (secs // 3600, (secs // 60) % 60, secs % 60)
+
+
+# whether the result is unknown because it ran out of time, so that a larger
+# timeout might solve it
+def hit_timeout(r: Result) -> bool:
+    if r.result not in [None, "unknown"]:
+        return False
+    return r.kill_reason == "timeout" or (r.t is not None and r.t >= r.tout)
+
+
 # executes all tests contained in the argument cases mapping with all tools and
-# builds the result dict
-def run_all_tests(tools, cases: list[Case]) -> dict[str, list[Result]]:
+# builds the result dict. Pairs already finished according to the journal are
+# not run again. With a timeout ladder, all pairs are run with the timeout of
+# the first rung, and the ones that timed out with the next rung, and so on.
+# The results get the timeout of the last rung, as if all were run with it
+def run_all_tests(tools, versions: dict[str, str], cases: list[Case],
+                  journal: Journal) -> dict[str, list[Result]]:
     results: dict[str, list[Result]] = {}
-    for tool, descr in tools.items():
-        version = get_version(descr["version"])
-        res = []
-        for c in cases:
-            res.append(execute_case(descr["call"], descr["extra_opts"], c))
-        name = "%s-%s-tstamp-%s" % (tool, version, opts.timestamp)
-        results[name] = res
+    todo: dict[str, list[int]] = {}
+    solvers = {get_solver_name(tool, versions[tool]): (tool, versions[tool], len(cases)) for tool in tools}
+    progress = Progress(opts.timestamp, solvers, opts.status_fname, opts.status_interval)
+    for name in solvers:
+        results[name] = [None] * len(cases)
+        todo[name] = []
+        for i, c in enumerate(cases):
+            res = journal.get_finished(name, c)
+            if res is not None:
+                results[name][i] = res
+                progress.add(name, res, resumed=True)
+            else:
+                todo[name].append(i)
+    progress.begin()
+
+    top = opts.ladder[-1]
+    for rung in opts.ladder:
+        opts.timeout = rung
+        if len(opts.ladder) > 1:
+            print("Running %d cases with timeout %ds" % (sum(len(idxs) for idxs in todo.values()), rung))
+        jobs = get_jobs(tools, versions, cases, todo)
+        todo = {name: [] for name in todo}
+
+        # results that timed out before the last rung are only journaled
+        # once they are final, an interrupted run starts them from the
+        # first rung again
+        def store(job: Job, res: list[Result]) -> None:
+            for i, r in zip(job.idxs, res):
+                if len(opts.ladder) > 1:
+                    r.rung = rung
+                if rung != top and hit_timeout(r):
+                    todo[job.solver].append(i)
+                    continue
+                r.tout = top
+                results[job.solver][i] = r
+                journal.append(job.solver, r)
+                progress.add(job.solver, r)
+
+        run_jobs(tools, jobs, store, progress)
+    progress.end()
     return results
 
 
+# the jobs running the cases of the given indices with all tools. Cases of a
+# contract built by the same solc version are run in a single job if the tool
+# runs them in batches
+def get_jobs(tools, versions: dict[str, str], cases: list[Case],
+             todo: dict[str, list[int]]) -> list[Job]:
+    jobs: list[Job] = []
+    for tool, descr in tools.items():
+        version = versions[tool]
+        name = get_solver_name(tool, version)
+        batches: dict[tuple[str, str, str], Job] = {}
+        for i in todo[name]:
+            c = cases[i]
+            if not use_batch(descr):
+                jobs.append(Job(name, tool, descr, version, [i], [c]))
+                continue
+            contract = (c.sol_file, c.contract, c.solc_version)
+            if contract not in batches:
+                batches[contract] = Job(name, tool, descr, version, [], [])
+                jobs.append(batches[contract])
+            batches[contract].idxs.append(i)
+            batches[contract].cases.append(c)
+    return jobs
+
+
+# runs the jobs, calling 'store' with the results of each job. With
+# opts.jobs > 1, the jobs are run concurrently, each reserving opts.memoutMB
+# from the memory budget
+def run_jobs(tools, jobs: list[Job], store, progress: Progress) -> None:
+    with closing(resultsdb.connect()) as con:
+        history = resultsdb.get_history(con, list(tools.keys()))
+    for job in jobs:
+        job.predicted = (opts.warmup + opts.repeat) * sum(
+            predict_time(history, job.tool, job.version, c) for c in job.cases)
+    # longest processing time first: the long jobs are started early, when
+    # there are still short ones left to fill the gaps in the end
+    if opts.order == "lpt":
+        jobs.sort(key=lambda job: job.predicted, reverse=True)
+
+    # time until all jobs are finished. The jobs run in parallel, but none of
+    # them can finish before its own predicted time. The predictions are
+    # corrected by how far off they were for the jobs finished so far
+    t_predicted = 0.0
+    t_actual = 0.0
+
+    def get_remaining(jobs_left: list[Job]) -> float:
+        if len(jobs_left) == 0:
+            return 0.0
+        factor = 1.0
+        if t_predicted > 0 and t_actual > 0:
+            factor = t_actual / t_predicted
+        total = sum(job.predicted for job in jobs_left)
+        return factor * max(total / max(opts.jobs, 1), max(job.predicted for job in jobs_left))
+
+    jobs_left = list(jobs)
+    print("Running %d jobs, predicted time: %s" % (len(jobs), format_duration(get_remaining(jobs_left))))
+    progress.set_remaining(get_remaining(jobs_left))
+
+    def store_progress(job: Job, res: list[Result]) -> None:
+        nonlocal t_predicted, t_actual
+        store(job, res)
+        jobs_left.remove(job)
+        if job.t_wall is not None:
+            t_predicted += job.predicted
+            t_actual += job.t_wall
+        remaining = get_remaining(jobs_left)
+        progress.set_remaining(remaining)
+        progress.update(show=False)
+        eta = strftime("%H:%M:%S", gmtime(time() + remaining))
+        print("Finished %d/%d jobs, remaining: %s, ETA: %s UTC" % (
+            len(jobs) - len(jobs_left), len(jobs), format_duration(remaining), eta))
+
+    if opts.listen is not None:
+        run_coordinator(jobs, store_progress)
+        return
+
+    if opts.jobs <= 1:
+        for job in jobs:
+            store_progress(job, job.run())
+        return
+
+    budget = MemoryBudget(opts.membudgetMB)
+    print("Running %d jobs in parallel, memory budget: %d MB" % (opts.jobs, opts.membudgetMB))
+
+    def run_job(job: Job) -> list[Result]:
+        budget.acquire(opts.memoutMB)
+        try:
+            return job.run()
+        finally:
+            budget.release(opts.memoutMB)
+
+    with ThreadPoolExecutor(max_workers=opts.jobs) as pool:
+        futures = {pool.submit(run_job, job): job for job in jobs}
+        for f in as_completed(futures):
+            store_progress(futures[f], f.result())
+
+
+# Options of the run the workers must use, see run_worker()
+worker_config = ["solc_version", "yul", "testpattern", "timeout", "memoutMB",
+                 "repeat", "warmup", "batch", "dump_smt", "no_cache", "refresh_cache",
+                 "sample_interval"]
+
+
+# Hands out the jobs to the workers connecting to opts.listen, instead of
+# running them here. Each worker sends back the results with the description
+# of its hardware. Results of jobs that failed on every try are unknown
+def run_coordinator(jobs: list[Job], store) -> None:
+    config = {k: getattr(opts, k) for k in worker_config}
+    config["tools"] = ",".join(sorted(set(job.tool for job in jobs)))
+
+    def encode_job(job: Job) -> dict:
+        return {"tool": job.tool, "version": job.version,
+                "cases": [c.get_name() for c in job.cases],
+                "solc_versions": [c.solc_version for c in job.cases],
+                "src_hashes": [c.src_hash for c in job.cases]}
+
+    # the time the job can take at most, with plenty of slack for the
+    # killing of the tool and for the transfer of the results
+    def get_deadline(job: Job) -> float:
+        return (opts.warmup + opts.repeat) * len(job.cases) * (opts.timeout + 30) + 60
+
+    def store_results(job: Job, worker: dict, res: list[dict]) -> None:
+        ret = []
+        for d, c in zip(res, job.cases):
+            r = result_from_dict(d, c)
+            if r.worker is None:
+                r.worker = worker
+            ret.append(r)
+        job.t_wall = sum(s["t"] for r in ret for s in r.samples if s["t"] is not None)
+        store(job, ret)
+
+    def lose(job: Job) -> None:
+        ret = []
+        for c in job.cases:
+            r = Result(result="unknown", mem_used_MB=None, exit_status=None,
+                       perc_CPU=None, t=None, t_user=None, t_sys=None,
+                       kill_reason="lost", tout=opts.timeout,
+                       memoutMB=opts.memoutMB, case=c, out="")
+            r.samples = [r.as_sample()]
+            ret.append(r)
+        store(job, ret)
+
+    coordinator = distributed.Coordinator(opts.listen, config, jobs, encode_job,
+                                          get_deadline, store_results, lose)
+    coordinator.run()
+
+
+# Runs jobs for the coordinator at opts.worker, until it has none left. The
+# options of the run are taken from the coordinator, the build is done here.
+# With opts.jobs > 1, that many jobs are run in parallel, each over its own
+# connection
+def run_worker() -> None:
+    lock = threading.Lock()
+    cases: dict[tuple[str, str], Case] = {}
+    versions: dict[str, str] = {}
+    budget = MemoryBudget(opts.membudgetMB)
+    ready = threading.Event()
+
+    def setup(config: dict) -> None:
+        with lock:
+            if ready.is_set():
+                return
+            for k in worker_config + ["tools"]:
+                setattr(opts, k, config[k])
+            opts.solc_versions = opts.solc_version.split(",")
+            for c in gather_cases():
+                cases[(c.get_name(), c.solc_version)] = c
+            for tool in get_tools_used():
+                versions[tool] = get_version(available_tools[tool]["version"])
+            ready.set()
+
+    def run_job(msg: dict) -> list[dict]:
+        tool = msg["tool"]
+        if versions[tool] != msg["version"]:
+            raise Exception("version of %s is '%s' instead of '%s'" % (tool, versions[tool], msg["version"]))
+        job_cases = []
+        for name, solc_version, src_hash in zip(msg["cases"], msg["solc_versions"], msg["src_hashes"]):
+            c = cases.get((name, solc_version))
+            if c is None:
+                raise Exception("case %s with solc %s was not found" % (name, solc_version))
+            if c.src_hash != src_hash:
+                raise Exception("sources of case %s differ from the coordinator's" % name)
+            job_cases.append(c)
+        job = Job(tool, tool, available_tools[tool], versions[tool], [], job_cases)
+        budget.acquire(opts.memoutMB)
+        try:
+            res = job.run()
+        finally:
+            budget.release(opts.memoutMB)
+        # the output is sent along, the worker's blob store is not shared
+        return [dict(r.as_dict(), out=r.out) for r in res]
+
+    threads = []
+    for _ in range(opts.jobs):
+        thread = threading.Thread(target=distributed.run_worker,
+                                  args=(opts.worker, host_info, setup, run_job))
+        thread.start()
+        threads.append(thread)
+        # the first connection does the build, the others wait for it
+        if len(threads) == 1:
+            while not ready.is_set() and thread.is_alive():
+                thread.join(0.1)
+    for thread in threads:
+        thread.join()
+
+
 # Encodes the 'Result' class into JSON
 class ResultEncoder(json.JSONEncoder):
     def default(self, o):
@@ -336,33 +1248,47 @@ class ResultEncoder(json.JSONEncoder):
                 correct = None
             return {
                 "name": o.case.get_name(),
-                "solc_version": opts.solc_version,
+                "solc_version": o.case.solc_version,
                 "ds": o.case.ds,
+                "family": o.case.family,
+                "param": o.case.param,
                 "solved": solved,
                 "correct": correct,
                 "t": o.t,
+                "t_user": o.t_user,
+                "t_sys": o.t_sys,
                 "tout": o.tout,
                 "memMB": o.mem_used_MB,
+                "kill_reason": o.kill_reason,
                 "exit_status": o.exit_status,
-                "out": o.out}
+                "out_ref": o.out_ref,
+                "out_excerpt": o.out_excerpt,
+                "samples": o.samples,
+                "t_fun": o.t_fun,
+                "t_startup": o.t_startup,
+                "worker": o.worker,
+                "phases": o.phases,
+                "metrics": o.metrics,
+                "rung": o.rung,
+                "timeline": o.timeline}
         return json.JSONEncoder.default(self, o)
 
 
-# Returns empty string if value is None. This is converted to NULL in SQLite
-def empty_if_none(x: None|int|float) -> str:
+# Returns empty string if value is None
+def empty_if_none(x: None|int|float|str) -> str:
     if x is None:
         return ""
     else:
         return "%s" % x
 
 
-# Dump results in SQLite and CSV, so they can be analyzed via
-# SQL/Libreoffice/commend line
+# Dump results in JSON and CSV, so they can be analyzed via
+# jq/Libreoffice/commend line
 def dump_results(solvers_results: dict[str, list[Result]], fname: str):
     with open("%s.json" % fname, "w") as f:
         f.write(json.dumps(solvers_results, indent=2, cls=ResultEncoder))
     with open("%s.csv" % fname, "w", newline='') as f:
-        fieldnames = ["solver", "solc_version", "name", "fun", "sig", "result", "correct", "t", "timeout", "memoutMB", "memMB", "exit_status", "output"]
+        fieldnames = ["solver", "solc_version", "name", "fun", "sig", "family", "param", "result", "correct", "t", "timeout", "memoutMB", "memMB", "exit_status", "output", "output_ref", "t_user", "t_sys", "perc_CPU", "kill_reason", "t_fun", "t_startup", "worker", "paths", "queries", "t_solver", "rung"]
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         for solver, results in solvers_results.items():
@@ -371,14 +1297,71 @@ def dump_results(solvers_results: dict[str, list[Result]], fname: str):
                 if r.result is not None:
                     corr_as_sqlite = (int)(r.result == r.case.expected)
                 writer.writerow({
-                    "solver": solver, "solc_version": opts.solc_version,
+                    "solver": solver, "solc_version": r.case.solc_version,
                     "name": r.case.get_name(), "fun": r.case.fun,
-                    "sig": r.case.sig, "result": r.result,
+                    "sig": r.case.sig, "family": empty_if_none(r.case.family),
+                    "param": empty_if_none(r.case.param), "result": r.result,
                     "correct": corr_as_sqlite, "t": empty_if_none(r.t),
                     "timeout": r.tout,
                     "memoutMB": r.memoutMB,
                     "memMB": empty_if_none(r.mem_used_MB),
-                    "exit_status": empty_if_none(r.exit_status), "output": r.out})
+                    "exit_status": empty_if_none(r.exit_status),
+                    "output": r.out_excerpt, "output_ref": r.out_ref,
+                    "t_user": empty_if_none(r.t_user), "t_sys": empty_if_none(r.t_sys),
+                    "perc_CPU": empty_if_none(r.perc_CPU),
+                    "kill_reason": empty_if_none(r.kill_reason),
+                    "t_fun": empty_if_none(r.t_fun),
+                    "t_startup": empty_if_none(r.t_startup),
+                    "worker": "" if r.worker is None else r.worker["hostname"],
+                    "paths": empty_if_none(r.metrics.get("paths")),
+                    "queries": empty_if_none(r.metrics.get("queries")),
+                    "t_solver": empty_if_none(r.metrics.get("t_solver")),
+                    "rung": empty_if_none(r.rung)})
+
+
+# the result in the format of resultsdb.store_run()
+def get_db_row(tool: str, version: str, r: Result) -> dict:
+    correct = None
+    if r.result is not None:
+        correct = int(r.result == r.case.expected)
+    return {
+        "tool": tool, "version": version,
+        "case": {"name": r.case.get_name(), "sol_file": r.case.sol_file,
+                 "contract": r.case.contract, "fun": r.case.fun,
+                 "sig": r.case.sig, "ds": int(r.case.ds),
+                 "expected": r.case.expected, "family": r.case.family,
+                 "param": r.case.param},
+        "result": r.result, "correct": correct, "t": r.t,
+        "t_user": r.t_user, "t_sys": r.t_sys, "perc_CPU": r.perc_CPU,
+        "memMB": r.mem_used_MB, "exit_status": r.exit_status,
+        "kill_reason": r.kill_reason, "t_fun": r.t_fun,
+        "t_startup": r.t_startup, "output_excerpt": r.out_excerpt,
+        "output_ref": r.out_ref, "worker": r.worker,
+        "paths": r.metrics.get("paths"), "queries": r.metrics.get("queries"),
+        "t_solver": r.metrics.get("t_solver"), "rung": r.rung,
+        "phases": r.phases, "samples": r.samples, "timeline": r.timeline}
+
+
+# timestamp of the run in results.db. The results of every solc version are
+# stored as a run of their own, the compiler version is a setting of the run
+def get_run_tstamp(tstamp: str, solc_version: str, solc_versions: list[str]) -> str:
+    if len(solc_versions) == 1:
+        return tstamp
+    return "%s-solc%s" % (tstamp, solc_version)
+
+
+# Stores the results in results.db, in a single transaction per solc version
+def store_results_db(solvers_results: dict[str, list[Result]], versions: dict[str, str]) -> None:
+    rows: dict[str, list[dict]] = {v: [] for v in opts.solc_versions}
+    for tool, version in versions.items():
+        for r in solvers_results[get_solver_name(tool, version)]:
+            rows[r.case.solc_version].append(get_db_row(tool, version, r))
+    with closing(resultsdb.connect()) as con:
+        for solc_version, solc_rows in rows.items():
+            run = {"tstamp": get_run_tstamp(opts.timestamp, solc_version, opts.solc_versions),
+                   "solc_version": solc_version,
+                   "tout": opts.timeout, "memoutMB": opts.memoutMB}
+            resultsdb.store_run(con, run, solc_rows)
 
 
 # --- main ---
@@ -405,7 +1388,7 @@ def set_up_parser() -> optparse.OptionParser:
                       help="Only run these tools (comma separated list). Available tools: %s" % avail)
 
     parser.add_option("--solcv", dest="solc_version", type=str, default="0.8.19",
-                      help="solc version to use to compile contracts")
+                      help="solc version to use to compile contracts. Several versions can be given, separated by commas, e.g. '0.8.19,0.8.24'. They are built concurrently into out-[version], and every case is run once per version. Default: %default")
 
     parser.add_option("--dumpsmt", dest="dump_smt", default=False,
                       action="store_true", help="Ask the solver to dump SMT files, if the solver supports it")
@@ -413,15 +1396,72 @@ def set_up_parser() -> optparse.OptionParser:
     parser.add_option("-t", dest="timeout", type=int, default=25,
                       help="Max time to run. Default: %default")
 
+    parser.add_option("--timeout-ladder", dest="timeout_ladder", type=str, default=None,
+                      help="Increasing timeouts, e.g. '5,25,120,600', instead of -t. All cases are run with the first timeout, and only the ones that timed out are run again with the next one. The results are stored as if the run used the last timeout")
+
     parser.add_option("-m", dest="memoutMB", type=int, default=16000,
                       help="Max memory per execution of the tool, in MB. Note that if your tool uses 16 threads, each 100MB, it will be counted as 1600MB. Default: %default")
 
+    parser.add_option("--cgroup", dest="cgroup", type=str, default=None,
+                      help="Path of a delegated cgroup v2 directory, e.g. under /sys/fs/cgroup. If given, every execution is run in its own child cgroup, which enforces the memory limit and measures the peak memory. Otherwise, the memory of the tool's process tree is polled")
+
+    parser.add_option("--sample", dest="sample_interval", type=float, default=None,
+                      help="Record the memory, CPU time and number of threads of the tool's processes every this many seconds, e.g. 0.5. Default: off")
+
+    parser.add_option("-j", "--jobs", dest="jobs", type=int, default=1,
+                      help="Number of cases to run in parallel. Default: %default")
+
+    parser.add_option("--membudget", dest="membudgetMB", type=int, default=None,
+                      help="Total memory available to parallel jobs, in MB. Each job reserves the memory limit given by -m from this budget. Default: 90% of physical memory")
+
+    parser.add_option("--nocache", dest="no_cache", default=False,
+                      action="store_true", help="Don't use the result cache, neither for reading nor for writing")
+
+    parser.add_option("--refresh", dest="refresh_cache", default=False,
+                      action="store_true", help="Re-run all cases even if they are in the result cache, and update the cache")
+
+    parser.add_option("--resume", dest="resume", type=str, default=None,
+                      help="Continue the interrupted run with the given timestamp, e.g. '2024-01-31-10:00'. Only the (tool, case) pairs not yet in its journal are run. All other options must be the same as in the original run")
+
+    parser.add_option("--repeat", dest="repeat", type=int, default=1,
+                      help="Run each case this many times, and record the median time. All runs are stored as samples. Default: %default")
+
+    parser.add_option("--warmup", dest="warmup", type=int, default=0,
+                      help="Number of runs before the measured ones, for each case, whose results are thrown away. Default: %default")
+
+    parser.add_option("--batch", dest="batch", default=False,
+                      action="store_true", help="For tools that support it, check all cases of a contract with a single run of the tool. The startup time of the tool is then shared between the cases")
+
+    parser.add_option("--order", dest="order", type="choice", choices=["random", "lpt"], default="random",
+                      help="Order in which the cases are run. 'random' runs them in the random order given by --seed, 'lpt' runs the ones predicted to take the longest first, based on the earlier results in results.db. Default: %default")
+
+    parser.add_option("--listen", dest="listen", type=str, default=None,
+                      help="Act as the coordinator of a distributed run: listen on HOST:PORT, and hand out the cases to the workers connecting there instead of running them here")
+
+    parser.add_option("--worker", dest="worker", type=str, default=None,
+                      help="Act as a worker of a distributed run: connect to the coordinator at HOST:PORT and run the cases it hands out. The options of the run are taken from the coordinator. Use -j to run several cases in parallel")
+
+    parser.add_option("--status", dest="status_fname", type=str, default=None,
+                      help="Keep the progress of the run in this file, rewritten after every job and every --status-interval seconds. In the Prometheus text format if the name ends in '.prom', otherwise in JSON")
+
+    parser.add_option("--status-interval", dest="status_interval", type=float, default=10,
+                      help="Print the progress of the run every this many seconds, 0 to only print it at the end. Default: %default")
+
+    parser.add_option("--shard", dest="shard", type=str, default=None,
+                      help="Only run the cases of shard i out of N, given as 'i/N'. Cases are assigned to shards by the hash of their name, so every machine running a shard of the same sources gets a different part of the cases. Merge the results with merge_shards.py")
+
     parser.add_option("--limit", dest="limit", type=int, default=100000,
                       help="Max number of cases to run. Default: %default")
 
     parser.add_option("--norebuild", dest="norebuild", default=False,
                       action="store_true", help="Don't rebuild with forge")
 
+    parser.add_option("--incremental", dest="incremental", default=False,
+                      action="store_true", help="Don't wipe the build output. Only run forge and kontrol if the sources or the build settings changed since the last build")
+
+    parser.add_option("--list", dest="list_only", default=False,
+                      action="store_true", help="Only list the cases matching the test pattern, then exit")
+
     parser.add_option("--yul", action="store_true", default=False,
                       dest="yul", help="Build through YUL pipeline in forge. You can then access the YUL via `cat myjson | jq '.ir'`.")
 
@@ -454,7 +1494,62 @@ def main() -> None:
         print("Benchmarking does not accept arguments")
         exit(-1)
     random.seed(opts.seed)
-    opts.timestamp = strftime("%Y-%m-%d-%H:%M", gmtime())
+    if opts.repeat < 1:
+        print("ERROR: number of repetitions must be at least 1")
+        exit(-1)
+    if opts.batch and (opts.repeat > 1 or opts.warmup > 0):
+        print("ERROR: repeated runs are not supported in batch mode")
+        exit(-1)
+    if opts.jobs < 1:
+        print("ERROR: number of jobs must be at least 1")
+        exit(-1)
+    if opts.jobs > 1 and opts.dump_smt:
+        print("ERROR: --dumpsmt cannot be used with parallel jobs, the tools' SMT files would overwrite each other")
+        exit(-1)
+    opts.solc_versions = [v.strip() for v in opts.solc_version.split(",")]
+    if "" in opts.solc_versions or len(set(opts.solc_versions)) != len(opts.solc_versions):
+        print("ERROR: solc versions '%s' are not a comma separated list of different versions" % opts.solc_version)
+        exit(-1)
+    opts.solc_version = ",".join(opts.solc_versions)
+    opts.ladder = [opts.timeout]
+    if opts.timeout_ladder is not None:
+        try:
+            opts.ladder = [int(t) for t in opts.timeout_ladder.split(",")]
+        except ValueError:
+            print("ERROR: timeout ladder '%s' is not a comma separated list of timeouts" % opts.timeout_ladder)
+            exit(-1)
+        if opts.ladder[0] < 1 or any(a >= b for a, b in zip(opts.ladder, opts.ladder[1:])):
+            print("ERROR: timeouts of the ladder must be positive and increasing")
+            exit(-1)
+        if opts.listen is not None:
+            print("ERROR: --timeout-ladder cannot be used with --listen")
+            exit(-1)
+        opts.timeout = opts.ladder[-1]
+    if opts.shard is not None:
+        m = re.match(r"^([0-9]+)/([0-9]+)$", opts.shard)
+        if m is None or not 1 <= int(m.group(1)) <= int(m.group(2)):
+            print("ERROR: shard '%s' is not of the form i/N with 1 <= i <= N" % opts.shard)
+            exit(-1)
+        opts.shard_idx = int(m.group(1))
+        opts.num_shards = int(m.group(2))
+    if opts.sample_interval is not None and opts.sample_interval <= 0:
+        print("ERROR: sampling interval must be positive")
+        exit(-1)
+    if opts.membudgetMB is None:
+        opts.membudgetMB = get_phys_mem_MB() * 9 // 10
+    global host_info
+    host_info = get_host_info()
+    if opts.worker is not None:
+        run_worker()
+        return
+    if opts.resume is not None:
+        opts.timestamp = opts.resume
+    else:
+        opts.timestamp = strftime("%Y-%m-%d-%H:%M", gmtime())
+        # the shards of a run are started on different machines, their files
+        # must not collide when they are brought together
+        if opts.shard is not None:
+            opts.timestamp += "-shard%dof%d" % (opts.shard_idx, opts.num_shards)
     tools_used = get_tools_used()
     print("Will run tool(s): %s" % ", ".join([t for t, _ in tools_used.items()]))
     if len(tools_used) == 0:
@@ -462,25 +1557,38 @@ def main() -> None:
         exit(-1)
 
     cases = gather_cases()
+    if opts.shard is not None:
+        cases = [c for c in cases if in_shard(c)]
+        print("Shard %s" % opts.shard)
     print(f"running {len(cases)} cases")
-    cases.sort(key=lambda contr: contr.get_name())
+    cases.sort(key=lambda contr: (contr.get_name(), contr.solc_version))
     if len(cases) == 0:
         print(f"No cases gathered with test pattern '{opts.testpattern}'. Exiting.")
         exit(0)
     print(f"Cases gathered given test pattern '{opts.testpattern}':")
     for c in cases:
         print("-> %s" % c)
+    if opts.list_only:
+        exit(0)
     random.shuffle(cases)
-    solvers_results = run_all_tests(tools_used, cases[:opts.limit])
+    versions = {tool: get_version(descr["version"]) for tool, descr in tools_used.items()}
+    journal = Journal(opts.timestamp, opts.resume is not None, versions, cases[:opts.limit])
+    solvers_results = run_all_tests(tools_used, versions, cases[:opts.limit], journal)
+    journal.close()
     results_fname = "results-tstamp-%s" % opts.timestamp
     dump_results(solvers_results, results_fname)
     os.system("cp %s.csv results-latest.csv" % results_fname)
     os.system("cp %s.json results-latest.json" % results_fname)
     print("Generated file %s.csv" % results_fname)
     print("Generated file %s.json" % results_fname)
-    os.system("sqlite3 results.db < create_table.sql")
-    os.system("sqlite3 results.db \". mode csv\" \". import -skip 1 %s.csv results\" \".exit\" " % results_fname)
-    os.system("sqlite3 results.db < clean_table.sql")
+    if opts.shard is not None:
+        # a shard is only part of a run, it's stored once all shards are
+        # merged by merge_shards.py
+        print("Results of shard %s not stored in %s, merge the shards with ./merge_shards.py" % (
+            opts.shard, resultsdb.db_fname))
+        return
+    store_results_db(solvers_results, versions)
+    print("Stored results in %s" % resultsdb.db_fname)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+# Content-addressed store for the raw output of the tools. Every output is
+# stored once, gzip-compressed, under the hash of its contents. Results only
+# keep the hash (the reference) and a short excerpt, the full output is loaded
+# when needed
+#
+# Usage: ./blobstore.py REF  prints the output with the given reference
+
+import gzip
+import hashlib
+import os
+import sys
+import threading
+
+blob_dir = "output-blobs"
+
+# size of the excerpt kept next to the reference, in characters. The end of
+# the output is kept, it's where the tools print errors and the verdict
+excerpt_len = 400
+
+
+def get_blob_fname(ref: str) -> str:
+    return os.path.join(blob_dir, ref[:2], ref[2:] + ".gz")
+
+
+# stores the text, if not stored already, and returns its reference
+def put(text: str) -> str:
+    data = text.encode("utf-8")
+    ref = hashlib.sha256(data).hexdigest()
+    fname = get_blob_fname(ref)
+    if os.path.exists(fname):
+        return ref
+    os.makedirs(os.path.dirname(fname), exist_ok=True)
+    # written under a unique name and renamed, so that concurrent jobs
+    # storing the same output never see a partial blob
+    tmp_fname = "%s.%d.%d.tmp" % (fname, os.getpid(), threading.get_ident())
+    with gzip.open(tmp_fname, "wb") as f:
+        f.write(data)
+    os.replace(tmp_fname, fname)
+    return ref
+
+
+def get(ref: str) -> str:
+    with gzip.open(get_blob_fname(ref), "rb") as f:
+        return f.read().decode("utf-8")
+
+
+def get_excerpt(text: str) -> str:
+    if len(text) <= excerpt_len:
+        return text
+    return "..." + text[-excerpt_len:]
+
+
+def main() -> None:
+    if len(sys.argv) != 2:
+        print("usage: %s REF" % sys.argv[0])
+        exit(-1)
+    try:
+        sys.stdout.write(get(sys.argv[1]))
+    except FileNotFoundError:
+        print("ERROR: no output with reference '%s' in %s" % (sys.argv[1], blob_dir))
+        exit(-1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +0,0 @@
-UPDATE results SET correct = NULL WHERE correct = '';
-UPDATE results SET t = NULL WHERE t = '';
-UPDATE results SET memMB = NULL WHERE memMB = '';
-UPDATE results SET exit_status = NULL WHERE exit_status = '';
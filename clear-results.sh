@@ -2,7 +2,10 @@
 
 rm -f ./*.json
 rm -f ./*.csv
+rm -f ./*.jsonl
 rm -f ./*.db
+rm -rf result-cache
+rm -rf output-blobs
 
 rm -rf halmos-smt2
 rm -rf hevm-smt2
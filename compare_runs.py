@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+
+# Compares the performance of a tool in two runs, e.g. before and after
+# upgrading it. Cases are matched by name. Reports the cases that became
+# unsolved or solved, and the ones that got significantly slower or faster,
+# both per case and over all cases
+#
+# A run is either a results-tstamp-[timestamp].json file written by bench.py,
+# or the timestamp of a run in results.db. Runs of several solc versions are
+# stored as a run per version in results.db, in the JSON file one of them is
+# selected via --solcv
+
+import json
+import math
+import optparse
+import re
+import statistics
+from contextlib import closing
+import resultsdb
+from stats import bootstrap_ci, mann_whitney_p, mann_whitney_min_p, sign_test_p
+
+global opts
+opts : optparse.Values
+
+
+# A single case of a run: its verdict, time, timeout, and the times of all its
+# repeated runs
+class CaseRun:
+    def __init__(self, result: str, t: float|None, tout: float, samples: list[float]):
+        self.result = result
+        self.t = t
+        self.tout = tout
+        self.samples = samples
+
+    def solved(self) -> bool:
+        return self.result != "unknown" and self.t is not None
+
+    # penalized average runtime: unsolved cases count as twice the timeout
+    def get_par2(self) -> float:
+        if not self.solved():
+            return 2 * self.tout
+        return self.t
+
+    def get_samples(self) -> list[float]:
+        if len(self.samples) > 0:
+            return self.samples
+        return [self.t]
+
+
+def select_solver(solvers: list[str], what: str) -> str:
+    if opts.tool is not None:
+        solvers = [s for s in solvers if re.match(r"^%s-.*-tstamp-" % re.escape(opts.tool), s)]
+    if len(solvers) != 1:
+        print("ERROR: %s has results of %d matching tools, select one with --tool" % (what, len(solvers)))
+        print("Tools: %s" % ", ".join(solvers))
+        exit(-1)
+    return solvers[0]
+
+
+def load_json_run(fname: str) -> tuple[str, dict[str, CaseRun]]:
+    with open(fname, "r") as f:
+        data = json.load(f)
+    solver = select_solver(list(data.keys()), fname)
+    solc_versions = sorted(set(r["solc_version"] for r in data[solver]))
+    if opts.solc_version is not None:
+        solc_versions = [v for v in solc_versions if v == opts.solc_version]
+    if len(solc_versions) != 1:
+        print("ERROR: %s has results of %d matching solc versions, select one with --solcv" % (fname, len(solc_versions)))
+        exit(-1)
+    ret = {}
+    for r in data[solver]:
+        if r["solc_version"] != solc_versions[0]:
+            continue
+        # the JSON only tells whether the case was solved, not the verdict
+        result = "solved" if r["solved"] else "unknown"
+        samples = [s["t"] for s in r.get("samples") or [] if s.get("t") is not None]
+        ret[r["name"]] = CaseRun(result, r["t"], r["tout"], samples)
+    return (solver, ret)
+
+
+def load_db_run(tstamp: str) -> tuple[str, dict[str, CaseRun]]:
+    with closing(resultsdb.connect()) as con:
+        rows = con.execute("""
+        select tools.name || '-' || tool_versions.version || '-tstamp-' || runs.tstamp,
+               results.id, cases.name, results.result, results.t, runs.tout
+        from results
+        join runs on runs.id = results.run_id
+        join tool_versions on tool_versions.id = results.tool_version_id
+        join tools on tools.id = tool_versions.tool_id
+        join cases on cases.id = results.case_id
+        where runs.tstamp = ?""", (tstamp,)).fetchall()
+        solver = select_solver(sorted(set(r[0] for r in rows)), "run %s" % tstamp)
+        ret = {}
+        for label, result_id, name, result, t, tout in rows:
+            if label != solver:
+                continue
+            samples = [s for (s,) in con.execute(
+                "select t from samples where result_id = ? and t is not null order by idx", (result_id,))]
+            ret[name] = CaseRun(result, t, tout, samples)
+    return (solver, ret)
+
+
+def load_run(run: str) -> tuple[str, dict[str, CaseRun]]:
+    if run.endswith(".json"):
+        return load_json_run(run)
+    return load_db_run(run)
+
+
+# Compares a case in the two runs. A change in time is significant if it's
+# larger than the thresholds and the samples of the runs differ according to
+# the Mann-Whitney U test. With too few samples for the test to reach
+# opts.alpha (fewer than 4 per run at 0.05), only the thresholds count
+def compare_case(name: str, old: CaseRun, new: CaseRun) -> dict:
+    ret = {"name": name, "old_result": old.result, "new_result": new.result,
+           "old_t": old.t, "new_t": new.t,
+           "old_par2": old.get_par2(), "new_par2": new.get_par2(),
+           "ratio": None, "p": None, "significant": False}
+    if old.solved() and not new.solved():
+        ret["change"] = "newly unsolved"
+        ret["significant"] = True
+        return ret
+    if not old.solved() and new.solved():
+        ret["change"] = "newly solved"
+        ret["significant"] = True
+        return ret
+    if not old.solved():
+        ret["change"] = "unsolved"
+        return ret
+
+    ret["ratio"] = new.t / old.t if old.t > 0 else None
+    delta = new.t - old.t
+    large = abs(delta) >= opts.min_delta and (old.t == 0 or abs(delta) / old.t >= opts.threshold)
+    if mann_whitney_min_p(len(old.samples), len(new.samples)) < opts.alpha:
+        ret["p"] = mann_whitney_p(old.get_samples(), new.get_samples())
+        ret["significant"] = large and ret["p"] < opts.alpha
+    else:
+        ret["significant"] = large
+    if not ret["significant"]:
+        ret["change"] = "same"
+    elif delta > 0:
+        ret["change"] = "slower"
+    else:
+        ret["change"] = "faster"
+    return ret
+
+
+def get_geomean(ratios: list[float]) -> float:
+    return math.exp(statistics.mean([math.log(r) for r in ratios]))
+
+
+# Totals over all cases. The slowdown is the geometric mean of the time ratios
+# of the cases solved in both runs, with its bootstrapped confidence
+# interval. Whether there are more slower than faster cases than chance would
+# explain is checked by the sign test
+def compare_all(cases: list[dict]) -> dict:
+    ratios = [c["ratio"] for c in cases if c["ratio"] is not None and c["ratio"] > 0]
+    num_slower = len([c for c in cases if c["change"] == "slower"])
+    num_faster = len([c for c in cases if c["change"] == "faster"])
+    ret = {
+        "cases": len(cases),
+        "old_solved": len([c for c in cases if c["old_result"] != "unknown" and c["old_t"] is not None]),
+        "new_solved": len([c for c in cases if c["new_result"] != "unknown" and c["new_t"] is not None]),
+        "newly_unsolved": len([c for c in cases if c["change"] == "newly unsolved"]),
+        "newly_solved": len([c for c in cases if c["change"] == "newly solved"]),
+        "slower": num_slower,
+        "faster": num_faster,
+        "old_par2": sum(c["old_par2"] for c in cases),
+        "new_par2": sum(c["new_par2"] for c in cases),
+        "sign_test_p": sign_test_p(num_slower, num_faster),
+        "geomean_ratio": None,
+        "geomean_ratio_ci": None,
+    }
+    ret["par2_delta"] = ret["new_par2"] - ret["old_par2"]
+    if len(ratios) > 0:
+        ret["geomean_ratio"] = get_geomean(ratios)
+        if len(ratios) >= 2:
+            ret["geomean_ratio_ci"] = bootstrap_ci(ratios, stat=get_geomean)
+    return ret
+
+
+def print_report(old_solver: str, new_solver: str, cases: list[dict], total: dict,
+                 only_old: list[str], only_new: list[str]) -> None:
+    print("Old: %s" % old_solver)
+    print("New: %s" % new_solver)
+    if len(only_old) > 0 or len(only_new) > 0:
+        print("Cases only in the old run: %d, only in the new run: %d, these are ignored" % (
+            len(only_old), len(only_new)))
+
+    def fmt(t: float|None) -> str:
+        return "-" if t is None else "%.3f" % t
+
+    for change in ["newly unsolved", "slower", "newly solved", "faster"]:
+        sel = [c for c in cases if c["change"] == change]
+        if len(sel) == 0:
+            continue
+        sel.sort(key=lambda c: -(c["ratio"] or 0) if change == "slower" else (c["ratio"] or 0))
+        print("")
+        print("%s (%d):" % (change.capitalize(), len(sel)))
+        print("  %-80s %9s %9s %7s %7s" % ("name", "old t", "new t", "ratio", "p"))
+        for c in sel:
+            print("  %-80s %9s %9s %7s %7s" % (c["name"], fmt(c["old_t"]), fmt(c["new_t"]),
+                                              "-" if c["ratio"] is None else "%.2fx" % c["ratio"],
+                                              "-" if c["p"] is None else "%.3f" % c["p"]))
+
+    print("")
+    print("Cases compared: %d" % total["cases"])
+    print("Solved: %d -> %d (newly unsolved: %d, newly solved: %d)" % (
+        total["old_solved"], total["new_solved"], total["newly_unsolved"], total["newly_solved"]))
+    print("PAR-2: %.3f -> %.3f (%+.3f)" % (total["old_par2"], total["new_par2"], total["par2_delta"]))
+    if total["geomean_ratio"] is not None:
+        ci = ""
+        if total["geomean_ratio_ci"] is not None:
+            ci = ", 95%% CI [%.3fx, %.3fx]" % total["geomean_ratio_ci"]
+        print("Time ratio of cases solved by both (geometric mean): %.3fx%s" % (total["geomean_ratio"], ci))
+    print("Significantly slower: %d, faster: %d (sign test p = %.3f)" % (
+        total["slower"], total["faster"], total["sign_test_p"]))
+
+
+# Set up options for main
+def set_up_parser() -> optparse.OptionParser:
+    usage = "usage: %prog [options] OLD NEW"
+    desc = """Compare the performance of a tool in two runs. OLD and NEW are either results-tstamp-[timestamp].json files, or timestamps of runs in results.db
+    """
+
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option("--tool", dest="tool", type=str, default=None,
+                      help="Tool to compare, if the runs have results of several tools")
+    parser.add_option("--solcv", dest="solc_version", type=str, default=None,
+                      help="solc version to compare, if a results file has results of several")
+    parser.add_option("--threshold", dest="threshold", type=float, default=0.1,
+                      help="Relative change in time below which a case is considered unchanged. Default: %default")
+    parser.add_option("--mindelta", dest="min_delta", type=float, default=0.1,
+                      help="Change in time in seconds below which a case is considered unchanged. Default: %default")
+    parser.add_option("--alpha", dest="alpha", type=float, default=0.05,
+                      help="Significance level of the tests, for cases with repeated runs. Default: %default")
+    parser.add_option("--json", dest="json_fname", type=str, default=None,
+                      help="Also write the comparison to this JSON file")
+    parser.add_option("--fail", dest="fail", default=False, action="store_true",
+                      help="Exit with status 1 if any case became unsolved or significantly slower")
+
+    return parser
+
+
+def main() -> None:
+    parser = set_up_parser()
+    global opts
+    (opts, args) = parser.parse_args()
+    if len(args) != 2:
+        parser.print_help()
+        exit(-1)
+
+    old_solver, old = load_run(args[0])
+    new_solver, new = load_run(args[1])
+    names = sorted(set(old.keys()) & set(new.keys()))
+    only_old = sorted(set(old.keys()) - set(new.keys()))
+    only_new = sorted(set(new.keys()) - set(old.keys()))
+    cases = [compare_case(name, old[name], new[name]) for name in names]
+    total = compare_all(cases)
+    print_report(old_solver, new_solver, cases, total, only_old, only_new)
+
+    if opts.json_fname is not None:
+        with open(opts.json_fname, "w") as f:
+            json.dump({"old": old_solver, "new": new_solver, "total": total, "cases": cases,
+                       "only_old": only_old, "only_new": only_new}, f, indent=2)
+        print("Comparison written to %s" % opts.json_fname)
+
+    if opts.fail and (total["newly_unsolved"] > 0 or total["slower"] > 0):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
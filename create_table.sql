@@ -1,16 +1,168 @@
+-- Schema of results.db. The version of the schema is kept in
+-- 'PRAGMA user_version', see resultsdb.py
+
+CREATE TABLE IF NOT EXISTS runs (
+  id INTEGER PRIMARY KEY,
+  tstamp TEXT NOT NULL UNIQUE,
+  solc_version TEXT NOT NULL,
+  tout REAL NOT NULL,
+  memoutMB REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tools (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS tool_versions (
+  id INTEGER PRIMARY KEY,
+  tool_id INTEGER NOT NULL REFERENCES tools (id),
+  version TEXT NOT NULL,
+  UNIQUE (tool_id, version)
+);
+
+CREATE TABLE IF NOT EXISTS cases (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE,
+  sol_file TEXT NOT NULL,
+  contract TEXT NOT NULL,
+  fun TEXT NOT NULL,
+  sig TEXT NOT NULL,
+  ds INTEGER NOT NULL,
+  expected TEXT NOT NULL CHECK (expected IN ('safe', 'unsafe')),
+  -- family and size of the cases generated by gen_families.py
+  family TEXT,
+  param INTEGER
+);
+
+-- the machines the results were measured on
+CREATE TABLE IF NOT EXISTS workers (
+  id INTEGER PRIMARY KEY,
+  hostname TEXT NOT NULL,
+  cpu_model TEXT NOT NULL,
+  cpus INTEGER NOT NULL,
+  memMB INTEGER NOT NULL,
+  platform TEXT NOT NULL,
+  UNIQUE (hostname, cpu_model, cpus, memMB, platform)
+);
+
 CREATE TABLE IF NOT EXISTS results (
-  solver STRING NOT NULL,
-  solc_version STRING NOT NULL,
-  name STRING NOT NULL,
-  fun STRING NOT NULL,
-  sig STRING NOT NULL,
-  result STRING NOT NULL,
-
-  correct INT,
-  t FLOAT,
-  tout FLOAT,
-  memoutMB FLOAT,
-  memMB FLOAT,
-  exit_status INT,
-  output STRING
+  id INTEGER PRIMARY KEY,
+  run_id INTEGER NOT NULL REFERENCES runs (id),
+  tool_version_id INTEGER NOT NULL REFERENCES tool_versions (id),
+  case_id INTEGER NOT NULL REFERENCES cases (id),
+  worker_id INTEGER REFERENCES workers (id),
+  result TEXT NOT NULL CHECK (result IN ('safe', 'unsafe', 'unknown')),
+
+  correct INTEGER,
+  t REAL,
+  t_user REAL,
+  t_sys REAL,
+  perc_CPU INTEGER,
+  memMB REAL,
+  exit_status INTEGER,
+  kill_reason TEXT,
+  t_fun REAL,
+  t_startup REAL,
+  -- the full output is in the blob store, see blobstore.py
+  output_excerpt TEXT,
+  output_ref TEXT,
+  -- reported by the tool, see parse_metrics() in runner.py
+  paths INTEGER,
+  queries INTEGER,
+  t_solver REAL,
+  -- timeout of the --timeout-ladder rung the result was found at
+  rung REAL,
+  UNIQUE (run_id, tool_version_id, case_id)
+);
+
+CREATE INDEX IF NOT EXISTS results_tool_version_case ON results (tool_version_id, case_id);
+CREATE INDEX IF NOT EXISTS results_case ON results (case_id);
+
+CREATE TABLE IF NOT EXISTS samples (
+  result_id INTEGER NOT NULL REFERENCES results (id),
+  idx INTEGER NOT NULL,
+  result TEXT NOT NULL,
+
+  t REAL,
+  t_user REAL,
+  t_sys REAL,
+  memMB REAL,
+  PRIMARY KEY (result_id, idx)
+);
+
+-- time of the phases of a result, as reported by the tool
+CREATE TABLE IF NOT EXISTS phases (
+  result_id INTEGER NOT NULL REFERENCES results (id),
+  name TEXT NOT NULL,
+  t REAL NOT NULL,
+  PRIMARY KEY (result_id, name)
+);
+
+-- resources of the tool over time, sampled with --sample. The samples are
+-- stored as JSON, one array per column, see run_tool() in runner.py
+CREATE TABLE IF NOT EXISTS timelines (
+  result_id INTEGER PRIMARY KEY REFERENCES results (id),
+  data TEXT NOT NULL
+);
+
+-- The results in the flat format of earlier versions, for ad-hoc queries
+CREATE VIEW IF NOT EXISTS results_flat AS
+SELECT
+  tools.name || '-' || tool_versions.version || '-tstamp-' || runs.tstamp AS solver,
+  tools.name AS tool,
+  tool_versions.version AS version,
+  runs.tstamp AS tstamp,
+  runs.solc_version AS solc_version,
+  cases.name AS name,
+  cases.fun AS fun,
+  cases.sig AS sig,
+  results.result AS result,
+  results.correct AS correct,
+  results.t AS t,
+  runs.tout AS tout,
+  runs.memoutMB AS memoutMB,
+  results.memMB AS memMB,
+  results.exit_status AS exit_status,
+  results.kill_reason AS kill_reason,
+  workers.hostname AS worker
+FROM results
+JOIN runs ON runs.id = results.run_id
+JOIN tool_versions ON tool_versions.id = results.tool_version_id
+JOIN tools ON tools.id = tool_versions.tool_id
+JOIN cases ON cases.id = results.case_id
+LEFT JOIN workers ON workers.id = results.worker_id;
+
+-- SMT queries dumped by the tools via --dumpsmt, see smt_replay.py. Queries
+-- that only differ in comments and whitespace are stored once
+CREATE TABLE IF NOT EXISTS smt_queries (
+  id INTEGER PRIMARY KEY,
+  hash TEXT NOT NULL UNIQUE,
+  size INTEGER NOT NULL,
+  logic TEXT NOT NULL,
+  fname TEXT NOT NULL
+);
+
+-- every dumped file of a query, with the tool and the contract that
+-- generated it
+CREATE TABLE IF NOT EXISTS smt_query_origins (
+  query_id INTEGER NOT NULL REFERENCES smt_queries (id),
+  fname TEXT NOT NULL,
+  engine TEXT NOT NULL,
+  origin TEXT NOT NULL,
+  PRIMARY KEY (fname)
+);
+
+CREATE TABLE IF NOT EXISTS smt_replays (
+  id INTEGER PRIMARY KEY,
+  query_id INTEGER NOT NULL REFERENCES smt_queries (id),
+  tstamp TEXT NOT NULL,
+  solver TEXT NOT NULL,
+  version TEXT NOT NULL,
+  result TEXT NOT NULL CHECK (result IN ('sat', 'unsat', 'unknown', 'error')),
+
+  t REAL,
+  tout REAL NOT NULL,
+  memMB REAL,
+  UNIQUE (query_id, tstamp, solver)
 );
@@ -0,0 +1,236 @@
+# Coordinator/worker protocol to run the benchmarks on several machines.
+#
+# The coordinator hands out jobs over TCP, one at a time per connection.
+# Workers connect, introduce themselves with a description of their hardware,
+# receive the options of the run, and then receive jobs and send back their
+# results until there are no jobs left. Every message is a JSON object on a
+# single line:
+#
+#   worker -> coordinator: {"type": "hello", "worker": {...}}
+#   coordinator -> worker: {"type": "config", ...}
+#   coordinator -> worker: {"type": "job", "id": N, ...}, or {"type": "done"}
+#   worker -> coordinator: {"type": "result", "id": N, "results": [...]}
+#                          or {"type": "error", "msg": "..."}
+#
+# A job whose worker disconnects, reports an error, or doesn't answer before
+# the job's deadline is handed out again, up to 'max_retries' times, to
+# another worker if there is one. A worker that reported an error goes on
+# with the next job
+#
+# This module only knows about the protocol, what a job is and how it's run
+# is up to bench.py
+
+import json
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Callable
+
+max_retries = 2
+
+# how long a worker keeps trying to reach the coordinator, in seconds
+connect_tout = 60
+
+# the coordinator reports that the run is stalled if no worker was connected
+# for this long, in seconds
+stall_tout = 60
+
+
+def parse_addr(addr: str) -> tuple[str, int]:
+    host, _, port = addr.rpartition(":")
+    if host == "" or not port.isdigit():
+        print("ERROR: address '%s' is not of the form HOST:PORT" % addr)
+        exit(-1)
+    return (host, int(port))
+
+
+def send_msg(f, msg: dict) -> None:
+    f.write(json.dumps(msg) + "\n")
+    f.flush()
+
+
+# None if the other side closed the connection
+def recv_msg(f) -> dict|None:
+    line = f.readline()
+    if line == "":
+        return None
+    return json.loads(line)
+
+
+# Hands out the jobs to the workers. 'encode_job' turns a job into the
+# message sent to the worker, 'get_deadline' gives the number of seconds a
+# worker may take for it. 'store' is called with the job, the hardware
+# description of the worker and the results it sent, 'lose' with the job if
+# it couldn't be run after all retries. Both are called under a lock
+class Coordinator:
+    def __init__(self, addr: str, config: dict, jobs: list,
+                 encode_job: Callable[[Any], dict],
+                 get_deadline: Callable[[Any], float],
+                 store: Callable[[Any, dict, list[dict]], None],
+                 lose: Callable[[Any], None]):
+        self.addr = parse_addr(addr)
+        self.config = config
+        self.todo = list(jobs)
+        self.num_unfinished = len(jobs)
+        self.retries = [0] * len(jobs)
+        # failed[i] = the workers job i failed on, by their connection
+        self.failed: list[set[int]] = [set() for _ in jobs]
+        self.ids = {id(job): i for i, job in enumerate(jobs)}
+        # the connections of the workers connected right now
+        self.conns: set[int] = set()
+        self.last_worker_seen = time.time()
+        self.encode_job = encode_job
+        self.get_deadline = get_deadline
+        self.store = store
+        self.lose = lose
+        self.cond = threading.Condition()
+
+    # blocks until a job is available, None if all jobs are finished. A job
+    # that failed on the worker of connection 'conn' before is only handed to
+    # it again if it failed on all connected workers
+    def next_job(self, conn: int):
+        with self.cond:
+            while self.num_unfinished > 0:
+                for k, job in enumerate(self.todo):
+                    failed = self.failed[self.ids[id(job)]]
+                    if conn not in failed or self.conns <= failed:
+                        return self.todo.pop(k)
+                self.cond.wait()
+            return None
+
+    def finish(self, job, worker: dict, results: list[dict]) -> None:
+        with self.cond:
+            self.store(job, worker, results)
+            self.num_unfinished -= 1
+            self.cond.notify_all()
+
+    def retry(self, job, conn: int, reason: str) -> None:
+        with self.cond:
+            i = self.ids[id(job)]
+            self.retries[i] += 1
+            self.failed[i].add(conn)
+            if self.retries[i] > max_retries:
+                print("Giving up on job %d after %d tries, last failure: %s" % (i, self.retries[i], reason))
+                self.lose(job)
+                self.num_unfinished -= 1
+            else:
+                print("Retrying job %d, failure: %s" % (i, reason))
+                # at the front, it was due already
+                self.todo.insert(0, job)
+            self.cond.notify_all()
+
+    def serve_worker(self, sock: socket.socket) -> None:
+        f = sock.makefile("rw", encoding="utf-8")
+        hello = recv_msg(f)
+        if hello is None or hello.get("type") != "hello":
+            return
+        worker = hello["worker"]
+        print("Worker connected: %s" % worker["hostname"])
+        conn = id(sock)
+        with self.cond:
+            self.conns.add(conn)
+        try:
+            self.serve_jobs(sock, f, worker, conn)
+        finally:
+            with self.cond:
+                self.conns.remove(conn)
+                self.last_worker_seen = time.time()
+                # jobs that failed here may be up for the others now
+                self.cond.notify_all()
+
+    def serve_jobs(self, sock: socket.socket, f, worker: dict, conn: int) -> None:
+        send_msg(f, dict(self.config, type="config"))
+        while True:
+            job = self.next_job(conn)
+            if job is None:
+                send_msg(f, {"type": "done"})
+                return
+            try:
+                i = self.ids[id(job)]
+                send_msg(f, dict(self.encode_job(job), type="job", id=i))
+                sock.settimeout(self.get_deadline(job))
+                msg = recv_msg(f)
+                sock.settimeout(None)
+            except (OSError, ValueError) as e:
+                self.retry(job, conn, "worker %s: %s" % (worker["hostname"], e))
+                return
+            if msg is None:
+                self.retry(job, conn, "worker %s disconnected" % worker["hostname"])
+                return
+            if msg["type"] == "error":
+                # the worker is still fine, only this job failed on it
+                self.retry(job, conn, "worker %s: %s" % (worker["hostname"], msg["msg"]))
+                continue
+            self.finish(job, worker, msg["results"])
+
+    # serves workers until all jobs are finished
+    def run(self) -> None:
+        coordinator = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                coordinator.serve_worker(self.request)
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        with Server(self.addr, Handler) as server:
+            print("Waiting for workers on %s:%d, %d jobs to run" % (self.addr[0], self.addr[1], len(self.todo)))
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            with self.cond:
+                self.last_worker_seen = time.time()
+                stalled = False
+                while self.num_unfinished > 0:
+                    self.cond.wait(stall_tout / 4)
+                    if len(self.conns) > 0:
+                        self.last_worker_seen = time.time()
+                        stalled = False
+                    elif not stalled and time.time() - self.last_worker_seen > stall_tout:
+                        print("WARNING: the run is stalled, no worker connected for %ds and %d jobs left. Start workers with ./bench.py --worker %s:%d" % (
+                            stall_tout, self.num_unfinished, self.addr[0], self.addr[1]), flush=True)
+                        stalled = True
+            server.shutdown()
+
+
+# Connects to the coordinator and runs jobs until there are none left.
+# 'setup' is called with the configuration sent by the coordinator, before
+# the first job. 'run_job' is called with each job message and returns the
+# results, an exception is reported to the coordinator as an error
+def run_worker(addr: str, worker: dict, setup: Callable[[dict], None],
+               run_job: Callable[[dict], list[dict]]) -> None:
+    host, port = parse_addr(addr)
+    start = time.time()
+    while True:
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except OSError as e:
+            if time.time() - start > connect_tout:
+                print("ERROR: could not connect to the coordinator at %s: %s" % (addr, e))
+                exit(-1)
+            time.sleep(1)
+
+    with sock:
+        f = sock.makefile("rw", encoding="utf-8")
+        send_msg(f, {"type": "hello", "worker": worker})
+        config = recv_msg(f)
+        if config is None:
+            print("Coordinator at %s closed the connection" % addr)
+            return
+        setup(config)
+        while True:
+            msg = recv_msg(f)
+            if msg is None or msg["type"] == "done":
+                return
+            try:
+                results = run_job(msg)
+            except Exception as e:
+                # the coordinator hands the job to another worker, this one
+                # goes on with the next job
+                print("ERROR: job %d failed: %s" % (msg["id"], e))
+                send_msg(f, {"type": "error", "id": msg["id"], "msg": "%s" % e})
+                continue
+            send_msg(f, {"type": "result", "id": msg["id"], "results": results})
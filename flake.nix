@@ -10,22 +10,12 @@
     kontrol.url = "github:runtimeverification/kontrol";
     foundry.url = "github:shazow/foundry.nix/monthly";
     halmos-src = { url = "github:a16z/halmos"; flake = false; };
-    runlim-src = { url = "github:msooseth/runlim"; flake = false; };
   };
 
-  outputs = { self, nixpkgs, flake-utils, hevm, kontrol, foundry, halmos-src, runlim-src }:
+  outputs = { self, nixpkgs, flake-utils, hevm, kontrol, foundry, halmos-src }:
     flake-utils.lib.eachDefaultSystem (system:
       let
         pkgs = nixpkgs.legacyPackages.${system};
-        runlim = pkgs.stdenv.mkDerivation {
-          pname = "runlim";
-          version = "1.0";
-          configurePhase = ''
-            mkdir -p $out/bin
-            ./configure.sh --prefix=$out/bin
-          '';
-          src = runlim-src;
-        };
         halmos = pkgs.python3.pkgs.buildPythonApplication rec {
           pname = "halmos";
           version = "0.0.0";
@@ -51,6 +41,11 @@
             foundry.defaultPackage.${system}
             pkgs.solc
 
+            # SMT solvers, for smt_replay.py
+            pkgs.z3
+            pkgs.cvc5
+            pkgs.bitwuzla
+
             # python stuff
             pkgs.black
             pkgs.ruff
@@ -60,8 +55,6 @@
             pkgs.jq
             pkgs.sqlite-interactive
             pkgs.gnuplot
-            pkgs.time
-            runlim
           ];
         };
       });
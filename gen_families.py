@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+# Generates families of cases that only differ in their size, to see how the
+# time and memory of the tools grow with it. Every family gets a safe and an
+# unsafe contract, in src/safe/ds-test/family-[family].sol and
+# src/unsafe/ds-test/family-[family].sol, with a function
+# prove_[family]_[size] for each size. bench.py tags the cases with their
+# family and size (see get_family()), and `./gen_graphs.py --scaling` plots
+# the time and memory of each tool against the size
+
+import os
+import re
+import optparse
+
+global opts
+opts : optparse.Values
+
+family_regex = re.compile(r"^prove_([a-z]+)_([0-9]+)$")
+
+
+# the family and the size of the case, (None, None) if it's not part of a
+# family
+def get_family(sol_file: str, fun: str) -> tuple[str|None, int|None]:
+    m = family_regex.match(fun)
+    if m is None or os.path.basename(sol_file) != "family-%s.sol" % m.group(1):
+        return (None, None)
+    return (m.group(1), int(m.group(2)))
+
+
+# n independent branches, i.e. 2^n paths. Each branch adds one of two base 3
+# digits, so every path computes a different sum. The unsafe target is
+# reached by exactly one path, the safe target by none
+def gen_branches(n: int, safe: bool) -> str:
+    target = sum(3**i * (1 + i % 2) for i in range(n))
+    if safe:
+        target += 3**n
+    ret = "    function prove_branches_%d(uint256 x) public {\n" % n
+    ret += "        uint256 acc = 0;\n"
+    for i in range(n):
+        ret += "        acc += (x & (1 << %d) != 0) ? %d : %d;\n" % (i, 2 * 3**i, 3**i)
+    ret += "        assert(acc != %d);\n" % target
+    ret += "    }\n"
+    return ret
+
+
+# a loop running up to n times. The unsafe assertion only fails in the last
+# iteration
+def gen_loops(n: int, safe: bool) -> str:
+    ret = "    function prove_loops_%d(uint256 x) public {\n" % n
+    ret += "        require(x <= %d);\n" % n
+    ret += "        uint256 j;\n"
+    ret += "        for (uint256 i = 0; i < x; i++) {\n"
+    ret += "            j++;\n"
+    ret += "        }\n"
+    if safe:
+        ret += "        assert(j == x);\n"
+    else:
+        ret += "        assert(j != %d);\n" % n
+    ret += "    }\n"
+    return ret
+
+
+# n writes to storage at symbolic slots, and a read from any of them
+def gen_storage(n: int, safe: bool) -> str:
+    ret = "    mapping(uint256 => uint256) slots%d;\n\n" % n
+    ret += "    function prove_storage_%d(uint256 k, uint256 v, uint256 j) public {\n" % n
+    ret += "        require(j < %d);\n" % n
+    ret += "        unchecked {\n"
+    for i in range(n):
+        ret += "            slots%d[k + %d] = v + %d;\n" % (n, i, i)
+    if safe:
+        ret += "            assert(slots%d[k + j] == v + j);\n" % n
+    else:
+        ret += "            assert(slots%d[k + j] != v + %d);\n" % (n, n - 1)
+    ret += "        }\n"
+    ret += "    }\n"
+    return ret
+
+
+# keccak nested n times. Hashes of different values differ, the unsafe case
+# doesn't require the values to be different
+def gen_keccak(n: int, safe: bool) -> str:
+    ret = "    function prove_keccak_%d(uint256 x, uint256 y) public {\n" % n
+    if safe:
+        ret += "        require(x != y);\n"
+    ret += "        bytes32 hx = bytes32(x);\n"
+    ret += "        bytes32 hy = bytes32(y);\n"
+    for _ in range(n):
+        ret += "        hx = keccak256(abi.encodePacked(hx));\n"
+        ret += "        hy = keccak256(abi.encodePacked(hy));\n"
+    ret += "        assert(hx != hy);\n"
+    ret += "    }\n"
+    return ret
+
+
+families = {
+    "branches": {"gen": gen_branches, "sizes": [2, 4, 8, 16, 32]},
+    "loops": {"gen": gen_loops, "sizes": [2, 4, 8, 16, 32, 64]},
+    "storage": {"gen": gen_storage, "sizes": [1, 2, 4, 8, 16, 32]},
+    "keccak": {"gen": gen_keccak, "sizes": [1, 2, 4, 8, 16]},
+}
+
+
+def gen_contract(family: str, sizes: list[int], safe: bool) -> str:
+    contract = "Family%s%s" % (family.capitalize(), "Safe" if safe else "Unsafe")
+    ret = "// Generated by gen_families.py, do not edit\n"
+    ret += "import {DSTest} from \"ds-test/test.sol\";\n\n"
+    ret += "contract %s is DSTest {\n" % contract
+    ret += "\n".join([families[family]["gen"](n, safe) for n in sizes])
+    ret += "}\n"
+    return ret
+
+
+# Set up options for main
+def set_up_parser() -> optparse.OptionParser:
+    usage = "usage: %prog [options]"
+    desc = """Generate families of cases of increasing size
+    """
+
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option("--families", dest="families", type=str, default="all",
+                      help="Generate these families (comma separated list). Available families: %s. Default: %%default" % ", ".join(families.keys()))
+    parser.add_option("--sizes", dest="sizes", type=str, default=None,
+                      help="Sizes to generate (comma separated list). Default: depends on the family")
+    parser.add_option("--remove", action="store_true", default=False,
+                      dest="remove", help="Remove the generated contracts of the families instead")
+
+    return parser
+
+
+def main() -> None:
+    parser = set_up_parser()
+    global opts
+    (opts, args) = parser.parse_args()
+    if len(args) > 0:
+        print("Generating does not accept arguments")
+        exit(-1)
+
+    todo = []
+    for family in opts.families.split(","):
+        family = family.strip()
+        if family == "all":
+            todo = list(families.keys())
+            break
+        if family not in families:
+            print("ERROR: family you specified, '%s' is not known." % family)
+            print("Known families: %s" % ", ".join(families.keys()))
+            exit(-1)
+        todo.append(family)
+
+    given_sizes = None
+    if opts.sizes is not None:
+        try:
+            given_sizes = sorted(set(int(n) for n in opts.sizes.split(",")))
+        except ValueError:
+            parser.error("sizes '%s' are not a comma separated list of numbers" % opts.sizes)
+        if given_sizes[0] < 1:
+            parser.error("sizes must be at least 1, got %d" % given_sizes[0])
+
+    for family in todo:
+        sizes = families[family]["sizes"]
+        if given_sizes is not None:
+            sizes = given_sizes
+        for safe in [True, False]:
+            fname = "src/%s/ds-test/family-%s.sol" % ("safe" if safe else "unsafe", family)
+            if opts.remove:
+                if os.path.exists(fname):
+                    os.unlink(fname)
+                    print("Removed %s" % fname)
+                continue
+            with open(fname, "w") as f:
+                f.write(gen_contract(family, sizes, safe))
+            print("Generated %s, sizes: %s" % (fname, ", ".join(["%d" % n for n in sizes])))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 
 import os
+import re
 import sqlite3
 import optparse
-import re
+import csv
+import statistics
+import json
+import hashlib
+import math
+import itertools
+from contextlib import closing
+from stats import bootstrap_ci, is_noisy, linear_fit
+import portfolio
+import resultsdb
 
 global opts
 opts : optparse.Values
@@ -13,171 +23,284 @@ def unlink(fname):
         os.unlink(fname)
 
 
-# Converts file to ascending space-delimited file that shows
-# the number of problems solved and the timeout it took to solve the next
-# file. Returns the number of problems solved in total
-# CDF stands for Cumulative Distribution Function
-def convert_to_cdf(fname: str, fname2: str) -> int:
-    f = open(fname, "r")
-    f2 = open(fname2, "w")
-    text = f.read()
-    mylines = text.splitlines()
-    time = []
-    for line in mylines:
-        time.append(float(line.split()[0]))
-
-    lastnum = -1
-    for a in range(0, 3600, 1):
-        num = 0
-        for t in time:
-            if (t < a):
-                num += 1
-
-        if (lastnum != num):
-            f2.write("%d \t%d\n" % (num, a))
-        lastnum = num
-    f.close()
-    f2.close()
-    return len(mylines)
-
-
-# Get all solvers in the DB
-def get_solvers() -> list[str]:
+# Computes the Cumulative Distribution Function (CDF) of the solve times: a
+# list of (number of problems solved, time) points, one for each distinct time,
+# at the full resolution of the recorded times
+def get_cdf(times: list[float]) -> list[tuple[int, float]]:
     ret = []
-    with sqlite3.connect("results.db") as con:
-        cur = con.cursor()
-        res = cur.execute("SELECT solver FROM results group by solver")
-        for a in res:
-            ret.append(a[0])
+    times = sorted(times)
+    for i in range(len(times)):
+        # with equal times, only the last one counts
+        if i+1 < len(times) and times[i+1] == times[i]:
+            continue
+        ret.append((i+1, times[i]))
     return ret
 
 
+# Writes the CDF of the times to a space-delimited file that shows the number
+# of problems solved and the time it took to solve them
+def write_cdf(times: list[float], fname: str) -> None:
+    with open(fname, "w") as f:
+        # a log scale can't show 0
+        if not opts.logx:
+            f.write("0 \t0\n")
+        for num, t in get_cdf(times):
+            f.write("%d \t%f\n" % (num, t))
+
+
+# SQL 'where' clause and its parameters restricting the results to the tools,
+# versions, runs and solc versions given on the command line
+def get_filter() -> tuple[str, list[str]]:
+    conds = []
+    params: list[str] = []
+    for col, vals in [("tools.name", opts.tools), ("tool_versions.version", opts.versions),
+                      ("runs.tstamp", opts.runs), ("runs.solc_version", opts.solc_versions)]:
+        if vals is None:
+            continue
+        vals = vals.split(",")
+        conds.append("%s in (%s)" % (col, ", ".join(["?"] * len(vals))))
+        params += vals
+    if len(conds) == 0:
+        return ("", params)
+    return ("where " + " and ".join(conds), params)
+
+
+# Results of several solc versions (see `./bench.py --solcv`) get a set of
+# graphs per version, in graphs/solc-[version]. Only the CDF and cactus
+# graphs and the ranking are also made of all versions together, in graphs/,
+# where every solc version of a tool is a solver of its own
+graphs_dir = "graphs"
+
+# whether the graphs are of several solc versions together
+multi_solc = False
+
+
+def get_solc_versions(con: sqlite3.Connection) -> list[str]:
+    where, params = get_filter()
+    ret = con.execute("""
+    select distinct runs.solc_version
+    from results
+    join runs on runs.id = results.run_id
+    join tool_versions on tool_versions.id = results.tool_version_id
+    join tools on tools.id = tool_versions.tool_id
+    %s
+    order by runs.solc_version""" % where, params)
+    return [v for (v,) in ret]
+
+
+# name of the solver without the timestamp of the run, for --pretty
+def get_pretty_name(tool: str, version: str, solc_version: str) -> str:
+    if multi_solc:
+        return "%s-%s-solc%s" % (tool, version, solc_version)
+    return "%s-%s" % (tool, version)
+
+
+# All results needed by the graphs, loaded from the DB with a single query
+# over a single connection, and pivoted into a table per solver and instance.
+# A solver is a version of a tool in a run, it can be restricted via
+# --tools/--versions/--runs
+class ResultTable:
+    def __init__(self, con: sqlite3.Connection):
+        # rows[solver][name] = (result, t, tout)
+        self.rows: dict[str, dict[str, tuple[str, float|None, float]]] = {}
+        # info[solver] = (tool, version, tstamp, solc_version)
+        self.info: dict[str, tuple[str, str, str, str]] = {}
+        where, params = get_filter()
+        ret = con.execute("""
+        select tools.name, tool_versions.version, runs.tstamp, runs.solc_version, cases.name,
+               results.result, results.t, runs.tout
+        from results
+        join runs on runs.id = results.run_id
+        join tool_versions on tool_versions.id = results.tool_version_id
+        join tools on tools.id = tool_versions.tool_id
+        join cases on cases.id = results.case_id
+        %s
+        order by tools.name, tool_versions.version, runs.tstamp, cases.name""" % where, params)
+        for tool, version, tstamp, solc_version, name, result, t, tout in ret:
+            solver = "%s-%s-tstamp-%s" % (tool, version, tstamp)
+            self.info[solver] = (tool, version, tstamp, solc_version)
+            self.rows.setdefault(solver, {})[name] = (result, t, tout)
+        self.solvers = list(self.rows.keys())
+        self.instances = sorted(set(name for r in self.rows.values() for name in r))
+        # solvers simulated from the others, see add_portfolios(). They are
+        # not in 'solvers', and only shown on the CDF and cactus graphs and in
+        # the ranking
+        self.synthetic: list[str] = []
+        # cores[solver] = number of cores the solver uses, 1 for real ones
+        self.cores: dict[str, int] = {solver: 1 for solver in self.solvers}
+
+    def add_synthetic(self, solver: str, rows: dict[str, tuple[str, float|None, float]], cores: int) -> None:
+        self.rows[solver] = rows
+        self.synthetic.append(solver)
+        self.cores[solver] = cores
+
+    def get_pretty_name(self, solver: str) -> str:
+        if solver not in self.info:
+            return solver
+        tool, version, _, solc_version = self.info[solver]
+        return get_pretty_name(tool, version, solc_version)
+
+    # time the solver took on the instance, unsolved instances count as the
+    # timeout. None if the solver was not run on the instance
+    def get_time(self, solver: str, name: str) -> float|None:
+        if name not in self.rows[solver]:
+            return None
+        result, t, tout = self.rows[solver][name]
+        if result == "unknown" or t is None:
+            return tout
+        return min(t, tout)
+
+    def get_solved_times(self, solver: str) -> list[float]:
+        return [t for result, t, _ in self.rows[solver].values()
+                if result != "unknown" and t is not None]
+
+    def get_touts(self, solvers: list[str]) -> set[float]:
+        return set(tout for s in solvers for _, _, tout in self.rows[s].values())
+
+
 # generates files for GNU to plot for each solver
-def gen_cdf_files() -> list[tuple[str, str, int]]:
+def gen_cdf_files(table: ResultTable) -> list[tuple[str, str, int]]:
     ret = []
-    solvers = get_solvers()
-    print("Solvers: ", solvers)
-    for solver in solvers:
-        fname_csv = "graphs/run-"+solver+".csv"
-        fname_csv_gen = "gencsv.sqlite"
-        with open(fname_csv_gen, "w") as f:
-            f.write(".headers off\n")
-            f.write(".mode csv\n")
-            f.write(".output "+fname_csv+"\n")
-            f.write("select t from results where solver='{solver}'\n and result!='unknown'".format(solver=solver))
-        os.system("sqlite3 results.db < {fname_csv_gen}".format(fname_csv_gen=fname_csv_gen))
-        unlink(fname_csv_gen)
-
-        fname_cdf = fname_csv + ".gnuplotdata"
-        num_solved = convert_to_cdf(fname_csv, fname_cdf)
-        unlink(fname_csv)
-        ret.append([fname_cdf, solver, num_solved])
+    print("Solvers: ", table.solvers + table.synthetic)
+    for solver in table.solvers + table.synthetic:
+        fname_cdf = graphs_dir+"/run-"+solver+".csv.gnuplotdata"
+        times = table.get_solved_times(solver)
+        write_cdf(times, fname_cdf)
+        ret.append([fname_cdf, solver, len(times)])
     return ret
 
 
+# Hashes of the inputs of the comparative graphs at the time they were last
+# rendered, so unchanged graphs are not rendered again
+fname_compare_stamps = "%s/.compare-stamps.json"
+
+
+def load_compare_stamps() -> dict[str, str]:
+    try:
+        with open(fname_compare_stamps % graphs_dir, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
 # Generates graphs with 2 solvers on X/Y axis and the dots representing problems that were solved
-# by the different solvers.
-def gen_comparative_graphs() -> None:
+# by the different solvers. All graphs read the same data file, which has a
+# column per solver, and are rendered by a single gnuplot run. Only one graph
+# is made per pair of solvers, the one with the axes swapped would show the
+# same
+def gen_comparative_graphs(table: ResultTable) -> None:
     def get_timeout(solver, solver2) -> int:
-        with sqlite3.connect("results.db") as cur:
-            ret = cur.execute("""
-            select tout
-            from results
-            where solver='{solver}' or solver='{solver2}'
-            group by tout""".format(solver=solver, solver2=solver2))
-            tout = None
-            for line in ret:
-                if tout is None:
-                    tout = int(line[0])
-                else:
-                    print("Error, the two solvers, '{solver}' and '{solver2}' are incomparable".format(
-                        solver=solver, solver2=solver2))
-                    print(" --> they were run with different timeouts")
-                    exit(-1)
-            if tout is None:
-                print("Error, timeout couldn't be found for solvers '{solver}' and '{solver2}'".format(
-                    solver=solver, solver2=solver2))
-                print("  ---> were they not run?")
-                exit(-1)
-        return tout
-    def genplot(t : str, solver:str, solver2:str) -> str:
+        touts = table.get_touts([solver, solver2])
+        if len(touts) > 1:
+            print("Error, the two solvers, '{solver}' and '{solver2}' are incomparable".format(
+                solver=solver, solver2=solver2))
+            print(" --> they were run with different timeouts")
+            exit(-1)
+        if len(touts) == 0:
+            print("Error, timeout couldn't be found for solvers '{solver}' and '{solver2}'".format(
+                solver=solver, solver2=solver2))
+            print("  ---> were they not run?")
+            exit(-1)
+        return int(touts.pop())
+    def genplot(t : str, i: int, j: int) -> tuple[str, str]:
+        solver = solvers[i]
+        solver2 = solvers[j]
         timeout = get_timeout(solver, solver2)
         fname = solver+"-vs-"+solver2+"." + t
-        with open(fname_gnuplot, "a") as f:
-            if t == "eps":
-                if opts.pretty_graphs:
-                    f.write("set term postscript eps color lw 1 \"Helvetica\" 16 size 3,2\n")
-                else:
-                    f.write("set term postscript eps color lw 1 \"Helvetica\" 8 size 6,4\n")
-            elif t == "png":
-                f.write("set term png size 600,400\n")
-            else:
-                assert False
-
-            f.write("set output \"graphs/"+fname+"\"\n")
-            f.write("set notitle\n")
-            f.write("set nokey\n")
-            f.write("set logscale x\n")
-            f.write("set logscale y\n")
+        f = ""
+        if t == "eps":
             if opts.pretty_graphs:
-                solver = re.sub(r"-tstamp.*", "", solver)
-                solver2 = re.sub(r"-tstamp.*", "", solver2)
-            f.write("set xlabel  \""+solver+"\"\n")
-            f.write("set ylabel  \""+solver2+"\"\n")
-            f.write("f(x) = x\n")
-            f.write("plot[0.001:{tout}][0.001:{tout}] \\\n".format(tout = timeout))
-            f.write("\""+fname_gnuplot_data+"\" u 1:2 with points pt 9\\\n")
-            f.write(",f(x) with lines ls 2 title \"y=x\"\n")
-            f.write("\n")
-        return fname
-
-    solvers = get_solvers()
-    for solver in solvers:
-        for solver2 in solvers:
-            if solver == solver2:
-                continue
-            # create data file
-            with sqlite3.connect("results.db") as cur:
-                ret = cur.execute("""
-                select
-                    (case when a.result=='unknown' then a.tout else a.t end),
-                    (case when b.result=='unknown' then b.tout else b.t end),
-                    a.name
-                from results as a, results as b
-                where
-                    a.solver='{solver}' and b.solver='{solver2}' and a.name=b.name""".format(
-                        solver=solver, solver2=solver2))
-                fname_gnuplot_data = "graphs/compare-"+solver+"-"+solver2+".gnuplotdata"
-                with open(fname_gnuplot_data, "w") as f:
-                    for line in ret:
-                        solver1_t = line[0]
-                        solver2_t = line[1]
-                        name = line[2]
-                        f.write("%f %f %s\n" % (solver1_t, solver2_t, name))
-
-            # generate plot
-            fname_gnuplot = "compare-{solver}-vs-{solver2}.gnuplot".format(
-                solver=solver, solver2=solver2)
-            os.system("rm -f \"{fname}\"".format(fname=fname_gnuplot))
-            if opts.pretty_graphs:
-                todo =  ["eps"]
+                f += "set term postscript eps color lw 1 \"Helvetica\" 16 size 3,2\n"
             else:
-                todo = ["eps", "png"]
-            for t in todo:
-                name = genplot(t, solver, solver2)
-                print("Generating graph: graphs/{name}".format(name=name))
-            os.system("gnuplot "+fname_gnuplot)
-            unlink(fname_gnuplot)
+                f += "set term postscript eps color lw 1 \"Helvetica\" 8 size 6,4\n"
+        elif t == "png":
+            f += "set term png size 600,400\n"
+        else:
+            assert False
+
+        f += "set output \""+graphs_dir+"/"+fname+"\"\n"
+        f += "set notitle\n"
+        f += "set nokey\n"
+        f += "set logscale x\n"
+        f += "set logscale y\n"
+        if opts.pretty_graphs:
+            solver = table.get_pretty_name(solver)
+            solver2 = table.get_pretty_name(solver2)
+        f += "set xlabel  \""+solver+"\"\n"
+        f += "set ylabel  \""+solver2+"\"\n"
+        f += "f(x) = x\n"
+        f += "plot[0.001:{tout}][0.001:{tout}] \\\n".format(tout = timeout)
+        f += "\""+fname_gnuplot_data+"\" u {x}:{y} with points pt 9\\\n".format(x=i+1, y=j+1)
+        f += ",f(x) with lines ls 2 title \"y=x\"\n"
+        f += "\n"
+        return (fname, f)
+
+    solvers = table.solvers
+    # create data file, with '?' marking instances a solver was not run on
+    fname_gnuplot_data = graphs_dir+"/compare.gnuplotdata"
+    columns: list[list[str]] = []
+    with open(fname_gnuplot_data, "w") as f:
+        for name in table.instances:
+            times = []
+            for solver in solvers:
+                t = table.get_time(solver, name)
+                times.append("?" if t is None else "%f" % t)
+            columns.append(times)
+            f.write("%s %s\n" % (" ".join(times), name))
+
+    if opts.pretty_graphs:
+        todo =  ["eps"]
+    else:
+        todo = ["eps", "png"]
+    old_stamps = load_compare_stamps()
+    stamps = {}
+    fname_gnuplot = "compare.gnuplot"
+    num_plots = 0
+    with open(fname_gnuplot, "w") as f:
+        f.write("set datafile missing \"?\"\n")
+        for i in range(len(solvers)):
+            for j in range(i+1, len(solvers)):
+                data = "\n".join(["%s %s" % (c[i], c[j]) for c in columns])
+                for t in todo:
+                    name, plot = genplot(t, i, j)
+                    h = hashlib.sha256((data + plot).encode("utf-8")).hexdigest()
+                    stamps[name] = h
+                    if old_stamps.get(name) == h and os.path.exists(graphs_dir+"/"+name):
+                        print("Graph up to date: {graphs_dir}/{name}".format(graphs_dir=graphs_dir, name=name))
+                        continue
+                    print("Generating graph: {graphs_dir}/{name}".format(graphs_dir=graphs_dir, name=name))
+                    f.write(plot)
+                    num_plots += 1
+
+    ret = 0
+    if num_plots > 0:
+        ret = os.system("gnuplot "+fname_gnuplot)
+    if ret == 0:
+        with open(fname_compare_stamps % graphs_dir, "w") as f:
+            json.dump(stamps, f)
+    else:
+        print("ERROR: gnuplot failed to generate the comparative graphs")
+    unlink(fname_gnuplot)
 
-            # delete data file
-            unlink(fname_gnuplot_data)
+    # delete data file
+    unlink(fname_gnuplot_data)
 
 
 # Generates  a Cumulative Distribution Function (CDF) from the data
 # See: https://online.stat.psu.edu/stat414/lesson/14/14.2
-def gen_cdf_graph() -> None:
-    cdf_files = gen_cdf_files()
-    fname_gnuplot = "cdf.gnuplot"
+def gen_cdf_graph(table: ResultTable) -> None:
+    gen_solved_graph(table, "cdf")
+
+
+# Generates a cactus plot: the same data as the CDF, with the axes swapped, as
+# is common in solver competitions
+def gen_cactus_graph(table: ResultTable) -> None:
+    gen_solved_graph(table, "cactus")
+
+
+def gen_solved_graph(table: ResultTable, kind: str) -> None:
+    cdf_files = gen_cdf_files(table)
+    fname_gnuplot = "%s.gnuplot" % kind
     os.system("rm -f \"{fname}\"".format(fname=fname_gnuplot))
     if opts.pretty_graphs:
         todo =  ["eps"]
@@ -196,22 +319,27 @@ def gen_cdf_graph() -> None:
             else:
                 assert False
 
-            f.write("set output \"graphs/cdf.{ext}\"\n".format(ext=ext))
+            f.write("set output \"{graphs_dir}/{kind}.{ext}\"\n".format(graphs_dir=graphs_dir, kind=kind, ext=ext))
             f.write("set title \"Solvers\"\n")
             f.write("set notitle\n")
             f.write("set key bottom right\n")
-            f.write("unset logscale x\n")
-            f.write("unset logscale y\n")
-            f.write("set ylabel  \"Problems solved\"\n")
-            f.write("set xlabel \"Wallclock Time (s)\"\n")
+            time_axis, solved_axis = ("x", "y") if kind == "cdf" else ("y", "x")
+            if opts.logx:
+                f.write("set logscale %s\n" % time_axis)
+            else:
+                f.write("unset logscale %s\n" % time_axis)
+            f.write("unset logscale %s\n" % solved_axis)
+            f.write("set %slabel  \"Problems solved\"\n" % solved_axis)
+            f.write("set %slabel \"Wallclock Time (s)\"\n" % time_axis)
             f.write("plot \\\n")
             towrite = ""
             for fname, solver, _ in cdf_files:
                 if opts.pretty_graphs:
-                    solver = re.sub(r"-tstamp.*", "", solver)
-                towrite += "\""+fname+"\" u 2:1 with linespoints  title \""+solver+"\""
+                    solver = table.get_pretty_name(solver)
+                cols = "2:1" if kind == "cdf" else "1:2"
+                towrite += "\""+fname+"\" u "+cols+" with linespoints  title \""+solver+"\""
                 towrite += ",\\\n"
-            towrite = towrite[:(len(towrite)-4)]
+            towrite = towrite[:(len(towrite)-3)]
             f.write(towrite)
             f.write("\n")
 
@@ -220,71 +348,134 @@ def gen_cdf_graph() -> None:
     for fname, _, _ in cdf_files:
         unlink(fname)
 
-    print("graph generated: graphs/cdf.eps")
-    print("graph generated: graphs/cdf.png")
-
-
-def check_all_same_tout() -> None:
-    with sqlite3.connect("results.db") as cur:
-        ret = cur.execute("""
-        select tout
-        from results
-        group by tout""")
-        touts = []
-        for line in ret:
-            touts.append(line[0])
-
+    print("graph generated: %s/%s.eps" % (graphs_dir, kind))
+    print("graph generated: %s/%s.png" % (graphs_dir, kind))
+
+
+# the solver a portfolio member refers to: its full name, its --pretty name,
+# or the name of its tool, as long as that's unique. None if there's none
+def find_member(table: ResultTable, ref: str) -> str|None:
+    for match in [lambda s: s == ref, lambda s: table.get_pretty_name(s) == ref,
+                  lambda s: table.info[s][0] == ref]:
+        found = [s for s in table.solvers if match(s)]
+        if len(found) == 1:
+            return found[0]
+        if len(found) > 1:
+            print("ERROR: '%s' matches several solvers: %s" % (ref, ", ".join(found)))
+            print("Use the full name of the solver, or select the runs with --runs")
+            exit(-1)
+    return None
+
+
+# Adds the solvers simulated from the results of the others to the table (see
+# portfolio.py): the virtual best solver with --vbs, the parallel portfolios of
+# all combinations of --portfolio solvers, and the sequential schedules given
+# by --schedule
+def add_portfolios(table: ResultTable) -> None:
+    tout = max(table.get_touts(table.solvers))
+
+    def name(solver: str) -> str:
+        return table.get_pretty_name(solver) if opts.pretty_graphs else solver
+
+    if opts.vbs:
+        table.add_synthetic("VBS", portfolio.simulate_parallel(
+            [table.rows[s] for s in table.solvers], table.instances, tout), len(table.solvers))
+
+    if opts.portfolio is not None:
+        try:
+            sizes = [int(k) for k in opts.portfolio.split(",")]
+        except ValueError:
+            print("ERROR: portfolio sizes '%s' are not a comma separated list of numbers" % opts.portfolio)
+            exit(-1)
+        for k in sizes:
+            if k < 2 or k > len(table.solvers):
+                print("ERROR: portfolio size %d must be between 2 and the number of solvers, %d" % (k, len(table.solvers)))
+                exit(-1)
+            cores = k if opts.cores is None else min(k, opts.cores)
+            for members in itertools.combinations(table.solvers, k):
+                label = "par(%s)" % " + ".join([name(s) for s in members])
+                if cores < k:
+                    label += " on %d cores" % cores
+                table.add_synthetic(label, portfolio.simulate_parallel(
+                    [table.rows[s] for s in members], table.instances, tout, cores), cores)
+
+    for spec in opts.schedules or []:
+        members = []
+        labels = []
+        for part in spec.split(","):
+            part = part.strip()
+            ref, _, slice_t = part.rpartition(":")
+            # timestamps in full names contain colons too
+            if ref == "" or not re.match(r"^[0-9.]+$", slice_t) or find_member(table, part) is not None:
+                # no time slice, run until the timeout
+                ref, slice_t = part, None
+            solver = find_member(table, ref)
+            if solver is None:
+                print("ERROR: '%s' of schedule '%s' matches no solver. Solvers: %s" % (ref, spec, ", ".join(table.solvers)))
+                exit(-1)
+            members.append((table.rows[solver], None if slice_t is None else float(slice_t)))
+            labels.append(name(solver) if slice_t is None else "%s %ss" % (name(solver), slice_t))
+        table.add_synthetic("seq(%s)" % ", ".join(labels), portfolio.simulate_schedule(
+            members, table.instances, tout), 1)
+
+
+# Ranks all solvers, the simulated ones too, by PAR-2 over all instances:
+# unsolved instances, and the ones a solver was not run on, count as twice the
+# timeout. Of two solvers with the same PAR-2, the one using fewer cores is
+# ranked first. The ranking is written to ranking.csv, next to the graphs
+def gen_ranking(table: ResultTable) -> None:
+    tout = max(table.get_touts(table.solvers))
+    ranking = []
+    for solver in table.solvers + table.synthetic:
+        solved = len([n for n in table.instances if portfolio.get_solve_time(table.rows[solver], n) is not None])
+        par2 = portfolio.get_par2(table.rows[solver], table.instances, tout)
+        ranking.append((par2, table.cores[solver], solver, solved))
+    ranking.sort()
+
+    fname_ranking = graphs_dir+"/ranking.csv"
+    with open(fname_ranking, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "solver", "cores", "solved", "cases", "par2"])
+        for i, (par2, cores, solver, solved) in enumerate(ranking):
+            writer.writerow([i+1, solver, cores, solved, len(table.instances), "%.3f" % par2])
+    print("Ranking by PAR-2 over %d cases:" % len(table.instances))
+    for i, (par2, cores, solver, solved) in enumerate(ranking):
+        if opts.pretty_graphs:
+            solver = table.get_pretty_name(solver)
+        print("%3d. %-60s cores: %2d solved: %4d PAR-2: %10.3f" % (i+1, solver, cores, solved, par2))
+    print("Ranking written to %s" % fname_ranking)
+
+
+def check_all_same_tout(table: ResultTable) -> None:
+    touts = table.get_touts(table.solvers)
     if len(touts) > 1:
         print("ERROR. Some systems were ran with differing timeouts: ")
         for t in touts:
             print("timout observed: ", t)
-        print("You must delete the results.db database and run all with the same timeouts")
+        print("You must only select runs with the same timeout (see --runs), or delete the results.db database and run all with the same timeouts")
         exit(-1)
     if len(touts) == 0:
         print("ERROR: no data in database!")
         exit(-1)
 
-def gen_boxgraphs() -> None:
-    all_instances = []
-    with sqlite3.connect("results.db") as cur:
-        instances = cur.execute("select name from results group by name")
-    for n in instances:
-        all_instances.append(n[0])
-
-    all_solvers = []
-    with sqlite3.connect("results.db") as cur:
-        solvers = cur.execute("select solver from results group by solver")
-    for n in solvers:
-        all_solvers.append(n[0])
+def gen_boxgraphs(table: ResultTable) -> None:
+    all_instances = table.instances
+    all_solvers = table.solvers
 
     # generate data
     fname_boxdata = "boxdata.dat"
-    tout = None
     with open(fname_boxdata, "w") as f:
-        with sqlite3.connect("results.db") as cur:
-            solve_time = {}
-            for i in range(len(all_instances)):
-                instance = all_instances[i]
-                ret = cur.execute("""
-                select name, solver, (case when result=='unknown' then tout else t end),tout
-                from results
-                where name='{instance}'""".format(instance=instance))
-                for l in ret:
-                    assert instance == l[0]
-                    solver = l[1]
-                    t = l[2]
-                    tout = l[3]
-                    t = min(t, tout)
-                    solve_time[solver] = t
-                instance_clean = os.path.basename(instance).replace("_", "\\\\\\_")
-                f.write("{i} {instance}".format(instance=instance_clean, i=i+1))
-                for solver in all_solvers:
-                    assert tout is not None
-                    if solver not in solve_time:
-                        print("ERROR, solver '{solver}' was not run on instance '{instance}'".format(instance=instance, solver=solver))
-                        exit(-1)
-                    f.write(" {t}".format(t=solve_time[solver]))
-                f.write("\n")
+        for i in range(len(all_instances)):
+            instance = all_instances[i]
+            instance_clean = os.path.basename(instance).replace("_", "\\\\\\_")
+            f.write("{i} {instance}".format(instance=instance_clean, i=i+1))
+            for solver in all_solvers:
+                t = table.get_time(solver, instance)
+                if t is None:
+                    print("ERROR, solver '{solver}' was not run on instance '{instance}'".format(instance=instance, solver=solver))
+                    exit(-1)
+                f.write(" {t}".format(t=t))
+            f.write("\n")
 
     # generate gnuplot file
     fname_gnuplot = "boxplot.gnuplot"
@@ -295,8 +486,8 @@ def gen_boxgraphs() -> None:
                 f.write("set term postscript eps color lw 1 \"Helvetica\" 6 size 8,3\n")
             elif t == "png":
                 f.write("set term pngcairo font \"Arial,9\" size 1800,900\n")
-            f.write("set output \"graphs/boxchart.{t}\"\n".format(t=t))
-            print("Generating graphs/boxchart.{t}".format(t=t))
+            f.write("set output \"{graphs_dir}/boxchart.{t}\"\n".format(graphs_dir=graphs_dir, t=t))
+            print("Generating {graphs_dir}/boxchart.{t}".format(graphs_dir=graphs_dir, t=t))
             f.write("set boxwidth {w}\n".format(w=str(w)))
             f.write("set style fill solid\n")
             f.write("set xtics rotate by -45\n")
@@ -325,6 +516,310 @@ def gen_boxgraphs() -> None:
     unlink(fname_boxdata)
 
 
+# Generates a stacked bar graph of the time each solver spent in the phases
+# reported by the tools (see parse_metrics() in runner.py), over all cases.
+# Time not covered by any reported phase is shown as "other"
+def gen_phases_graph(con: sqlite3.Connection) -> None:
+    where, params = get_filter()
+    ret = con.execute("""
+    select tools.name, tool_versions.version, runs.tstamp, runs.solc_version,
+           sum(results.t), sum((select sum(phases.t) from phases where phases.result_id = results.id))
+    from results
+    join runs on runs.id = results.run_id
+    join tool_versions on tool_versions.id = results.tool_version_id
+    join tools on tools.id = tool_versions.tool_id
+    join cases on cases.id = results.case_id
+    %s
+    group by tools.name, tool_versions.version, runs.tstamp
+    order by tools.name, tool_versions.version, runs.tstamp""" % where, params)
+    totals: dict[str, float] = {}
+    for tool, version, tstamp, solc_version, t, t_phases in ret:
+        solver = "%s-%s-tstamp-%s" % (tool, version, tstamp)
+        if opts.pretty_graphs:
+            solver = get_pretty_name(tool, version, solc_version)
+        totals[solver] = (t or 0.0) - (t_phases or 0.0)
+
+    ret = con.execute("""
+    select tools.name, tool_versions.version, runs.tstamp, runs.solc_version, phases.name, sum(phases.t)
+    from phases
+    join results on results.id = phases.result_id
+    join runs on runs.id = results.run_id
+    join tool_versions on tool_versions.id = results.tool_version_id
+    join tools on tools.id = tool_versions.tool_id
+    join cases on cases.id = results.case_id
+    %s
+    group by tools.name, tool_versions.version, runs.tstamp, phases.name""" % where, params)
+    phases: dict[str, dict[str, float]] = {}
+    for tool, version, tstamp, solc_version, name, t in ret:
+        solver = "%s-%s-tstamp-%s" % (tool, version, tstamp)
+        if opts.pretty_graphs:
+            solver = get_pretty_name(tool, version, solc_version)
+        phases.setdefault(name, {})[solver] = t
+    if len(phases) == 0:
+        print("No phases were reported by the tools, not generating the phases graph")
+        return
+    names = sorted(phases.keys()) + ["other"]
+    phases["other"] = {solver: max(0.0, t) for solver, t in totals.items()}
+
+    fname_data = graphs_dir+"/phases.gnuplotdata"
+    with open(fname_data, "w") as f:
+        f.write("solver %s\n" % " ".join(names))
+        for solver in totals:
+            f.write("\"%s\" %s\n" % (solver, " ".join(
+                ["%f" % phases[name].get(solver, 0.0) for name in names])))
+
+    fname_gnuplot = "phases.gnuplot"
+    with open(fname_gnuplot, "w") as f:
+        for t in ["eps", "png"]:
+            if t == "eps":
+                f.write("set term postscript eps color lw 1 \"Helvetica\" 8 size 6,4\n")
+            elif t == "png":
+                f.write("set term png size 800,600\n")
+            f.write("set output \"{graphs_dir}/phases.{t}\"\n".format(graphs_dir=graphs_dir, t=t))
+            print("Generating {graphs_dir}/phases.{t}".format(graphs_dir=graphs_dir, t=t))
+            f.write("set style data histograms\n")
+            f.write("set style histogram rowstacked\n")
+            f.write("set style fill solid border -1\n")
+            f.write("set boxwidth 0.6\n")
+            f.write("set key outside right\n")
+            f.write("set xtics rotate by -45\n")
+            f.write("set ylabel \"Wallclock Time (s)\"\n")
+            f.write("plot for [i=2:{n}] \"{fname}\" using i:xtic(1) title columnheader(i)\n".format(
+                n=len(names)+1, fname=fname_data))
+    os.system("gnuplot "+fname_gnuplot)
+    unlink(fname_gnuplot)
+    unlink(fname_data)
+
+
+# Prints the statistics of the repeated runs of each case, and writes them to
+# stats.csv, next to the graphs. Cases whose median has a wide confidence
+# interval are flagged as noisy, comparisons involving them can't be trusted
+def gen_stats(con: sqlite3.Connection) -> None:
+    samples: dict[tuple[str, str], list[float]] = {}
+    verdicts: dict[tuple[str, str], set[str]] = {}
+    where, params = get_filter()
+    if where == "":
+        where = "where samples.t is not null"
+    else:
+        where += " and samples.t is not null"
+    ret = con.execute("""
+    select tools.name, tool_versions.version, runs.tstamp, cases.name,
+           samples.t, samples.result
+    from samples
+    join results on results.id = samples.result_id
+    join runs on runs.id = results.run_id
+    join tool_versions on tool_versions.id = results.tool_version_id
+    join tools on tools.id = tool_versions.tool_id
+    join cases on cases.id = results.case_id
+    %s
+    order by tools.name, tool_versions.version, runs.tstamp, cases.name, samples.idx""" % where, params)
+    for tool, version, tstamp, name, t, result in ret:
+        solver = "%s-%s-tstamp-%s" % (tool, version, tstamp)
+        samples.setdefault((solver, name), []).append(t)
+        verdicts.setdefault((solver, name), set()).add(result)
+
+    fname_stats = graphs_dir+"/stats.csv"
+    num_noisy = 0
+    with open(fname_stats, "w", newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["solver", "name", "n", "median", "min", "ci_lo", "ci_hi", "noisy", "verdicts_differ"])
+        print("%-40s %-70s %3s %9s %9s %20s" % ("solver", "name", "n", "median", "min", "95% CI"))
+        for (solver, name), ts in samples.items():
+            # cases that were not repeated have no statistics to speak of
+            if len(ts) < 2:
+                continue
+            med = statistics.median(ts)
+            lo, hi = bootstrap_ci(ts)
+            noisy = is_noisy(ts)
+            differ = len(verdicts[(solver, name)]) > 1
+            flags = ""
+            if noisy:
+                num_noisy += 1
+                flags += " NOISY"
+            if differ:
+                flags += " VERDICTS-DIFFER"
+            print("%-40s %-70s %3d %9.3f %9.3f [%8.3f, %8.3f]%s" % (
+                solver, name, len(ts), med, min(ts), lo, hi, flags))
+            writer.writerow([solver, name, len(ts), med, min(ts), lo, hi, int(noisy), int(differ)])
+    num_repeated = len([ts for ts in samples.values() if len(ts) >= 2])
+    print("Noisy cases: %d out of %d repeated cases" % (num_noisy, num_repeated))
+    print("Statistics generated: %s" % fname_stats)
+
+
+# Fits the growth of the solve time with the size of the case: as a power law
+# t = a * n^b, and as an exponential t = a * c^n. Only solved cases count, at
+# least 3 sizes are needed. Returns b, c and the R^2 of both fits
+def fit_growth(points: list[tuple[int, float]]) -> tuple[float, float, float, float]|None:
+    points = [(n, t) for n, t in points if n > 0 and t > 0]
+    if len(set(n for n, _ in points)) < 3:
+        return None
+    logt = [math.log(t) for _, t in points]
+    b, _, r2_pow = linear_fit([math.log(n) for n, _ in points], logt)
+    c, _, r2_exp = linear_fit([float(n) for n, _ in points], logt)
+    return (b, math.exp(c), r2_pow, r2_exp)
+
+
+# Plots the time and memory of each solver against the size of the cases of
+# each family generated by gen_families.py, and fits how the time grows. The
+# limit of a solver is the largest size up to which it solved all cases of the
+# family. The fits and limits are written to scaling.csv, next to the graphs
+def gen_scaling_graphs(con: sqlite3.Connection) -> None:
+    where, params = get_filter()
+    if where == "":
+        where = "where cases.family is not null"
+    else:
+        where += " and cases.family is not null"
+    ret = con.execute("""
+    select tools.name, tool_versions.version, runs.tstamp, runs.solc_version, cases.family,
+           cases.expected, cases.param, results.result, results.t, results.memMB, runs.tout
+    from results
+    join runs on runs.id = results.run_id
+    join tool_versions on tool_versions.id = results.tool_version_id
+    join tools on tools.id = tool_versions.tool_id
+    join cases on cases.id = results.case_id
+    %s
+    order by cases.family, cases.param""" % where, params)
+    # data[family][solver][param] = (solved, t, memMB)
+    data: dict[str, dict[str, dict[int, tuple[bool, float, float|None]]]] = {}
+    for tool, version, tstamp, solc_version, family, expected, param, result, t, memMB, tout in ret:
+        solver = "%s-%s-tstamp-%s" % (tool, version, tstamp)
+        if opts.pretty_graphs:
+            solver = get_pretty_name(tool, version, solc_version)
+        # the safe and unsafe variants are separate families
+        family = "%s-%s" % (family, expected)
+        solved = result != "unknown" and t is not None
+        t = min(t, tout) if solved else tout
+        data.setdefault(family, {}).setdefault(solver, {})[param] = (solved, t, memMB)
+    if len(data) == 0:
+        print("No results of the families of gen_families.py, not generating the scaling graphs")
+        return
+
+    fname_scaling = graphs_dir+"/scaling.csv"
+    with open(fname_scaling, "w", newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["family", "solver", "sizes", "limit", "power_exponent", "power_r2", "exp_base", "exp_r2"])
+        print("%-20s %-40s %6s %6s %22s %22s" % ("family", "solver", "sizes", "limit", "power law (exp, R^2)", "exponential (base, R^2)"))
+        for family, solvers in data.items():
+            for solver, points in solvers.items():
+                limit = None
+                for param in sorted(points):
+                    if not points[param][0]:
+                        break
+                    limit = param
+                fit = fit_growth([(n, t) for n, (solved, t, _) in points.items() if solved])
+                fit_pow = fit_exp = "-"
+                row = [family, solver, len(points), "" if limit is None else limit, "", "", "", ""]
+                if fit is not None:
+                    b, c, r2_pow, r2_exp = fit
+                    fit_pow = "n^%.2f, %.2f" % (b, r2_pow)
+                    fit_exp = "%.3f^n, %.2f" % (c, r2_exp)
+                    row[4:] = [b, r2_pow, c, r2_exp]
+                print("%-20s %-40s %6d %6s %22s %22s" % (family, solver, len(points),
+                                                         "-" if limit is None else limit, fit_pow, fit_exp))
+                writer.writerow(row)
+    print("Scaling fits generated: %s" % fname_scaling)
+
+    fname_gnuplot = "scaling.gnuplot"
+    fnames_data = []
+    with open(fname_gnuplot, "w") as f:
+        f.write("set datafile missing \"?\"\n")
+        for family, solvers in data.items():
+            names = list(solvers.keys())
+            sizes = sorted(set(n for points in solvers.values() for n in points))
+            fname_data = "%s/scaling-%s.gnuplotdata" % (graphs_dir, family)
+            fnames_data.append(fname_data)
+            with open(fname_data, "w") as fd:
+                for n in sizes:
+                    cols = ["%d" % n]
+                    for solver in names:
+                        p = solvers[solver].get(n)
+                        cols.append("?" if p is None else "%f" % p[1])
+                        cols.append("?" if p is None or p[2] is None else "%f" % p[2])
+                    fd.write(" ".join(cols) + "\n")
+            for what, ylabel, offs in [("time", "Wallclock Time (s)", 2), ("mem", "Memory (MB)", 3)]:
+                for t in ["eps", "png"]:
+                    if t == "eps":
+                        f.write("set term postscript eps color lw 1 \"Helvetica\" 8 size 4,3\n")
+                    elif t == "png":
+                        f.write("set term png size 800,600\n")
+                    f.write("set output \"{graphs_dir}/scaling-{family}-{what}.{t}\"\n".format(graphs_dir=graphs_dir, family=family, what=what, t=t))
+                    print("Generating {graphs_dir}/scaling-{family}-{what}.{t}".format(graphs_dir=graphs_dir, family=family, what=what, t=t))
+                    f.write("set title \"%s\"\n" % family)
+                    f.write("set key top left\n")
+                    f.write("set logscale x 2\n")
+                    f.write("set logscale y\n")
+                    f.write("set xlabel \"Size\"\n")
+                    f.write("set ylabel \"%s\"\n" % ylabel)
+                    f.write("plot " + ", ".join(["\"%s\" u 1:%d with linespoints title \"%s\"" % (
+                        fname_data, offs + 2*i, solver) for i, solver in enumerate(names)]) + "\n")
+    os.system("gnuplot "+fname_gnuplot)
+    unlink(fname_gnuplot)
+    for fname in fnames_data:
+        unlink(fname)
+
+
+# Plots the memory of the tools over time, for every case matching
+# --timeline-cases that was run with `./bench.py --sample`, with a line per
+# solver and the memory limit of the run
+def gen_timeline_graphs(con: sqlite3.Connection) -> None:
+    where, params = get_filter()
+    ret = con.execute("""
+    select tools.name, tool_versions.version, runs.tstamp, runs.solc_version, cases.name, runs.memoutMB, timelines.data
+    from timelines
+    join results on results.id = timelines.result_id
+    join runs on runs.id = results.run_id
+    join tool_versions on tool_versions.id = results.tool_version_id
+    join tools on tools.id = tool_versions.tool_id
+    join cases on cases.id = results.case_id
+    %s
+    order by cases.name, tools.name, tool_versions.version, runs.tstamp""" % where, params)
+    # timelines[name][solver] = (memoutMB, timeline)
+    timelines: dict[str, dict[str, tuple[float, dict]]] = {}
+    for tool, version, tstamp, solc_version, name, memoutMB, data in ret:
+        if not re.search(opts.timeline_cases, name):
+            continue
+        solver = "%s-%s-tstamp-%s" % (tool, version, tstamp)
+        if opts.pretty_graphs:
+            solver = get_pretty_name(tool, version, solc_version)
+        timelines.setdefault(name, {})[solver] = (memoutMB, json.loads(data))
+    if len(timelines) == 0:
+        print("No timelines recorded, run ./bench.py --sample first. Not generating the timeline graphs")
+        return
+
+    fname_gnuplot = "timeline.gnuplot"
+    fnames_data = []
+    with open(fname_gnuplot, "w") as f:
+        for name, solvers in timelines.items():
+            fname_graph = "timeline-%s" % re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+            plots = []
+            for i, (solver, (memoutMB, timeline)) in enumerate(solvers.items()):
+                fname_data = "%s/%s-%d.gnuplotdata" % (graphs_dir, fname_graph, i)
+                fnames_data.append(fname_data)
+                with open(fname_data, "w") as fd:
+                    for t, rss in zip(timeline["t"], timeline["rss"]):
+                        fd.write("%f %f\n" % (t, rss))
+                plots.append("\"%s\" u 1:2 with lines title \"%s\"" % (fname_data, solver))
+            memouts = set(memoutMB for memoutMB, _ in solvers.values())
+            for memoutMB in memouts:
+                plots.append("%f with lines dt 2 lc rgb \"red\" title \"limit %d MB\"" % (memoutMB, memoutMB))
+            for t in ["eps", "png"]:
+                if t == "eps":
+                    f.write("set term postscript eps color lw 1 \"Helvetica\" 8 size 6,3\n")
+                elif t == "png":
+                    f.write("set term png size 1000,500\n")
+                f.write("set output \"{graphs_dir}/{fname}.{t}\"\n".format(graphs_dir=graphs_dir, fname=fname_graph, t=t))
+                print("Generating {graphs_dir}/{fname}.{t}".format(graphs_dir=graphs_dir, fname=fname_graph, t=t))
+                f.write("set title \"%s\" noenhanced\n" % name)
+                f.write("set key top left noenhanced\n")
+                f.write("set xlabel \"Wallclock Time (s)\"\n")
+                f.write("set ylabel \"Resident Memory (MB)\"\n")
+                f.write("plot [0:] [0:] " + ", ".join(plots) + "\n")
+    os.system("gnuplot "+fname_gnuplot)
+    unlink(fname_gnuplot)
+    for fname in fnames_data:
+        unlink(fname)
+
+
 # Set up options for main
 def set_up_parser() -> optparse.OptionParser:
     usage = "usage: %prog [options]"
@@ -340,8 +835,40 @@ def set_up_parser() -> optparse.OptionParser:
                       dest="box_only", help="Only generate box graph")
     parser.add_option("--cdf", action="store_true", default=False,
                       dest="cdf_only", help="Only generate CDF graph")
+    parser.add_option("--cactus", action="store_true", default=False,
+                      dest="cactus_only", help="Only generate cactus graph")
+    parser.add_option("--rank", action="store_true", default=False,
+                      dest="rank_only", help="Only rank the solvers by PAR-2")
     parser.add_option("--comp", action="store_true", default=False,
                       dest="comp_only", help="Only generate comparative graph(s)")
+    parser.add_option("--phases", action="store_true", default=False,
+                      dest="phases_only", help="Only generate the graph of the time spent in the phases reported by the tools")
+    parser.add_option("--scaling", action="store_true", default=False,
+                      dest="scaling_only", help="Only generate the graphs of the time and memory against the size of the cases generated by gen_families.py")
+    parser.add_option("--timeline", action="store_true", default=False,
+                      dest="timeline_only", help="Only generate the graphs of the memory of the tools over time, see ./bench.py --sample")
+    parser.add_option("--timeline-cases", dest="timeline_cases", type=str, default=".*",
+                      help="Only generate the memory over time graphs of the cases matching this regexp. Default: %default")
+    parser.add_option("--stats", action="store_true", default=False,
+                      dest="stats_only", help="Only generate statistics of the repeated runs")
+    parser.add_option("--logx", action="store_true", default=False,
+                      dest="logx", help="Use a logarithmic time axis on the CDF and cactus graphs")
+    parser.add_option("--vbs", action="store_true", default=False,
+                      dest="vbs", help="Add the virtual best solver, the best of all solvers on each case, to the CDF and cactus graphs and the ranking")
+    parser.add_option("--portfolio", dest="portfolio", type=str, default=None,
+                      help="Add the parallel portfolios of all combinations of this many solvers, e.g. '2,3', to the CDF and cactus graphs and the ranking. A portfolio runs its solvers in parallel and takes the first verdict")
+    parser.add_option("--cores", dest="cores", type=int, default=None,
+                      help="Cores available to a parallel portfolio. Solvers of larger portfolios share the cores, and take longer. Default: a core per solver")
+    parser.add_option("--schedule", dest="schedules", type=str, action="append", default=None,
+                      help="Add a sequential schedule, running the solvers one after the other for a time slice each, e.g. 'hevm-z3:5,halmos:20,hevm-cvc5'. A solver without a time slice runs until the timeout. Solvers are given by their name, their --pretty name, or their tool. Can be given several times")
+    parser.add_option("--tools", dest="tools", type=str, default=None,
+                      help="Only use the results of these tools, separated by commas. Default: all")
+    parser.add_option("--versions", dest="versions", type=str, default=None,
+                      help="Only use the results of these tool versions, separated by commas. Default: all")
+    parser.add_option("--runs", dest="runs", type=str, default=None,
+                      help="Only use the results of the runs with these timestamps, separated by commas. Default: all")
+    parser.add_option("--solcv", dest="solc_versions", type=str, default=None,
+                      help="Only use the results of these solc versions, separated by commas. Default: all")
     parser.add_option("--pretty", action="store_true", default=False,
                       dest="pretty_graphs", help="Generate pretty, less cluttered graph(s)")
 
@@ -357,15 +884,65 @@ def main() -> None:
     parser = set_up_parser()
     global opts
     (opts, _) = parser.parse_args()
-    only_some : bool = opts.cdf_only or opts.box_only or opts.comp_only
+    only_some : bool = opts.cdf_only or opts.cactus_only or opts.rank_only or opts.box_only or opts.comp_only or opts.stats_only or opts.phases_only or opts.scaling_only or opts.timeline_only
+    if opts.cores is not None and opts.cores < 1:
+        print("ERROR: number of cores must be at least 1")
+        exit(-1)
 
-    check_all_same_tout()
+    with closing(resultsdb.connect()) as con:
+        solc_versions = get_solc_versions(con)
+        if len(solc_versions) <= 1:
+            gen_graphs(con, only_some)
+            return
+
+        global graphs_dir, multi_solc
+        selected = opts.solc_versions
+        for v in solc_versions:
+            print("Graphs of solc %s:" % v)
+            opts.solc_versions = v
+            graphs_dir = "graphs/solc-%s" % v
+            os.makedirs(graphs_dir, exist_ok=True)
+            gen_graphs(con, only_some)
+
+        # the solc versions side by side. Portfolios are only simulated per
+        # solc version, their members are named without it
+        print("Graphs of solc %s together:" % ", ".join(solc_versions))
+        opts.solc_versions = selected
+        graphs_dir = "graphs"
+        multi_solc = True
+        table = ResultTable(con)
+        check_all_same_tout(table)
+        if not only_some or opts.cdf_only:
+            gen_cdf_graph(table)
+        if not only_some or opts.cactus_only:
+            gen_cactus_graph(table)
+        if not only_some or opts.rank_only:
+            gen_ranking(table)
+
+
+# Generates the graphs of the results selected by get_filter()
+def gen_graphs(con: sqlite3.Connection, only_some: bool) -> None:
+    table = ResultTable(con)
+    check_all_same_tout(table)
+    add_portfolios(table)
     if not only_some or opts.cdf_only:
-        gen_cdf_graph()
+        gen_cdf_graph(table)
+    if not only_some or opts.cactus_only:
+        gen_cactus_graph(table)
+    if not only_some or opts.rank_only:
+        gen_ranking(table)
     if not only_some or opts.box_only:
-        gen_boxgraphs()
+        gen_boxgraphs(table)
     if not only_some or opts.comp_only:
-        gen_comparative_graphs()
+        gen_comparative_graphs(table)
+    if not only_some or opts.phases_only:
+        gen_phases_graph(con)
+    if not only_some or opts.scaling_only:
+        gen_scaling_graphs(con)
+    if not only_some or opts.timeline_only:
+        gen_timeline_graphs(con)
+    if not only_some or opts.stats_only:
+        gen_stats(con)
 
 
 if __name__ == "__main__":
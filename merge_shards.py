@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+# Merges the results of the shards of a run, made with `./bench.py --shard
+# i/N` on several machines, into a single run in results.db. The shards are
+# read from their journals, results-tstamp-[timestamp].jsonl, which have the
+# options, tool versions and cases of the shard in their first line. The
+# shards must have been run with the same tool versions, solc versions and
+# limits. Missing shards, and (tool, case) pairs that are missing or were run
+# more than once are reported
+
+import os
+import re
+import json
+import optparse
+from contextlib import closing
+from bench import Case, determine_dstest, result_from_dict, get_db_row, get_run_tstamp
+import blobstore
+import resultsdb
+
+global opts
+opts : optparse.Values
+
+# options that must be the same in all shards
+same_opts = ["solc_version", "timeout", "memoutMB", "versions", "repeat", "warmup", "batch", "ladder"]
+
+
+# the header and the results of the journal. A crash may have cut the last
+# line short, it's skipped
+def load_journal(fname: str) -> tuple[dict, list[dict]]:
+    with open(fname, "r") as f:
+        lines = f.read().split("\n")
+    header = json.loads(lines[0])
+    if "versions" not in header or "cases" not in header:
+        print("ERROR: journal '%s' was written by an older version of bench.py, it can't be merged" % fname)
+        exit(-1)
+    entries = []
+    for line in lines[1:]:
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return (header, entries)
+
+
+def get_case(name: str, sig: str, solc_version: str) -> Case:
+    sol_file, contract, fun = name.split(":")
+    return Case(contract, None, sol_file, determine_dstest(sol_file), fun, sig, None, solc_version)
+
+
+# Set up options for main
+def set_up_parser() -> optparse.OptionParser:
+    usage = "usage: %prog [options] JOURNAL..."
+    desc = """Merge the journals of the shards of a run (results-tstamp-[timestamp].jsonl) into a single run in results.db
+    """
+
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option("--tstamp", dest="tstamp", type=str, default=None,
+                      help="Timestamp of the merged run. Default: the one of the first shard, without the shard")
+    parser.add_option("--force", action="store_true", default=False,
+                      dest="force", help="Store the merged run even if shards or results are missing or duplicated, or a run with its timestamp is in results.db already. Of duplicated results, the first one is kept")
+
+    return parser
+
+
+def main() -> None:
+    parser = set_up_parser()
+    global opts
+    (opts, args) = parser.parse_args()
+    if len(args) == 0:
+        parser.print_help()
+        exit(-1)
+
+    shards = [(fname,) + load_journal(fname) for fname in args]
+    header0 = shards[0][1]
+    for fname, header, _ in shards[1:]:
+        for k in same_opts:
+            if header.get(k) != header0.get(k):
+                print("ERROR: option '%s' is '%s' in %s, but '%s' in %s" % (
+                    k, header.get(k), fname, header0.get(k), shards[0][0]))
+                exit(-1)
+
+    problems = 0
+    num_shards = set()
+    shard_files: dict[int, list[str]] = {}
+    for fname, header, _ in shards:
+        m = re.match(r"^([0-9]+)/([0-9]+)$", header["shard"] or "")
+        if m is None:
+            print("WARNING: %s is not a shard, it was run without --shard" % fname)
+            continue
+        num_shards.add(int(m.group(2)))
+        shard_files.setdefault(int(m.group(1)), []).append(fname)
+    if len(num_shards) > 1:
+        print("ERROR: the shards are of runs split into different numbers of shards: %s" % (
+            ", ".join(["%d" % n for n in sorted(num_shards)])))
+        exit(-1)
+    if len(num_shards) == 1:
+        n = num_shards.pop()
+        missing = [i for i in range(1, n+1) if i not in shard_files]
+        if len(missing) > 0:
+            print("Missing shards: %s (of %d)" % (", ".join(["%d" % i for i in missing]), n))
+            problems += len(missing)
+        for i, fnames in sorted(shard_files.items()):
+            if len(fnames) > 1:
+                print("Shard %d/%d is in several files: %s" % (i, n, ", ".join(fnames)))
+                problems += 1
+
+    versions = header0["versions"]
+    solc_versions = header0["solc_version"].split(",")
+    expected: dict[tuple[str, str, str], str] = {}
+    for fname, header, _ in shards:
+        for name, solc_version in header["cases"]:
+            for tool in versions:
+                key = (tool, name, solc_version)
+                if key in expected:
+                    print("Case %s (solc %s) of %s is in the shards %s and %s" % (
+                        name, solc_version, tool, expected[key], fname))
+                    problems += 1
+                else:
+                    expected[key] = fname
+
+    kept: dict[tuple[str, str, str], dict] = {}
+    for fname, header, entries in shards:
+        solvers = {"%s-%s-tstamp-%s" % (tool, version, header["run"]): tool for tool, version in versions.items()}
+        for d in entries:
+            key = (solvers[d["solver"]], d["name"], d["solc_version"])
+            if key in kept:
+                print("Duplicate result of %s on %s (solc %s) in %s" % (key + (fname,)))
+                problems += 1
+                continue
+            kept[key] = d
+    missing_pairs = sorted(set(expected.keys()) - set(kept.keys()))
+    for key in missing_pairs:
+        print("Missing result of %s on %s (solc %s), shard %s" % (key + (expected[key],)))
+    problems += len(missing_pairs)
+
+    if problems > 0 and not opts.force:
+        print("ERROR: %d problems found, not merging. Use --force to merge anyway" % problems)
+        exit(-1)
+
+    tstamp = opts.tstamp
+    if tstamp is None:
+        tstamp = re.sub(r"-shard[0-9]+of[0-9]+$", "", header0["run"])
+    run_tstamps = [get_run_tstamp(tstamp, v, solc_versions) for v in solc_versions]
+    # a run per solc version, as stored by bench.py
+    rows: dict[str, list[dict]] = {v: [] for v in solc_versions}
+    num_no_blob = 0
+    for (tool, name, solc_version), d in sorted(kept.items()):
+        r = result_from_dict(d, get_case(name, d["sig"], solc_version))
+        if not os.path.exists(blobstore.get_blob_fname(r.out_ref)):
+            num_no_blob += 1
+        rows[solc_version].append(get_db_row(tool, versions[tool], r))
+    with closing(resultsdb.connect()) as con:
+        # the results of the merged tools would replace the ones in the run
+        existing = [t for t in run_tstamps
+                    if con.execute("select id from runs where tstamp = ?", (t,)).fetchone() is not None]
+        if len(existing) > 0 and opts.tstamp is None and not opts.force:
+            print("ERROR: run %s is in %s already. Give the merged run another timestamp with --tstamp, or use --force to replace its results" % (
+                ", ".join(existing), resultsdb.db_fname))
+            exit(-1)
+        for solc_version, solc_rows in rows.items():
+            run_tstamp = get_run_tstamp(tstamp, solc_version, solc_versions)
+            run = {"tstamp": run_tstamp, "solc_version": solc_version,
+                   "tout": header0["timeout"], "memoutMB": header0["memoutMB"]}
+            resultsdb.store_run(con, run, solc_rows)
+            print("Merged %d results of %d files into run %s in %s" % (
+                len(solc_rows), len(shards), run_tstamp, resultsdb.db_fname))
+    if num_no_blob > 0:
+        print("WARNING: the output of %d results is not in %s, copy it from the machines of the shards" % (
+            num_no_blob, blobstore.blob_dir))
+
+
+if __name__ == "__main__":
+    main()
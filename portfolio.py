@@ -0,0 +1,82 @@
+# Simulation of solvers combined from the results of single solvers: a
+# parallel portfolio runs its members at the same time and stops at the first
+# verdict, a sequential schedule runs them one after the other, each for a
+# slice of the time. The virtual best solver (VBS) is the parallel portfolio of
+# all solvers with a core for each. The results of the members are taken as
+# they were measured, i.e. they are assumed not to slow each other down
+# except by sharing cores
+#
+# The results of a solver are given per case as (result, t, tout), as in
+# ResultTable in gen_graphs.py, and so are the results of the simulations
+
+Results = dict[str, tuple[str, float|None, float]]
+
+
+# time the solver took to solve the case, None if it didn't solve it (or was
+# not run on it)
+def get_solve_time(results: Results, name: str) -> float|None:
+    if name not in results:
+        return None
+    result, t, _ = results[name]
+    if result == "unknown" or t is None:
+        return None
+    return t
+
+
+def unsolved(tout: float) -> tuple[str, float|None, float]:
+    return ("unknown", None, tout)
+
+
+# Runs all members in parallel on 'cores' cores, None for a core per member.
+# With fewer cores than members, the members share the cores evenly, and take
+# correspondingly longer. The case is solved by the member finishing first
+def simulate_parallel(members: list[Results], names: list[str], tout: float,
+                      cores: int|None = None) -> Results:
+    slowdown = 1.0
+    if cores is not None:
+        slowdown = max(1.0, len(members) / cores)
+    ret: Results = {}
+    for name in names:
+        best = None
+        for results in members:
+            t = get_solve_time(results, name)
+            if t is None or t * slowdown > tout:
+                continue
+            if best is None or t * slowdown < best[1]:
+                best = (results[name][0], t * slowdown, tout)
+        ret[name] = best if best is not None else unsolved(tout)
+    return ret
+
+
+# Runs the members one after the other on a single core, each until it solves
+# the case or its time slice is over. A slice of None runs the member until
+# the timeout. Time spent on a slice is lost if the member doesn't solve the
+# case in it
+def simulate_schedule(members: list[tuple[Results, float|None]], names: list[str],
+                      tout: float) -> Results:
+    ret: Results = {}
+    for name in names:
+        ret[name] = unsolved(tout)
+        elapsed = 0.0
+        for results, slice_t in members:
+            left = tout - elapsed
+            if slice_t is not None:
+                left = min(left, slice_t)
+            if left <= 0:
+                break
+            t = get_solve_time(results, name)
+            if t is not None and t <= left:
+                ret[name] = (results[name][0], elapsed + t, tout)
+                break
+            elapsed += left
+    return ret
+
+
+# penalized average runtime, summed over the cases: unsolved cases count as
+# twice the timeout
+def get_par2(results: Results, names: list[str], tout: float) -> float:
+    ret = 0.0
+    for name in names:
+        t = get_solve_time(results, name)
+        ret += 2 * tout if t is None else t
+    return ret
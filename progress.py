@@ -0,0 +1,169 @@
+# Progress of a run of bench.py: the cases done per tool with their
+# verdicts, the throughput, the memory of the tools running right now, and
+# the predicted end of the run. It's printed every few seconds and at the end
+# of the run, and can be written to a status file that monitoring can pick
+# up: in the Prometheus text format if the file name ends
+# in .prom (for node_exporter's textfile collector), as JSON otherwise. The
+# file is replaced atomically, so it's never read half written
+
+import json
+import os
+import threading
+from time import time, strftime, gmtime
+from runner import get_running_rss_MB
+
+# kill reasons of the runs that failed, unlike a timeout, which just gives up
+error_kill_reasons = ["memout", "signal", "lost"]
+
+
+# whether the run of a case failed: the tool was killed for one of
+# error_kill_reasons, the job was lost, or the tool exited with an error
+# without a verdict. 'res' is a Result of bench.py
+def is_error(res) -> bool:
+    if res.kill_reason in error_kill_reasons:
+        return True
+    return res.result == "unknown" and res.exit_status is not None and res.exit_status != 0
+
+
+class Progress:
+    # 'solvers' maps the name of each tool in the results to its tool name,
+    # version and number of cases
+    def __init__(self, run: str, solvers: dict[str, tuple[str, str, int]],
+                 status_fname: str|None, interval: float):
+        self.run = run
+        self.solvers = solvers
+        self.status_fname = status_fname
+        self.interval = interval
+        self.start = time()
+        self.counts = {s: {"done": 0, "solved": 0, "unknown": 0, "error": 0} for s in solvers}
+        # cases done in this session, as opposed to taken from the journal
+        self.num_run = 0
+        self.eta: float|None = None
+        self.finished = False
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: threading.Thread|None = None
+
+    # 'res' is the Result of a finished case. 'resumed' cases were finished
+    # before, they don't count for the throughput
+    def add(self, solver: str, res, resumed: bool = False) -> None:
+        with self.lock:
+            c = self.counts[solver]
+            c["done"] += 1
+            if is_error(res):
+                c["error"] += 1
+            elif res.result == "unknown":
+                c["unknown"] += 1
+            else:
+                c["solved"] += 1
+            if not resumed:
+                self.num_run += 1
+
+    # predicted time until the run is finished, in seconds from now
+    def set_remaining(self, secs: float) -> None:
+        with self.lock:
+            self.eta = time() + secs
+
+    def get_status(self) -> dict:
+        now = time()
+        num_running, rss_MB = get_running_rss_MB()
+        with self.lock:
+            elapsed = now - self.start
+            tools = []
+            for solver, (tool, version, total) in self.solvers.items():
+                tools.append(dict(self.counts[solver], solver=solver, tool=tool,
+                                  version=version, total=total))
+            per_min = 0.0
+            if elapsed > 0:
+                per_min = self.num_run / elapsed * 60
+            remaining = None
+            if self.eta is not None:
+                remaining = max(0.0, self.eta - now)
+            return {"run": self.run, "time": now, "elapsed": elapsed,
+                    "finished": self.finished, "tools": tools,
+                    "cases_per_minute": per_min, "running": num_running,
+                    "running_rss_MB": rss_MB, "remaining": remaining,
+                    "eta": self.eta}
+
+    def print_status(self, status: dict) -> None:
+        parts = []
+        for t in status["tools"]:
+            parts.append("%s %d/%d (solved %d, unknown %d, error %d)" % (
+                t["tool"], t["done"], t["total"], t["solved"], t["unknown"], t["error"]))
+        line = "Progress: %s, %.1f cases/min, %d running with %.0f MB RSS" % (
+            "; ".join(parts), status["cases_per_minute"], status["running"], status["running_rss_MB"])
+        if status["eta"] is not None and not status["finished"]:
+            line += ", ETA: %s UTC" % strftime("%H:%M:%S", gmtime(status["eta"]))
+        print(line, flush=True)
+
+    def write_status(self, status: dict) -> None:
+        if self.status_fname is None:
+            return
+        if self.status_fname.endswith(".prom"):
+            text = get_prometheus_text(status)
+        else:
+            text = json.dumps(status, indent=2) + "\n"
+        tmp_fname = "%s.tmp" % self.status_fname
+        with open(tmp_fname, "w") as f:
+            f.write(text)
+        os.replace(tmp_fname, self.status_fname)
+
+    def update(self, show: bool = True) -> None:
+        status = self.get_status()
+        if show:
+            self.print_status(status)
+        self.write_status(status)
+
+    def run_updates(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            self.update()
+
+    # starts updating the status every 'interval' seconds
+    def begin(self) -> None:
+        self.update(show=False)
+        if self.interval > 0:
+            self.thread = threading.Thread(target=self.run_updates, daemon=True)
+            self.thread.start()
+
+    def end(self) -> None:
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        with self.lock:
+            self.finished = True
+            self.eta = time()
+        self.update()
+
+
+def get_prometheus_text(status: dict) -> str:
+    lines = []
+
+    def metric(name: str, typ: str, descr: str, vals: list[tuple[dict, float]]) -> None:
+        lines.append("# HELP bench_%s %s" % (name, descr))
+        lines.append("# TYPE bench_%s %s" % (name, typ))
+        for labels, val in vals:
+            labels = dict(labels, run=status["run"])
+            lbl = ",".join(['%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"'))
+                            for k, v in labels.items()])
+            lines.append("bench_%s{%s} %s" % (name, lbl, repr(float(val))))
+
+    def per_tool(key: str) -> list[tuple[dict, float]]:
+        return [({"tool": t["tool"], "version": t["version"]}, t[key]) for t in status["tools"]]
+
+    metric("cases", "gauge", "Number of cases to run", per_tool("total"))
+    metric("cases_done", "gauge", "Number of cases finished", per_tool("done"))
+    metric("cases_result", "gauge", "Number of cases finished, by result",
+           [({"tool": t["tool"], "version": t["version"], "result": res}, t[res])
+            for t in status["tools"] for res in ["solved", "unknown", "error"]])
+    metric("cases_per_minute", "gauge", "Cases finished per minute", [({}, status["cases_per_minute"])])
+    metric("running", "gauge", "Number of tools running", [({}, status["running"])])
+    metric("running_rss_bytes", "gauge", "Resident memory of the tools running",
+           [({}, status["running_rss_MB"] * 1000 * 1000)])
+    metric("elapsed_seconds", "gauge", "Time since the start of the run", [({}, status["elapsed"])])
+    if status["remaining"] is not None:
+        metric("remaining_seconds", "gauge", "Predicted time until the end of the run",
+               [({}, status["remaining"])])
+    metric("finished", "gauge", "Whether the run is finished", [({}, int(status["finished"]))])
+    metric("last_update_timestamp_seconds", "gauge", "Time of the last update of this file",
+           [({}, status["time"])])
+    return "\n".join(lines) + "\n"
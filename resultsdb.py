@@ -0,0 +1,202 @@
+# Access to the results database, results.db. The schema is in
+# create_table.sql, its version is kept in 'PRAGMA user_version'
+
+import json
+import os
+import sqlite3
+
+db_fname = "results.db"
+schema_fname = os.path.join(os.path.dirname(os.path.abspath(__file__)), "create_table.sql")
+
+# must be increased whenever create_table.sql changes
+schema_version = 8
+
+# Databases of this version or later are upgraded by running the statements
+# of each later version given here, and then create_table.sql again, which
+# adds the new tables
+upgradable_since = 3
+migrations = {
+    5: ["ALTER TABLE results ADD COLUMN paths INTEGER",
+        "ALTER TABLE results ADD COLUMN queries INTEGER",
+        "ALTER TABLE results ADD COLUMN t_solver REAL"],
+    6: ["ALTER TABLE results ADD COLUMN rung REAL"],
+    7: ["ALTER TABLE cases ADD COLUMN family TEXT",
+        "ALTER TABLE cases ADD COLUMN param INTEGER"],
+}
+
+
+# Opens the database, creating the schema if the database is new
+def connect(fname: str = db_fname) -> sqlite3.Connection:
+    con = sqlite3.connect(fname)
+    con.execute("PRAGMA journal_mode = WAL")
+    con.execute("PRAGMA foreign_keys = ON")
+    version = con.execute("PRAGMA user_version").fetchone()[0]
+    if version == 0:
+        ret = con.execute("select count(*) from sqlite_master where type = 'table' and name = 'results'")
+        if ret.fetchone()[0] > 0:
+            print("ERROR: '%s' was created by an older version of bench.py, which used a single, flat results table." % fname)
+            print("Delete it (e.g. via ./clear-results.sh) and re-run the benchmarks, or use a different database.")
+            exit(-1)
+        with open(schema_fname, "r") as f:
+            con.executescript(f.read())
+        con.execute("PRAGMA user_version = %d" % schema_version)
+    elif upgradable_since <= version < schema_version:
+        with con:
+            for v in range(version + 1, schema_version + 1):
+                for stmt in migrations.get(v, []):
+                    con.execute(stmt)
+        with open(schema_fname, "r") as f:
+            con.executescript(f.read())
+        con.execute("PRAGMA user_version = %d" % schema_version)
+    elif version != schema_version:
+        print("ERROR: '%s' has schema version %d, but version %d is needed" % (fname, version, schema_version))
+        exit(-1)
+    return con
+
+
+# returns the id of the row with the given values in the table, inserting the
+# row if it doesn't exist yet
+def get_id(con: sqlite3.Connection, table: str, vals: dict) -> int:
+    where = " and ".join(["%s = ?" % col for col in vals])
+    ret = con.execute("select id from %s where %s" % (table, where), tuple(vals.values())).fetchone()
+    if ret is not None:
+        return ret[0]
+    cols = ", ".join(vals.keys())
+    params = ", ".join(["?"] * len(vals))
+    return con.execute("insert into %s (%s) values (%s)" % (table, cols, params), tuple(vals.values())).lastrowid
+
+
+def get_tool_version_id(con: sqlite3.Connection, tool: str, version: str) -> int:
+    tool_id = get_id(con, "tools", {"name": tool})
+    return get_id(con, "tool_versions", {"tool_id": tool_id, "version": version})
+
+
+# cases are identified by their name, the rest of the columns follow from it
+def get_case_id(con: sqlite3.Connection, case: dict) -> int:
+    ret = con.execute("select id from cases where name = ?", (case["name"],)).fetchone()
+    if ret is not None:
+        return ret[0]
+    cols = ", ".join(case.keys())
+    params = ", ".join(["?"] * len(case))
+    return con.execute("insert into cases (%s) values (%s)" % (cols, params), tuple(case.values())).lastrowid
+
+
+result_cols = ["result", "correct", "t", "t_user", "t_sys", "perc_CPU", "memMB",
+               "exit_status", "kill_reason", "t_fun", "t_startup", "output_excerpt",
+               "output_ref", "paths", "queries", "t_solver", "rung"]
+sample_cols = ["result", "t", "t_user", "t_sys", "memMB"]
+
+
+# Stores the results of a run in a single transaction. 'run' has the columns
+# of the runs table. Each result has a 'tool', a 'version', a 'case' with the
+# columns of the cases table, the columns of the results table, a list of
+# 'samples' with the columns of the samples table, the time of its 'phases'
+# by name, the 'worker' it was measured on with the columns of the workers
+# table, or None, and its 'timeline', or None. Results of the same tool
+# versions that were stored for the run earlier are replaced
+def store_run(con: sqlite3.Connection, run: dict, results: list[dict]) -> None:
+    with con:
+        ret = con.execute("select id from runs where tstamp = ?", (run["tstamp"],)).fetchone()
+        if ret is None:
+            run_id = con.execute("insert into runs (tstamp, solc_version, tout, memoutMB) values (?, ?, ?, ?)",
+                                 (run["tstamp"], run["solc_version"], run["tout"], run["memoutMB"])).lastrowid
+        else:
+            run_id = ret[0]
+            con.execute("update runs set solc_version = ?, tout = ?, memoutMB = ? where id = ?",
+                        (run["solc_version"], run["tout"], run["memoutMB"], run_id))
+
+        tool_version_ids: dict[tuple[str, str], int] = {}
+        case_ids: dict[str, int] = {}
+        worker_ids: dict[str, int] = {}
+        rows = []
+        for r in results:
+            key = (r["tool"], r["version"])
+            if key not in tool_version_ids:
+                tool_version_ids[key] = get_tool_version_id(con, r["tool"], r["version"])
+            if r["case"]["name"] not in case_ids:
+                case_ids[r["case"]["name"]] = get_case_id(con, r["case"])
+            worker_id = None
+            if r["worker"] is not None:
+                worker_key = json.dumps(r["worker"], sort_keys=True)
+                if worker_key not in worker_ids:
+                    worker_ids[worker_key] = get_id(con, "workers", r["worker"])
+                worker_id = worker_ids[worker_key]
+            rows.append((run_id, tool_version_ids[key], case_ids[r["case"]["name"]], worker_id)
+                        + tuple(r[col] for col in result_cols))
+
+        for tool_version_id in tool_version_ids.values():
+            for table in ["samples", "phases", "timelines"]:
+                con.execute("""
+                delete from %s where result_id in (
+                    select id from results where run_id = ? and tool_version_id = ?)""" % table,
+                            (run_id, tool_version_id))
+            con.execute("delete from results where run_id = ? and tool_version_id = ?",
+                        (run_id, tool_version_id))
+
+        con.executemany("insert into results (run_id, tool_version_id, case_id, worker_id, %s) values (?, ?, ?, ?, %s)" % (
+            ", ".join(result_cols), ", ".join(["?"] * len(result_cols))), rows)
+
+        result_ids = {}
+        ret = con.execute("select id, tool_version_id, case_id from results where run_id = ?", (run_id,))
+        for result_id, tool_version_id, case_id in ret:
+            result_ids[(tool_version_id, case_id)] = result_id
+        sample_rows = []
+        phase_rows = []
+        timeline_rows = []
+        for r in results:
+            result_id = result_ids[(tool_version_ids[(r["tool"], r["version"])], case_ids[r["case"]["name"]])]
+            for idx, sample in enumerate(r["samples"]):
+                sample_rows.append((result_id, idx) + tuple(sample[col] for col in sample_cols))
+            for name, t in r["phases"].items():
+                phase_rows.append((result_id, name, t))
+            if r["timeline"] is not None:
+                timeline_rows.append((result_id, json.dumps(r["timeline"], separators=(",", ":"))))
+        con.executemany("insert into phases (result_id, name, t) values (?, ?, ?)", phase_rows)
+        con.executemany("insert into timelines (result_id, data) values (?, ?)", timeline_rows)
+        con.executemany("insert into samples (result_id, idx, %s) values (?, ?, %s)" % (
+            ", ".join(sample_cols), ", ".join(["?"] * len(sample_cols))), sample_rows)
+
+
+# times of all earlier results of the given tools, keyed by (tool, version,
+# case name). Unsolved cases count with the time until they were stopped
+def get_history(con: sqlite3.Connection, tools: list[str]) -> dict[tuple[str, str, str], list[float]]:
+    ret: dict[tuple[str, str, str], list[float]] = {}
+    rows = con.execute("""
+    select tools.name, tool_versions.version, cases.name, coalesce(results.t, runs.tout)
+    from results
+    join runs on runs.id = results.run_id
+    join tool_versions on tool_versions.id = results.tool_version_id
+    join tools on tools.id = tool_versions.tool_id
+    join cases on cases.id = results.case_id
+    where tools.name in (%s)""" % ", ".join(["?"] * len(tools)), tools)
+    for tool, version, name, t in rows:
+        ret.setdefault((tool, version, name), []).append(t)
+    return ret
+
+
+# Stores the SMT queries found by smt_replay.py. Each query has the columns of
+# the smt_queries table, and a list of 'origins' with the columns of the
+# smt_query_origins table. Returns the ids of the queries by hash
+def store_smt_queries(con: sqlite3.Connection, queries: list[dict]) -> dict[str, int]:
+    ids: dict[str, int] = {}
+    with con:
+        for q in queries:
+            ret = con.execute("select id from smt_queries where hash = ?", (q["hash"],)).fetchone()
+            if ret is None:
+                ids[q["hash"]] = con.execute("insert into smt_queries (hash, size, logic, fname) values (?, ?, ?, ?)",
+                                             (q["hash"], q["size"], q["logic"], q["fname"])).lastrowid
+            else:
+                ids[q["hash"]] = ret[0]
+            con.executemany("insert or replace into smt_query_origins (query_id, fname, engine, origin) values (?, ?, ?, ?)",
+                            [(ids[q["hash"]], o["fname"], o["engine"], o["origin"]) for o in q["origins"]])
+    return ids
+
+
+replay_cols = ["query_id", "tstamp", "solver", "version", "result", "t", "tout", "memMB"]
+
+
+def store_smt_replays(con: sqlite3.Connection, replays: list[dict]) -> None:
+    with con:
+        con.executemany("insert or replace into smt_replays (%s) values (%s)" % (
+            ", ".join(replay_cols), ", ".join(["?"] * len(replay_cols))),
+                        [tuple(r[col] for col in replay_cols) for r in replays])
@@ -0,0 +1,386 @@
+# Runs a tool as a child process, enforcing the time and memory limits and
+# measuring the resources used by the whole process tree of the tool
+
+import collections
+import json
+import os
+import signal
+import subprocess
+import threading
+import time
+from typing import Callable
+
+# time between asking the tool to stop and killing it
+kill_delay = 2
+
+# how often the memory usage of the tool is checked when no cgroup is used
+mem_poll_interval = 0.2
+
+page_size = os.sysconf("SC_PAGE_SIZE")
+clock_ticks = os.sysconf("SC_CLK_TCK")
+
+# pids of the tools being run right now, see get_running_rss_MB()
+running_pids: set[int] = set()
+running_lock = threading.Lock()
+
+
+# the tools can report metrics as JSON lines to the file descriptor given in
+# this environment variable, see parse_metrics()
+metrics_fd_env = "BENCH_METRICS_FD"
+metrics_version = 1
+
+
+# Outcome of running a tool. Times are in seconds, memory in MB. The kill
+# reason is None if the tool exited on its own, otherwise one of "timeout",
+# "memout" or "signal"
+class Execution:
+    def __init__(self, stdout: str, stderr: str, exit_status: int|None,
+                 t: float, t_user: float, t_sys: float, mem_used_MB: float,
+                 kill_reason: str|None, metrics: str = "", stopped_early: bool = False,
+                 timeline: dict[str, list]|None = None):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.metrics = metrics
+        # resources of the tool over time, see run_tool()
+        self.timeline = timeline
+        # the tool was stopped because its verdict was final, see run_tool()
+        self.stopped_early = stopped_early
+        self.exit_status = exit_status
+        self.t = t
+        self.t_user = t_user
+        self.t_sys = t_sys
+        self.mem_used_MB = mem_used_MB
+        self.kill_reason = kill_reason
+
+    def get_perc_CPU(self) -> int|None:
+        if self.t == 0:
+            return None
+        return int(100 * (self.t_user + self.t_sys) / self.t)
+
+
+# returns the pid and all (transitive) children of the pid. Uses the
+# 'children' files of procfs, which is much cheaper than scanning all of
+# /proc, but misses processes that were re-parented to init
+def get_tree_pids(pid: int) -> list[int]:
+    ret = []
+    todo = [pid]
+    while len(todo) > 0:
+        p = todo.pop()
+        ret.append(p)
+        try:
+            for tid in os.listdir("/proc/%d/task" % p):
+                with open("/proc/%d/task/%s/children" % (p, tid)) as f:
+                    todo.extend(int(c) for c in f.read().split())
+        except (FileNotFoundError, ProcessLookupError):
+            pass
+    return ret
+
+
+# resident memory of the process tree, in MB
+def get_tree_rss_MB(pid: int) -> float:
+    rss = 0
+    for p in get_tree_pids(pid):
+        try:
+            with open("/proc/%d/statm" % p) as f:
+                rss += int(f.read().split()[1])
+        except (FileNotFoundError, ProcessLookupError):
+            pass
+    return rss * page_size / (1000*1000)
+
+
+# resident memory in MB, CPU time (user and system) in seconds, and number of
+# threads of the process tree. Processes that exited are missing from all of
+# them
+def get_tree_stats(pid: int) -> tuple[float, float, int]:
+    rss = 0
+    ticks = 0
+    threads = 0
+    for p in get_tree_pids(pid):
+        try:
+            with open("/proc/%d/stat" % p) as f:
+                # the command name may contain spaces, the fields after it
+                # don't
+                fields = f.read().rpartition(")")[2].split()
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+        ticks += int(fields[11]) + int(fields[12])
+        threads += int(fields[17])
+        rss += int(fields[21])
+    return (rss * page_size / (1000*1000), ticks / clock_ticks, threads)
+
+
+# number of tools being run right now, and the resident memory of all of them
+# together, in MB
+def get_running_rss_MB() -> tuple[int, float]:
+    with running_lock:
+        pids = list(running_pids)
+    return (len(pids), sum(get_tree_rss_MB(pid) for pid in pids))
+
+
+# A cgroup v2 for a single execution, created under the given (delegated)
+# parent cgroup. The kernel enforces the memory limit on the whole cgroup and
+# keeps track of its peak memory usage
+class Cgroup:
+    counter = 0
+    counter_lock = threading.Lock()
+
+    def __init__(self, parent: str, memoutMB: int):
+        with Cgroup.counter_lock:
+            Cgroup.counter += 1
+            self.path = "%s/bench-%d-%d" % (parent, os.getpid(), Cgroup.counter)
+        os.mkdir(self.path)
+        self.write("memory.max", "%d" % (memoutMB*1000*1000))
+        self.write("memory.swap.max", "0")
+
+    def write(self, fname: str, val: str) -> None:
+        with open("%s/%s" % (self.path, fname), "w") as f:
+            f.write(val)
+
+    def read(self, fname: str) -> str:
+        with open("%s/%s" % (self.path, fname), "r") as f:
+            return f.read()
+
+    # wraps the command so it moves itself into the cgroup before starting
+    # the tool
+    def wrap(self, toexec: list[str]) -> list[str]:
+        return ["sh", "-c", 'echo $$ > "$0/cgroup.procs" && exec "$@"', self.path] + toexec
+
+    def get_peak_MB(self) -> float|None:
+        try:
+            return int(self.read("memory.peak")) / (1000*1000)
+        except FileNotFoundError:
+            # memory.peak needs Linux 5.19 or later
+            return None
+
+    def was_oom_killed(self) -> bool:
+        for line in self.read("memory.events").splitlines():
+            key, val = line.split()
+            if key == "oom_kill":
+                return int(val) > 0
+        return False
+
+    def remove(self) -> None:
+        try:
+            self.write("cgroup.kill", "1")
+        except FileNotFoundError:
+            # cgroup.kill needs Linux 5.14 or later. The process group of the
+            # tool has been killed already, so the cgroup should be empty
+            pass
+        # the kernel needs a moment to reap the killed processes
+        for _ in range(100):
+            try:
+                os.rmdir(self.path)
+                return
+            except OSError:
+                time.sleep(0.01)
+        print("WARNING: could not remove cgroup '%s'" % self.path)
+
+
+def kill_group(pid: int, sig: int) -> None:
+    try:
+        os.killpg(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+# Runs the command in a new session, and waits for it for at most tout
+# seconds. The resource usage is taken from wait4(), which covers the process
+# and all descendants it has waited for. If cgroup_parent is given, the memory
+# limit is enforced and the peak memory is measured via a cgroup, otherwise
+# the memory of the process tree is polled, and the tool is killed when it
+# goes over the limit.
+#
+# If 'on_line' is given, stdout and stderr are combined and passed to it line
+# by line while the tool runs. Only the last 'max_lines' lines are kept, as
+# the stderr of the result. When 'on_line' returns True, the tool is stopped,
+# this doesn't count as a kill
+#
+# If 'sample_interval' is given, the process tree of the tool is sampled at
+# this interval, in seconds. The samples are kept column by column: the time
+# since the start "t", the resident memory in MB "rss", the CPU time used by
+# the processes alive at the time "cpu", and their number of threads
+# "threads"
+#
+# 'env' are variables added to the environment of the tool
+def run_tool(toexec: list[str], tout: float, memoutMB: int,
+             cgroup_parent: str|None = None,
+             on_line: Callable[[str], bool]|None = None,
+             max_lines: int = 1000,
+             sample_interval: float|None = None,
+             env: dict[str, str]|None = None) -> Execution:
+    cgroup = None
+    if cgroup_parent is not None:
+        cgroup = Cgroup(cgroup_parent, memoutMB)
+        toexec = cgroup.wrap(toexec)
+
+    metrics_r, metrics_w = os.pipe()
+    env = dict(os.environ, **(env or {}))
+    env[metrics_fd_env] = "%d" % metrics_w
+
+    before = time.time_ns()
+    stderr = subprocess.PIPE if on_line is None else subprocess.STDOUT
+    try:
+        proc = subprocess.Popen(toexec, stdout=subprocess.PIPE, stderr=stderr,
+                                encoding="utf-8", errors="replace", start_new_session=True,
+                                pass_fds=(metrics_w,), env=env)
+    except BaseException:
+        os.close(metrics_r)
+        os.close(metrics_w)
+        if cgroup is not None:
+            cgroup.remove()
+        raise
+    os.close(metrics_w)
+    with running_lock:
+        running_pids.add(proc.pid)
+    done = threading.Event()
+    waited = False
+    try:
+        metrics_f = open(metrics_r, "r", encoding="utf-8", errors="replace")
+        kill_reason = None
+
+        def stop(reason: str) -> None:
+            nonlocal kill_reason
+            if done.is_set():
+                return
+            kill_reason = reason
+            kill_group(proc.pid, signal.SIGTERM)
+            if not done.wait(kill_delay):
+                kill_group(proc.pid, signal.SIGKILL)
+
+        # the processes killed with the tool are not waited for by it, so their
+        # memory is missing from the rusage
+        polled_peak_MB = 0.0
+
+        def watch_mem() -> None:
+            nonlocal polled_peak_MB
+            while not done.wait(mem_poll_interval):
+                rss = get_tree_rss_MB(proc.pid)
+                polled_peak_MB = max(polled_peak_MB, rss)
+                if rss > memoutMB:
+                    stop("memout")
+                    return
+
+        timeline: dict[str, list]|None = None
+        if sample_interval is not None:
+            timeline = {"t": [], "rss": [], "cpu": [], "threads": []}
+
+        def sample() -> None:
+            while not done.wait(sample_interval):
+                rss, cpu, threads = get_tree_stats(proc.pid)
+                timeline["t"].append(round((time.time_ns() - before) / 1_000_000_000, 3))
+                timeline["rss"].append(round(rss, 1))
+                timeline["cpu"].append(round(cpu, 2))
+                timeline["threads"].append(threads)
+
+        outputs = {}
+
+        def read(name: str, stream) -> None:
+            outputs[name] = stream.read()
+
+        def stream_lines() -> None:
+            kept: collections.deque[str] = collections.deque(maxlen=max_lines)
+            num_lines = 0
+            for line in proc.stdout:
+                kept.append(line)
+                num_lines += 1
+                if kill_reason is None and on_line(line.rstrip("\n")):
+                    stop("verdict")
+            outputs["stdout"] = ""
+            outputs["stderr"] = "".join(kept)
+            if num_lines > max_lines:
+                outputs["stderr"] = "[%d earlier lines dropped]\n" % (num_lines - max_lines) + outputs["stderr"]
+
+        if on_line is None:
+            threads = [threading.Thread(target=read, args=("stdout", proc.stdout)),
+                       threading.Thread(target=read, args=("stderr", proc.stderr))]
+        else:
+            threads = [threading.Thread(target=stream_lines)]
+        threads.append(threading.Thread(target=read, args=("metrics", metrics_f)))
+        timer = threading.Timer(tout, stop, args=("timeout",))
+        threads.append(timer)
+        if cgroup is None:
+            threads.append(threading.Thread(target=watch_mem))
+        if timeline is not None:
+            threads.append(threading.Thread(target=sample))
+        for th in threads:
+            th.daemon = True
+            th.start()
+
+        _, status, rusage = os.wait4(proc.pid, 0)
+        waited = True
+        after = time.time_ns()
+        done.set()
+        timer.cancel()
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        # don't let left-over children keep the output pipes open
+        kill_group(proc.pid, signal.SIGKILL)
+        for th in threads:
+            th.join()
+        proc.stdout.close()
+        if proc.stderr is not None:
+            proc.stderr.close()
+        metrics_f.close()
+
+        # ru_maxrss is in kilobytes on Linux
+        mem_used_MB = max(rusage.ru_maxrss / 1000, polled_peak_MB)
+        if cgroup is not None:
+            peak = cgroup.get_peak_MB()
+            if peak is not None:
+                mem_used_MB = peak
+            if cgroup.was_oom_killed():
+                kill_reason = "memout"
+    finally:
+        # also on Ctrl-C or an error in the harness, the tool would keep
+        # running without any limits otherwise
+        done.set()
+        kill_group(proc.pid, signal.SIGKILL)
+        if not waited:
+            proc.wait()
+        with running_lock:
+            running_pids.discard(proc.pid)
+        if cgroup is not None:
+            cgroup.remove()
+
+    exit_status = proc.returncode
+    stopped_early = kill_reason == "verdict"
+    if stopped_early:
+        kill_reason = None
+    elif exit_status < 0:
+        if kill_reason is None:
+            kill_reason = "signal"
+    if exit_status < 0:
+        exit_status = None
+
+    return Execution(stdout=outputs["stdout"], stderr=outputs["stderr"],
+                     exit_status=exit_status, t=(after - before) / 1_000_000_000,
+                     t_user=rusage.ru_utime, t_sys=rusage.ru_stime,
+                     mem_used_MB=mem_used_MB, kill_reason=kill_reason,
+                     metrics=outputs["metrics"], stopped_early=stopped_early,
+                     timeline=timeline)
+
+
+# Parses the metrics reported by a tool. Every line is a JSON object with the
+# version of the protocol in "v", and either a "phase" with its time "t" in
+# seconds, or a "metric" with its "value". Batch tools add the "fun" the line
+# is about. Lines that can't be parsed or are of another version are skipped
+def parse_metrics(text: str) -> list[dict]:
+    ret = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if line == "":
+            continue
+        try:
+            d = json.loads(line)
+        except json.JSONDecodeError:
+            print("WARNING: metrics line is not valid JSON: %s" % line)
+            continue
+        if not isinstance(d, dict) or d.get("v") != metrics_version:
+            print("WARNING: metrics line is not of version %d: %s" % (metrics_version, line))
+            continue
+        if "phase" in d and isinstance(d.get("t"), (int, float)):
+            ret.append(d)
+        elif "metric" in d and isinstance(d.get("value"), (int, float)):
+            ret.append(d)
+        else:
+            print("WARNING: metrics line has neither a phase nor a metric: %s" % line)
+    return ret
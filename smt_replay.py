@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+# Indexes the SMT queries dumped by the tools via `./bench.py --dumpsmt`, and
+# replays them against the SMT solvers directly. This measures the time spent
+# in the solvers alone, without the symbolic execution of the tools, and
+# allows comparing solvers without running the tools again
+
+import os
+import re
+import optparse
+import hashlib
+import shutil
+import subprocess
+from time import gmtime, strftime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from runner import run_tool
+import resultsdb
+
+global opts
+opts : optparse.Values
+
+# directories the tool scripts dump the queries to, by tool. Below them, the
+# queries of each contract are in a directory named "[sol file].[contract]"
+smt_dirs = {
+    "halmos": "halmos-smt2",
+    "hevm": "hevm-smt2",
+}
+
+available_solvers = {
+    "z3": {
+        "call": ["z3", "-smt2"],
+        "version": ["z3", "--version"],
+    },
+    "cvc5": {
+        "call": ["cvc5", "--lang=smt2", "--produce-models"],
+        "version": ["cvc5", "--version"],
+    },
+    "bitwuzla": {
+        "call": ["bitwuzla"],
+        "version": ["bitwuzla", "--version"],
+    },
+}
+
+# quoted symbols and strings are kept as they are, comments and whitespace are
+# normalized
+token_regex = re.compile(r'\|[^|]*\||"(?:[^"]|"")*"|(?:;[^\n]*|\s)+')
+
+
+# The text of the query without comments, and with all whitespace collapsed,
+# so that queries only differing in these hash the same
+def normalize(text: str) -> str:
+    def repl(m: re.Match) -> str:
+        tok = m.group(0)
+        if tok[0] == "|" or tok[0] == "\"":
+            return tok
+        return " "
+    return token_regex.sub(repl, text).strip()
+
+
+def get_logic(text: str) -> str:
+    m = re.search(r"\(\s*set-logic\s+([^\s()]+)", text)
+    if m is None:
+        return "unspecified"
+    return m.group(1)
+
+
+# Finds all dumped queries, and groups the files by the hash of the
+# normalized query
+def index_queries() -> list[dict]:
+    queries: dict[str, dict] = {}
+    for engine, smt_dir in smt_dirs.items():
+        for dirpath, _, fnames in sorted(os.walk(smt_dir)):
+            for fname in sorted(fnames):
+                if not fname.endswith(".smt2"):
+                    continue
+                fname = os.path.join(dirpath, fname)
+                with open(fname, "r", errors="replace") as f:
+                    text = f.read()
+                h = hashlib.sha256(normalize(text).encode("utf-8")).hexdigest()
+                if h not in queries:
+                    queries[h] = {"hash": h, "size": len(text), "logic": get_logic(text),
+                                  "fname": fname, "origins": []}
+                origin = os.path.relpath(dirpath, smt_dir)
+                queries[h]["origins"].append({"fname": fname, "engine": engine, "origin": origin})
+    return list(queries.values())
+
+
+def get_version(descr) -> str:
+    res = subprocess.run(descr["version"], capture_output=True, encoding="utf-8")
+    res.check_returncode()
+    return res.stdout.strip().split("\n")[0]
+
+
+def get_solvers_used() -> dict:
+    ret = {}
+    for solver in opts.solvers.split(","):
+        solver = solver.strip()
+        if solver == "all":
+            return {s: d for s, d in available_solvers.items() if shutil.which(d["call"][0]) is not None}
+        if solver == "":
+            continue
+        if solver not in available_solvers:
+            print("ERROR: solver you specified, '%s' is not known." % solver)
+            print("Known solvers: %s" % ", ".join(available_solvers.keys()))
+            exit(-1)
+        ret[solver] = available_solvers[solver]
+    return ret
+
+
+# Runs the solver on the query. The result is the answer to the first
+# check-sat, the time is the time of the whole query
+def replay(solver: str, descr, fname: str) -> dict:
+    toexec = descr["call"] + [fname]
+    if opts.verbose:
+        print("Running: %s" % (" ".join(toexec)))
+    res = run_tool(toexec, opts.timeout, opts.memoutMB)
+    result = "error"
+    if res.kill_reason is not None:
+        result = "unknown"
+    else:
+        for line in res.stdout.split("\n"):
+            line = line.strip()
+            if line in ["sat", "unsat", "unknown"]:
+                result = line
+                break
+    return {"result": result, "t": res.t, "memMB": res.mem_used_MB}
+
+
+def replay_all(con, ids: dict[str, int], queries: list[dict]) -> None:
+    solvers = get_solvers_used()
+    if len(solvers) == 0:
+        print("ERROR: none of the solvers are available")
+        exit(-1)
+    versions = {s: get_version(d) for s, d in solvers.items()}
+    tstamp = strftime("%Y-%m-%d-%H:%M", gmtime())
+    print("Replaying %d queries with solver(s): %s" % (len(queries), ", ".join(
+        ["%s %s" % (s, v) for s, v in versions.items()])))
+
+    replays = []
+    with ThreadPoolExecutor(max_workers=opts.jobs) as pool:
+        futures = {}
+        for q in queries:
+            for solver, descr in solvers.items():
+                futures[pool.submit(replay, solver, descr, q["fname"])] = (solver, q)
+        for f in as_completed(futures):
+            solver, q = futures[f]
+            r = f.result()
+            print("%-10s %-7s %8.3fs %s" % (solver, r["result"], r["t"], q["fname"]))
+            replays.append(dict(r, query_id=ids[q["hash"]], tstamp=tstamp, solver=solver,
+                                version=versions[solver], tout=opts.timeout))
+    resultsdb.store_smt_replays(con, replays)
+
+    # answers of the solvers to the same query must not contradict
+    answers: dict[int, set[str]] = {}
+    for r in replays:
+        if r["result"] in ["sat", "unsat"]:
+            answers.setdefault(r["query_id"], set()).add(r["result"])
+    for q in queries:
+        if len(answers.get(ids[q["hash"]], set())) > 1:
+            print("WARNING: solvers disagree on query %s" % q["fname"])
+
+    print("%-10s %6s %6s %8s %6s %12s" % ("solver", "sat", "unsat", "unknown", "error", "time solved"))
+    for solver in solvers:
+        rs = [r for r in replays if r["solver"] == solver]
+        counts = [len([r for r in rs if r["result"] == res]) for res in ["sat", "unsat", "unknown", "error"]]
+        t = sum(r["t"] for r in rs if r["result"] in ["sat", "unsat"])
+        print("%-10s %6d %6d %8d %6d %11.3fs" % (solver, counts[0], counts[1], counts[2], counts[3], t))
+
+    print("Solver time per contract:")
+    ret = con.execute("""
+    select engine, origin, solver, count(*), sum(t)
+    from smt_query_origins
+    join smt_replays on smt_replays.query_id = smt_query_origins.query_id
+    where tstamp = ?
+    group by engine, origin, solver
+    order by engine, origin, solver""", (tstamp,))
+    for engine, origin, solver, num, t in ret:
+        print("%-8s %-70s %-10s %5d queries %10.3fs" % (engine, origin, solver, num, t))
+
+
+# Set up options for main
+def set_up_parser() -> optparse.OptionParser:
+    usage = "usage: %prog [options]"
+    desc = """Index the SMT queries dumped via `./bench.py --dumpsmt` and replay them with the SMT solvers
+    """
+
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option("--verbose", "-v", action="store_true", default=False,
+                      dest="verbose", help="More verbose output. Default: %default")
+    parser.add_option("--solvers", dest="solvers", type=str, default="all",
+                      help="Replay with these solvers (comma separated list). Available solvers: %s. Default: the ones installed" % ", ".join(available_solvers.keys()))
+    parser.add_option("--index", action="store_true", default=False,
+                      dest="index_only", help="Only index the queries, don't replay them")
+    parser.add_option("--logic", dest="logic", type=str, default=None,
+                      help="Only replay the queries of this logic")
+    parser.add_option("-t", dest="timeout", type=int, default=25,
+                      help="Max time to run a query. Default: %default")
+    parser.add_option("-m", dest="memoutMB", type=int, default=16000,
+                      help="Max memory per query, in MB. Default: %default")
+    parser.add_option("-j", "--jobs", dest="jobs", type=int, default=1,
+                      help="Number of queries to replay in parallel. Default: %default")
+
+    return parser
+
+
+def main() -> None:
+    parser = set_up_parser()
+    global opts
+    (opts, args) = parser.parse_args()
+    if len(args) > 0:
+        print("Replaying does not accept arguments")
+        exit(-1)
+
+    queries = index_queries()
+    num_files = sum(len(q["origins"]) for q in queries)
+    print("Found %d queries in %d files" % (len(queries), num_files))
+    if len(queries) == 0:
+        print("No queries found, run ./bench.py --dumpsmt first")
+        exit(0)
+
+    with closing(resultsdb.connect()) as con:
+        ids = resultsdb.store_smt_queries(con, queries)
+        print("Stored the queries in %s" % resultsdb.db_fname)
+        if opts.index_only:
+            return
+        if opts.logic is not None:
+            queries = [q for q in queries if q["logic"] == opts.logic]
+        replay_all(con, ids, queries)
+
+
+if __name__ == "__main__":
+    main()
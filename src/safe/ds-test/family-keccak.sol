@@ -0,0 +1,101 @@
+// Generated by gen_families.py, do not edit
+import {DSTest} from "ds-test/test.sol";
+
+contract FamilyKeccakSafe is DSTest {
+    function prove_keccak_1(uint256 x, uint256 y) public {
+        require(x != y);
+        bytes32 hx = bytes32(x);
+        bytes32 hy = bytes32(y);
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        assert(hx != hy);
+    }
+
+    function prove_keccak_2(uint256 x, uint256 y) public {
+        require(x != y);
+        bytes32 hx = bytes32(x);
+        bytes32 hy = bytes32(y);
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        assert(hx != hy);
+    }
+
+    function prove_keccak_4(uint256 x, uint256 y) public {
+        require(x != y);
+        bytes32 hx = bytes32(x);
+        bytes32 hy = bytes32(y);
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        assert(hx != hy);
+    }
+
+    function prove_keccak_8(uint256 x, uint256 y) public {
+        require(x != y);
+        bytes32 hx = bytes32(x);
+        bytes32 hy = bytes32(y);
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        assert(hx != hy);
+    }
+
+    function prove_keccak_16(uint256 x, uint256 y) public {
+        require(x != y);
+        bytes32 hx = bytes32(x);
+        bytes32 hy = bytes32(y);
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        hx = keccak256(abi.encodePacked(hx));
+        hy = keccak256(abi.encodePacked(hy));
+        assert(hx != hy);
+    }
+}
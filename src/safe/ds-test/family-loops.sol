@@ -0,0 +1,58 @@
+// Generated by gen_families.py, do not edit
+import {DSTest} from "ds-test/test.sol";
+
+contract FamilyLoopsSafe is DSTest {
+    function prove_loops_2(uint256 x) public {
+        require(x <= 2);
+        uint256 j;
+        for (uint256 i = 0; i < x; i++) {
+            j++;
+        }
+        assert(j == x);
+    }
+
+    function prove_loops_4(uint256 x) public {
+        require(x <= 4);
+        uint256 j;
+        for (uint256 i = 0; i < x; i++) {
+            j++;
+        }
+        assert(j == x);
+    }
+
+    function prove_loops_8(uint256 x) public {
+        require(x <= 8);
+        uint256 j;
+        for (uint256 i = 0; i < x; i++) {
+            j++;
+        }
+        assert(j == x);
+    }
+
+    function prove_loops_16(uint256 x) public {
+        require(x <= 16);
+        uint256 j;
+        for (uint256 i = 0; i < x; i++) {
+            j++;
+        }
+        assert(j == x);
+    }
+
+    function prove_loops_32(uint256 x) public {
+        require(x <= 32);
+        uint256 j;
+        for (uint256 i = 0; i < x; i++) {
+            j++;
+        }
+        assert(j == x);
+    }
+
+    function prove_loops_64(uint256 x) public {
+        require(x <= 64);
+        uint256 j;
+        for (uint256 i = 0; i < x; i++) {
+            j++;
+        }
+        assert(j == x);
+    }
+}
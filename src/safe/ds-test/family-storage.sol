@@ -0,0 +1,121 @@
+// Generated by gen_families.py, do not edit
+import {DSTest} from "ds-test/test.sol";
+
+contract FamilyStorageSafe is DSTest {
+    mapping(uint256 => uint256) slots1;
+
+    function prove_storage_1(uint256 k, uint256 v, uint256 j) public {
+        require(j < 1);
+        unchecked {
+            slots1[k + 0] = v + 0;
+            assert(slots1[k + j] == v + j);
+        }
+    }
+
+    mapping(uint256 => uint256) slots2;
+
+    function prove_storage_2(uint256 k, uint256 v, uint256 j) public {
+        require(j < 2);
+        unchecked {
+            slots2[k + 0] = v + 0;
+            slots2[k + 1] = v + 1;
+            assert(slots2[k + j] == v + j);
+        }
+    }
+
+    mapping(uint256 => uint256) slots4;
+
+    function prove_storage_4(uint256 k, uint256 v, uint256 j) public {
+        require(j < 4);
+        unchecked {
+            slots4[k + 0] = v + 0;
+            slots4[k + 1] = v + 1;
+            slots4[k + 2] = v + 2;
+            slots4[k + 3] = v + 3;
+            assert(slots4[k + j] == v + j);
+        }
+    }
+
+    mapping(uint256 => uint256) slots8;
+
+    function prove_storage_8(uint256 k, uint256 v, uint256 j) public {
+        require(j < 8);
+        unchecked {
+            slots8[k + 0] = v + 0;
+            slots8[k + 1] = v + 1;
+            slots8[k + 2] = v + 2;
+            slots8[k + 3] = v + 3;
+            slots8[k + 4] = v + 4;
+            slots8[k + 5] = v + 5;
+            slots8[k + 6] = v + 6;
+            slots8[k + 7] = v + 7;
+            assert(slots8[k + j] == v + j);
+        }
+    }
+
+    mapping(uint256 => uint256) slots16;
+
+    function prove_storage_16(uint256 k, uint256 v, uint256 j) public {
+        require(j < 16);
+        unchecked {
+            slots16[k + 0] = v + 0;
+            slots16[k + 1] = v + 1;
+            slots16[k + 2] = v + 2;
+            slots16[k + 3] = v + 3;
+            slots16[k + 4] = v + 4;
+            slots16[k + 5] = v + 5;
+            slots16[k + 6] = v + 6;
+            slots16[k + 7] = v + 7;
+            slots16[k + 8] = v + 8;
+            slots16[k + 9] = v + 9;
+            slots16[k + 10] = v + 10;
+            slots16[k + 11] = v + 11;
+            slots16[k + 12] = v + 12;
+            slots16[k + 13] = v + 13;
+            slots16[k + 14] = v + 14;
+            slots16[k + 15] = v + 15;
+            assert(slots16[k + j] == v + j);
+        }
+    }
+
+    mapping(uint256 => uint256) slots32;
+
+    function prove_storage_32(uint256 k, uint256 v, uint256 j) public {
+        require(j < 32);
+        unchecked {
+            slots32[k + 0] = v + 0;
+            slots32[k + 1] = v + 1;
+            slots32[k + 2] = v + 2;
+            slots32[k + 3] = v + 3;
+            slots32[k + 4] = v + 4;
+            slots32[k + 5] = v + 5;
+            slots32[k + 6] = v + 6;
+            slots32[k + 7] = v + 7;
+            slots32[k + 8] = v + 8;
+            slots32[k + 9] = v + 9;
+            slots32[k + 10] = v + 10;
+            slots32[k + 11] = v + 11;
+            slots32[k + 12] = v + 12;
+            slots32[k + 13] = v + 13;
+            slots32[k + 14] = v + 14;
+            slots32[k + 15] = v + 15;
+            slots32[k + 16] = v + 16;
+            slots32[k + 17] = v + 17;
+            slots32[k + 18] = v + 18;
+            slots32[k + 19] = v + 19;
+            slots32[k + 20] = v + 20;
+            slots32[k + 21] = v + 21;
+            slots32[k + 22] = v + 22;
+            slots32[k + 23] = v + 23;
+            slots32[k + 24] = v + 24;
+            slots32[k + 25] = v + 25;
+            slots32[k + 26] = v + 26;
+            slots32[k + 27] = v + 27;
+            slots32[k + 28] = v + 28;
+            slots32[k + 29] = v + 29;
+            slots32[k + 30] = v + 30;
+            slots32[k + 31] = v + 31;
+            assert(slots32[k + j] == v + j);
+        }
+    }
+}
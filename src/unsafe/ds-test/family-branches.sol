@@ -0,0 +1,91 @@
+// Generated by gen_families.py, do not edit
+import {DSTest} from "ds-test/test.sol";
+
+contract FamilyBranchesUnsafe is DSTest {
+    function prove_branches_2(uint256 x) public {
+        uint256 acc = 0;
+        acc += (x & (1 << 0) != 0) ? 2 : 1;
+        acc += (x & (1 << 1) != 0) ? 6 : 3;
+        assert(acc != 7);
+    }
+
+    function prove_branches_4(uint256 x) public {
+        uint256 acc = 0;
+        acc += (x & (1 << 0) != 0) ? 2 : 1;
+        acc += (x & (1 << 1) != 0) ? 6 : 3;
+        acc += (x & (1 << 2) != 0) ? 18 : 9;
+        acc += (x & (1 << 3) != 0) ? 54 : 27;
+        assert(acc != 70);
+    }
+
+    function prove_branches_8(uint256 x) public {
+        uint256 acc = 0;
+        acc += (x & (1 << 0) != 0) ? 2 : 1;
+        acc += (x & (1 << 1) != 0) ? 6 : 3;
+        acc += (x & (1 << 2) != 0) ? 18 : 9;
+        acc += (x & (1 << 3) != 0) ? 54 : 27;
+        acc += (x & (1 << 4) != 0) ? 162 : 81;
+        acc += (x & (1 << 5) != 0) ? 486 : 243;
+        acc += (x & (1 << 6) != 0) ? 1458 : 729;
+        acc += (x & (1 << 7) != 0) ? 4374 : 2187;
+        assert(acc != 5740);
+    }
+
+    function prove_branches_16(uint256 x) public {
+        uint256 acc = 0;
+        acc += (x & (1 << 0) != 0) ? 2 : 1;
+        acc += (x & (1 << 1) != 0) ? 6 : 3;
+        acc += (x & (1 << 2) != 0) ? 18 : 9;
+        acc += (x & (1 << 3) != 0) ? 54 : 27;
+        acc += (x & (1 << 4) != 0) ? 162 : 81;
+        acc += (x & (1 << 5) != 0) ? 486 : 243;
+        acc += (x & (1 << 6) != 0) ? 1458 : 729;
+        acc += (x & (1 << 7) != 0) ? 4374 : 2187;
+        acc += (x & (1 << 8) != 0) ? 13122 : 6561;
+        acc += (x & (1 << 9) != 0) ? 39366 : 19683;
+        acc += (x & (1 << 10) != 0) ? 118098 : 59049;
+        acc += (x & (1 << 11) != 0) ? 354294 : 177147;
+        acc += (x & (1 << 12) != 0) ? 1062882 : 531441;
+        acc += (x & (1 << 13) != 0) ? 3188646 : 1594323;
+        acc += (x & (1 << 14) != 0) ? 9565938 : 4782969;
+        acc += (x & (1 << 15) != 0) ? 28697814 : 14348907;
+        assert(acc != 37665880);
+    }
+
+    function prove_branches_32(uint256 x) public {
+        uint256 acc = 0;
+        acc += (x & (1 << 0) != 0) ? 2 : 1;
+        acc += (x & (1 << 1) != 0) ? 6 : 3;
+        acc += (x & (1 << 2) != 0) ? 18 : 9;
+        acc += (x & (1 << 3) != 0) ? 54 : 27;
+        acc += (x & (1 << 4) != 0) ? 162 : 81;
+        acc += (x & (1 << 5) != 0) ? 486 : 243;
+        acc += (x & (1 << 6) != 0) ? 1458 : 729;
+        acc += (x & (1 << 7) != 0) ? 4374 : 2187;
+        acc += (x & (1 << 8) != 0) ? 13122 : 6561;
+        acc += (x & (1 << 9) != 0) ? 39366 : 19683;
+        acc += (x & (1 << 10) != 0) ? 118098 : 59049;
+        acc += (x & (1 << 11) != 0) ? 354294 : 177147;
+        acc += (x & (1 << 12) != 0) ? 1062882 : 531441;
+        acc += (x & (1 << 13) != 0) ? 3188646 : 1594323;
+        acc += (x & (1 << 14) != 0) ? 9565938 : 4782969;
+        acc += (x & (1 << 15) != 0) ? 28697814 : 14348907;
+        acc += (x & (1 << 16) != 0) ? 86093442 : 43046721;
+        acc += (x & (1 << 17) != 0) ? 258280326 : 129140163;
+        acc += (x & (1 << 18) != 0) ? 774840978 : 387420489;
+        acc += (x & (1 << 19) != 0) ? 2324522934 : 1162261467;
+        acc += (x & (1 << 20) != 0) ? 6973568802 : 3486784401;
+        acc += (x & (1 << 21) != 0) ? 20920706406 : 10460353203;
+        acc += (x & (1 << 22) != 0) ? 62762119218 : 31381059609;
+        acc += (x & (1 << 23) != 0) ? 188286357654 : 94143178827;
+        acc += (x & (1 << 24) != 0) ? 564859072962 : 282429536481;
+        acc += (x & (1 << 25) != 0) ? 1694577218886 : 847288609443;
+        acc += (x & (1 << 26) != 0) ? 5083731656658 : 2541865828329;
+        acc += (x & (1 << 27) != 0) ? 15251194969974 : 7625597484987;
+        acc += (x & (1 << 28) != 0) ? 45753584909922 : 22876792454961;
+        acc += (x & (1 << 29) != 0) ? 137260754729766 : 68630377364883;
+        acc += (x & (1 << 30) != 0) ? 411782264189298 : 205891132094649;
+        acc += (x & (1 << 31) != 0) ? 1235346792567894 : 617673396283947;
+        assert(acc != 1621392665245360);
+    }
+}
@@ -0,0 +1,126 @@
+# Statistics over repeated measurements of the same case
+
+import itertools
+import math
+import random
+import statistics
+from typing import Callable
+
+# bootstrapping is randomized, a fixed seed keeps the reports reproducible
+bootstrap_seed = 1
+bootstrap_resamples = 1000
+
+# a case is considered noisy if the confidence interval of its median is wider
+# than this fraction of the median
+noisy_rel_ci = 0.2
+
+
+# confidence interval of the median (or of another statistic of the samples)
+# via the percentile bootstrap
+def bootstrap_ci(samples: list[float], conf: float = 0.95,
+                 stat: Callable[[list[float]], float] = statistics.median) -> tuple[float, float]:
+    rnd = random.Random(bootstrap_seed)
+    meds = []
+    for _ in range(bootstrap_resamples):
+        meds.append(stat(rnd.choices(samples, k=len(samples))))
+    meds.sort()
+    lo = meds[int((1-conf)/2 * (bootstrap_resamples-1))]
+    hi = meds[int((1+conf)/2 * (bootstrap_resamples-1))]
+    return (lo, hi)
+
+
+def is_noisy(samples: list[float]) -> bool:
+    if len(samples) < 2:
+        return False
+    med = statistics.median(samples)
+    lo, hi = bootstrap_ci(samples)
+    if med == 0:
+        return hi > lo
+    return (hi - lo) / med > noisy_rel_ci
+
+
+# ranks of the values, starting at 1. Equal values get the average of their
+# ranks
+def get_ranks(values: list[float]) -> list[float]:
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j+1 < len(order) and values[order[j+1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j+1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j+1
+    return ranks
+
+
+# up to this many ways of splitting the samples, the Mann-Whitney U test is
+# computed exactly
+mann_whitney_exact_max = 20000
+
+
+# two-sided p-value of the Mann-Whitney U test, i.e. of the samples a and b
+# coming from the same distribution
+def mann_whitney_p(a: list[float], b: list[float]) -> float:
+    n1 = len(a)
+    n2 = len(b)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    ranks = get_ranks(a + b)
+    mu = n1 * n2 / 2
+    u = sum(ranks[:n1]) - n1 * (n1+1) / 2
+    if math.comb(n1 + n2, n1) <= mann_whitney_exact_max:
+        num_extreme = 0
+        num_all = 0
+        for idxs in itertools.combinations(range(n1 + n2), n1):
+            u2 = sum(ranks[i] for i in idxs) - n1 * (n1+1) / 2
+            num_all += 1
+            if abs(u2 - mu) >= abs(u - mu) - 1e-9:
+                num_extreme += 1
+        return num_extreme / num_all
+
+    # normal approximation, with correction for ties and continuity
+    n = n1 + n2
+    ties = sum(t**3 - t for t in [ranks.count(r) for r in set(ranks)])
+    sigma = math.sqrt(n1 * n2 / 12 * ((n+1) - ties / (n * (n-1))))
+    if sigma == 0:
+        return 1.0
+    z = max(0.0, abs(u - mu) - 0.5) / sigma
+    return math.erfc(z / math.sqrt(2))
+
+
+# smallest two-sided p-value the Mann-Whitney U test can give for samples of
+# these sizes, the one of all samples of a being below all samples of b. With
+# few samples, no difference can be significant
+def mann_whitney_min_p(n1: int, n2: int) -> float:
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    return min(1.0, 2 / math.comb(n1 + n2, n1))
+
+
+# two-sided p-value of the sign test, i.e. of the number of increases and
+# decreases being due to chance
+def sign_test_p(num_pos: int, num_neg: int) -> float:
+    n = num_pos + num_neg
+    if n == 0:
+        return 1.0
+    k = min(num_pos, num_neg)
+    p = sum(math.comb(n, i) for i in range(k+1)) / 2**n
+    return min(1.0, 2 * p)
+
+
+# least squares fit of y = slope * x + intercept. Returns the slope, the
+# intercept and the coefficient of determination R^2
+def linear_fit(xs: list[float], ys: list[float]) -> tuple[float, float, float]:
+    mx = statistics.mean(xs)
+    my = statistics.mean(ys)
+    sxx = sum((x - mx)**2 for x in xs)
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    syy = sum((y - my)**2 for y in ys)
+    slope = sxy / sxx if sxx > 0 else 0.0
+    intercept = my - slope * mx
+    r2 = 1.0
+    if syy > 0:
+        r2 = sxy**2 / (sxx * syy) if sxx > 0 else 0.0
+    return (slope, intercept, r2)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+# End-to-end test of distributed runs (./bench.py --listen/--worker) on this
+# machine: a coordinator and two workers run on 127.0.0.1, in a copy of the
+# repository, with stand-ins for forge and halmos that answer quickly. Checks
+# that every case got a result, that no job was lost, that every case was run
+# once and both workers ran some of them, and that the run ended up in the
+# coordinator's results.db
+
+import os
+import json
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import optparse
+from glob import glob
+
+global opts
+opts : optparse.Values
+
+# writes the JSON files forge would for the contracts in src/, without
+# compiling anything
+fake_forge = r'''#!/usr/bin/env python3
+import glob, hashlib, json, os, re
+out = os.environ.get("FOUNDRY_OUT", "out")
+for f in glob.glob("src/**/*.sol", recursive=True):
+    txt = open(f).read()
+    for m in re.finditer(r"contract\s+(\w+)[^{]*\{(.*?)\n\}", txt, re.S):
+        abi = []
+        for fm in re.finditer(r"function\s+(\w+)\s*\(([^)]*)\)", m.group(2)):
+            ins = [{"internalType": p.split()[0], "type": p.split()[0], "name": ""}
+                   for p in fm.group(2).split(",") if p.strip()]
+            abi.append({"type": "function", "name": fm.group(1), "inputs": ins})
+        d = os.path.join(out, os.path.basename(f))
+        os.makedirs(d, exist_ok=True)
+        with open(os.path.join(d, m.group(1) + ".json"), "w") as j:
+            json.dump({"abi": abi, "ast": {"absolutePath": f},
+                       "metadata": {"sources": {f: {"keccak256": hashlib.sha256(txt.encode()).hexdigest()}}}}, j)
+'''
+
+# passes every function, after a short while. Both workers run on the same
+# host, so their results can't be told apart; the stand-in records which
+# worker ran which function instead
+fake_halmos = r'''#!/usr/bin/env python3
+import os, sys, time
+fun = sys.argv[sys.argv.index("--function") + 1]
+with open(os.environ["TEST_RUNS_FNAME"], "a") as f:
+    f.write("%s %s\n" % (os.environ["TEST_WORKER"], fun))
+time.sleep(0.05)
+print("[PASS] %s() (paths: 1, time: 0.05s, bounds: [])" % fun)
+print("Symbolic test result: 1 passed; 0 failed; time: 0.05s", flush=True)
+'''
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def write_script(fname: str, text: str) -> None:
+    with open(fname, "w") as f:
+        f.write(text)
+    os.chmod(fname, 0o755)
+
+
+def fail(msg: str) -> None:
+    print("FAILED: %s" % msg)
+    exit(1)
+
+
+# Set up options for main
+def set_up_parser() -> optparse.OptionParser:
+    usage = "usage: %prog [options]"
+    desc = """Test a distributed run with a coordinator and two workers on this machine
+    """
+
+    parser = optparse.OptionParser(usage=usage, description=desc)
+    parser.add_option("--tests", dest="testpattern", type=str, default=".*arith.*",
+                      help="Test pattern of the cases to run. Default: %default")
+    parser.add_option("--keep", action="store_true", default=False,
+                      dest="keep", help="Keep the directory the test ran in")
+
+    return parser
+
+
+def main() -> None:
+    parser = set_up_parser()
+    global opts
+    (opts, args) = parser.parse_args()
+    if len(args) > 0:
+        print("Testing does not accept arguments")
+        exit(-1)
+
+    repo = os.path.dirname(os.path.abspath(__file__))
+    tmp = tempfile.mkdtemp(prefix="bench-distributed-")
+    work = os.path.join(tmp, "repo")
+    shutil.copytree(repo, work, ignore=shutil.ignore_patterns(
+        ".git", "out", "out-*", "cache", "cache-*", "result-cache", "output-blobs",
+        "graphs", "results-*", "results.db"))
+    bindir = os.path.join(tmp, "bin")
+    os.mkdir(bindir)
+    write_script(os.path.join(bindir, "forge"), fake_forge)
+    write_script(os.path.join(bindir, "halmos"), fake_halmos)
+    runs_fname = os.path.join(tmp, "runs.txt")
+    env = dict(os.environ, PATH="%s:%s" % (bindir, os.environ["PATH"]), TEST_RUNS_FNAME=runs_fname)
+
+    addr = "127.0.0.1:%d" % get_free_port()
+    bench = [sys.executable, "bench.py"]
+    coordinator = subprocess.Popen(
+        bench + ["--listen", addr, "--tools", "halmos", "--tests", opts.testpattern,
+                 "--nocache", "--status-interval", "0"],
+        cwd=work, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, encoding="utf-8")
+    # the workers use the build of the coordinator, which is done before it
+    # listens, instead of building in the same directory at the same time
+    out = []
+    workers = []
+    for line in coordinator.stdout:
+        out.append(line)
+        if line.startswith("Waiting for workers"):
+            for i in range(2):
+                workers.append(subprocess.Popen(bench + ["--worker", addr, "--norebuild"],
+                                                cwd=work, env=dict(env, TEST_WORKER="%d" % i),
+                                                stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT))
+            break
+    out += coordinator.stdout.readlines()
+    coordinator.wait()
+    for w in workers:
+        w.wait()
+    with open(os.path.join(tmp, "coordinator.log"), "w") as f:
+        f.write("".join(out))
+
+    try:
+        if coordinator.returncode != 0:
+            fail("coordinator exited with %d, see %s/coordinator.log" % (coordinator.returncode, tmp))
+        if len(workers) != 2:
+            fail("coordinator never listened, see %s/coordinator.log" % tmp)
+        for w in workers:
+            if w.returncode != 0:
+                fail("worker exited with %d" % w.returncode)
+        num_connected = len([line for line in out if line.startswith("Worker connected")])
+        if num_connected != 2:
+            fail("%d workers connected instead of 2" % num_connected)
+
+        fnames = glob(os.path.join(work, "results-tstamp-*.json"))
+        if len(fnames) != 1:
+            fail("%d results files instead of 1" % len(fnames))
+        with open(fnames[0], "r") as f:
+            results = json.load(f)
+        rows = [r for rs in results.values() for r in rs]
+        if len(rows) == 0:
+            fail("no results")
+        lost = [r["name"] for r in rows if r["kill_reason"] == "lost"]
+        if len(lost) > 0:
+            fail("jobs were lost: %s" % ", ".join(lost))
+        unsolved = [r["name"] for r in rows if not r["solved"]]
+        if len(unsolved) > 0:
+            fail("cases were not solved: %s" % ", ".join(unsolved))
+
+        with open(runs_fname, "r") as f:
+            runs = [line.split() for line in f.read().split("\n") if line != ""]
+        if len(runs) != len(rows):
+            fail("%d cases were run instead of %d" % (len(runs), len(rows)))
+        per_worker = [len([w for w, _ in runs if w == "%d" % i]) for i in range(2)]
+        if 0 in per_worker:
+            fail("a worker ran no cases, the cases run per worker are %s" % per_worker)
+
+        with sqlite3.connect(os.path.join(work, "results.db")) as con:
+            (num_db,) = con.execute("select count(*) from results").fetchone()
+        if num_db != len(rows):
+            fail("%d results in results.db instead of %d" % (num_db, len(rows)))
+        print("OK: %d cases run by 2 workers (%d and %d), all stored in results.db" % (
+            len(rows), per_worker[0], per_worker[1]))
+    finally:
+        if opts.keep:
+            print("Test directory: %s" % tmp)
+        else:
+            shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
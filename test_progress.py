@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# Test of the counts of the progress of a run (progress.py): runs that ended
+# in each possible way are added, and the counts of solved, unknown and
+# failed cases are checked in the status, its JSON file and its Prometheus
+# file
+
+import os
+import json
+import shutil
+import tempfile
+from bench import Case, Result
+from progress import Progress
+
+# how the run of a case ended: (result, exit status, kill reason), and what
+# it counts as
+runs = [
+    ("safe", 0, None, "solved"),
+    ("unsafe", 1, None, "solved"),
+    # stopped by the adapter once the verdict was final
+    ("safe", None, None, "solved"),
+    ("unknown", 0, None, "unknown"),
+    ("unknown", None, "timeout", "unknown"),
+    ("unknown", None, "memout", "error"),
+    ("unknown", None, "signal", "error"),
+    ("unknown", None, "lost", "error"),
+    ("unknown", 2, None, "error"),
+]
+
+
+def get_result(result: str, exit_status: int|None, kill_reason: str|None) -> Result:
+    case = Case("C", None, "src/safe/test.sol", False, "prove_x", "prove_x()", None, "0.8.19")
+    return Result(result=result, mem_used_MB=None, exit_status=exit_status,
+                  perc_CPU=None, t=1.0, t_user=None, t_sys=None,
+                  kill_reason=kill_reason, tout=60, memoutMB=1000, case=case, out_ref="none")
+
+
+def fail(msg: str) -> None:
+    print("FAILED: %s" % msg)
+    exit(1)
+
+
+def main() -> None:
+    tmp = tempfile.mkdtemp(prefix="bench-progress-")
+    try:
+        solver = "halmos-0.0.1-tstamp-test"
+        json_fname = os.path.join(tmp, "status.json")
+        prom_fname = os.path.join(tmp, "status.prom")
+        progresses = [Progress("test", {solver: ("halmos", "0.0.1", len(runs))}, fname, 0)
+                      for fname in [json_fname, prom_fname]]
+        for progress in progresses:
+            for i, (result, exit_status, kill_reason, _) in enumerate(runs):
+                progress.add(solver, get_result(result, exit_status, kill_reason), resumed=i == 0)
+            progress.end()
+
+        expected = {"done": len(runs)}
+        for kind in ["solved", "unknown", "error"]:
+            expected[kind] = len([r for r in runs if r[3] == kind])
+        counts = progresses[0].counts[solver]
+        if counts != expected:
+            fail("counts are %s instead of %s" % (counts, expected))
+
+        with open(json_fname, "r") as f:
+            status = json.load(f)
+        for k, v in expected.items():
+            if status["tools"][0][k] != v:
+                fail("'%s' is %d instead of %d in %s" % (k, status["tools"][0][k], v, json_fname))
+        with open(prom_fname, "r") as f:
+            prom = f.read()
+        for kind in ["solved", "unknown", "error"]:
+            line = 'bench_cases_result{tool="halmos",version="0.0.1",result="%s",run="test"} %s' % (
+                kind, repr(float(expected[kind])))
+            if line not in prom.split("\n"):
+                fail("'%s' is not in %s" % (line, prom_fname))
+        print("OK: %d cases counted as %d solved, %d unknown, %d failed" % (
+            len(runs), expected["solved"], expected["unknown"], expected["error"]))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env bash
+
+# Checks several functions of the same contract with a single halmos process.
+# Prints a "result: <function> <safe|unsafe|unknown>" and a
+# "time: <function> <seconds>" line for each function halmos reported on.
+
+set -x
+
+contract_file="$1" ; shift
+contract_name="$1" ; shift
+fun_regex="$1"; shift
+ds_test="$1"; shift
+tout="$1"; shift
+memout="$1"; shift
+dump_smt="$1"; shift
+
+extra_params=""
+if [[ "$dump_smt" == "1" ]]; then
+    extra_params="${extra_params} --dump-smt-queries"
+fi
+
+SCRIPT_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
+source "$SCRIPT_DIR/utils.sh"
+
+if [[ "${ds_test}" == "0" ]]; then
+    cmd=(halmos --function "${fun_regex}" --contract "${contract_name}" --symbolic-storage --symbolic-msg-sender ${extra_params} "$@")
+elif [[ "${ds_test}" == "1" ]]; then
+    cmd=(halmos --function "${fun_regex}" --contract "${contract_name}" ${extra_params} "$@")
+else
+    echo "Called incorrectly"
+    exit 1
+fi
+set +x
+
+# The output of halmos is parsed as it comes, instead of being kept until
+# halmos exits. Warnings about incomplete exploration are printed while a
+# test is running, i.e. before its result line, while counterexamples and the
+# loop bound warning are printed after it
+declare -A verdict
+declare -A fun_time
+last=""
+incomplete=0
+crashed=0
+while IFS= read -r line; do
+  echo "$line" >&2
+  if [[ $line =~ "Traceback" ]]; then
+    crashed=1
+  elif [[ $line =~ "Encountered symbolic CALLDATALOAD offset" ]] || [[ $line =~ "Encountered symbolic memory offset" ]]; then
+    incomplete=1
+  elif [[ $line =~ "Counterexample: unknown" ]] || [[ $line =~ "Counterexample (potentially invalid)" ]] || [[ $line =~ "paths have not been fully explored due to the loop unrolling bound" ]]; then
+    if [[ -n "$last" ]]; then
+      verdict[$last]="unknown"
+    fi
+  elif [[ $line =~ ^\[(PASS|FAIL|TIMEOUT|ERROR)\]\ ([A-Za-z0-9_]+)\( ]]; then
+    status="${BASH_REMATCH[1]}"
+    last="${BASH_REMATCH[2]}"
+    if [[ $incomplete == "1" ]]; then
+      verdict[$last]="unknown"
+    elif [[ $status == "PASS" ]]; then
+      verdict[$last]="safe"
+    elif [[ $status == "FAIL" ]]; then
+      verdict[$last]="unsafe"
+    else
+      verdict[$last]="unknown"
+    fi
+    if [[ $line =~ time:\ ([0-9.]+)s ]]; then
+      fun_time[$last]="${BASH_REMATCH[1]}"
+    fi
+    if [[ $line =~ paths:\ ([0-9]+) ]]; then
+      bench_metric "paths" "${BASH_REMATCH[1]}" "$last"
+    fi
+    incomplete=0
+  fi
+done < <("${cmd[@]}" 2>&1)
+
+if [[ $crashed == "1" ]]; then
+  exit 1
+fi
+
+# the time of halmos outside of the functions is the t_startup bench.py
+# derives from these times
+for fun in "${!verdict[@]}"; do
+  echo "result: ${fun} ${verdict[$fun]}"
+  if [[ -n "${fun_time[$fun]}" ]]; then
+    echo "time: ${fun} ${fun_time[$fun]}"
+    bench_phase "test" "${fun_time[$fun]}" "$fun"
+  fi
+done
+exit 0
@@ -27,9 +27,9 @@ source "$SCRIPT_DIR/utils.sh"
 
 if [[ "${ds_test}" == "0" ]]; then
     code=$(get_runtime_bytecode "${contract_file}" "${contract_name}")
-    out=$(runlim --real-time-limit="${tout}" --space-limit="${memout}" --kill-delay=2 "$HEVM_BIN" symbolic --code "${code}" --sig "${sig}" ${extra_params} "$@" 2>&1)
+    out=$("$HEVM_BIN" symbolic --code "${code}" --sig "${sig}" ${extra_params} "$@" 2>&1)
 elif [[ "${ds_test}" == "1" ]]; then
-    out=$(runlim --real-time-limit="${tout}" --space-limit="${memout}" --kill-delay=2 "$HEVM_BIN" test --match "${contract_file}.*${contract_name}.*${fun_name}" --verbose 2 ${extra_params} "$@" 2>&1)
+    out=$("$HEVM_BIN" test --match "${contract_file}.*${contract_name}.*${fun_name}" --verbose 2 ${extra_params} "$@" 2>&1)
 else
     echo "Called incorrectly"
     exit 1
@@ -18,7 +18,7 @@ if [[ "${ds_test}" == "0" ]]; then
   exit 0
 fi
 
-out=$(runlim --real-time-limit="${tout}" --kill-delay=2 --space-limit="${memout}" kontrol prove --counterexample-information --match-test "${contract_name}.${fun_name}" "$@" 2>&1)
+out=$(kontrol prove --counterexample-information --match-test "${contract_name}.${fun_name}" "$@" 2>&1)
 
 # Check if we emitted smt2 files. If so, copy them over to a
 # directory based on the contract file & name
@@ -1,10 +1,47 @@
 #!/usr/bin/env bash
 
-# takes a path to a solidity file and a contract name and returns the runtime bytecode
+# takes a path to a solidity file and a contract name and returns the runtime bytecode.
+# The build output is in $FOUNDRY_OUT if bench.py builds with several solc versions
 get_runtime_bytecode() {
     solidity_file=$1
     contract_name=$2
     filename=$(basename "${solidity_file}")
-    json_file="out/${filename}/${contract_name}.json"
+    json_file="${FOUNDRY_OUT:-out}/${filename}/${contract_name}.json"
     jq .deployedBytecode.object -r "${json_file}"
 }
+
+# Report metrics to the harness as JSON lines, see "Metrics" in README.md.
+# Nothing is reported when the script is not run by the harness. The optional
+# last argument is the function the metric is about, for batch scripts
+
+# phase name, time in seconds, [function]
+bench_phase() {
+    if [[ -n "${BENCH_METRICS_FD:-}" ]]; then
+        if [[ -n "${3:-}" ]]; then
+            echo "{\"v\": 1, \"phase\": \"$1\", \"t\": $2, \"fun\": \"$3\"}" >&"${BENCH_METRICS_FD}"
+        else
+            echo "{\"v\": 1, \"phase\": \"$1\", \"t\": $2}" >&"${BENCH_METRICS_FD}"
+        fi
+    fi
+}
+
+# metric name, value, [function]
+bench_metric() {
+    if [[ -n "${BENCH_METRICS_FD:-}" ]]; then
+        if [[ -n "${3:-}" ]]; then
+            echo "{\"v\": 1, \"metric\": \"$1\", \"value\": $2, \"fun\": \"$3\"}" >&"${BENCH_METRICS_FD}"
+        else
+            echo "{\"v\": 1, \"metric\": \"$1\", \"value\": $2}" >&"${BENCH_METRICS_FD}"
+        fi
+    fi
+}
+
+# current time in seconds, with sub-second precision
+bench_now() {
+    date +%s.%N
+}
+
+# difference of two times from bench_now, in seconds
+bench_elapsed() {
+    awk "BEGIN { printf \"%.6f\", $2 - $1 }"
+}